@@ -19,6 +19,7 @@ from operator import add, mul
 from copy import copy
 
 from ora_cn_fns import init_ss_carbon_pools, generate_miami_dyce_npp, npp_zaks_grow_season
+from ora_segmented_list import fork_data
 
 ERROR_STR = '*** Error *** '
 
@@ -202,6 +203,14 @@ class CarbonChange(object, ):
 
         self.var_name_list = var_name_list
 
+    def fork(self, nmnths=None):
+        """
+        new object sharing the first nmnths values of each variable, by default all, with this object
+        """
+        forked = CarbonChange()
+        forked.data = fork_data(self.data, nmnths)
+        return forked
+
     def get_last_tstep_pools(self):
         """
 
@@ -328,6 +337,14 @@ class NitrogenChange(object, ):
 
         self.var_name_list = var_name_list
 
+    def fork(self, nmnths=None):
+        """
+        new object sharing the first nmnths values of each variable, by default all, with this object
+        """
+        forked = NitrogenChange()
+        forked.data = fork_data(self.data, nmnths)
+        return forked
+
     def append_nvars(self, imnth, crop_name, min_no3_nh4, soil_n_sply, prop_yld_opt, prop_n_opt,
                     no3_start, no3_atmos, no3_inorg_fert, no3_nitrif,
                     no3_avail, no3_total_inp, no3_immob, no3_leach, no3_leach_adj,
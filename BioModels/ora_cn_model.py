@@ -21,27 +21,36 @@ __version__ = '0.0.0'
 # Version history
 # ---------------
 #
-from os.path import isfile, join
-from copy import copy, deepcopy
+from os.path import isfile, join, getmtime
+from os import cpu_count
+from concurrent.futures import ProcessPoolExecutor
 from numpy import arange
-from PyQt5.QtWidgets import QApplication
 from calendar import month_abbr
 
+from ora_progress_fns import report_progress
 from livestock_output_data import check_livestock_run_data
 from ora_low_level_fns import gui_summary_table_add, gui_optimisation_cycle, chck_weather_mngmnt
 from ora_cn_fns import get_soil_vars, npp_zaks_grow_season, add_npp_zaks_by_month
+from ora_cn_summary_fns import summarise_fwd_run, print_scenario_comparison, SCNR_BASELINE
+from ora_cn_vector_model import DoseGrid, vector_forward_run, summarise_doses
 from ora_cn_classes import MngmntSubarea, CarbonChange, NitrogenChange, EnsureContinuity, CropProdModel
 from ora_water_model import SoilWaterChange
 from ora_nitrogen_model import soil_nitrogen
 from ora_excel_write import retrieve_output_xls_files, generate_excel_outfiles
-from ora_excel_write_cn_water import write_excel_all_subareas
-from ora_excel_read import ReadCropOwNitrogenParms, ReadStudy, read_xls_run_file
+from ora_excel_write_cn_water import write_excel_all_subareas, write_excel_scenario_comparison
+from ora_shared_data import publish, published, install, resolve
+from ora_shared_results import pack_results, unpack_results, complete_run_objects
+from ora_result_cache import ResultCache, subarea_fingerprint
+from ora_excel_read import ReadCropOwNitrogenParms, ReadStudy, read_xls_run_file, make_fwd_wthr_scenario
 from ora_rothc_fns import run_rothc
 from ora_gui_misc_fns import edit_rate_inhibit
+from ora_wthr_extract import site_wthr_scnrs
 
 MNTH_NAMES_SHORT = [mnth for mnth in month_abbr[1:]]
 
 NPP_MODELS = ('MIAMI', 'Zaks', 'N_lim')
+MNGMNT_TSTEP_ATTRIBS = ('crop_names', 'crop_currs', 'pi_props', 'pi_tonnes', 'irrig', 'fert_n', 'org_fert')
+SEARCH_ALL = 'all'  # optimiser searches every month of application or organic waste type
 # NPP_MODELS = ('Zaks')
 
 # takes 83 (1e-09), 77 (1e-08) and 66 (1e-07) iterations for Gondar Single 'Base line mgmt.json'
@@ -98,7 +107,7 @@ def _cn_steady_state(form, parameters, weather, management, soil_vars, subarea):
         print('Simulated SOC: {}\tMeasured SOC: {}\t *** failed to converge *** after iterations: {}'
               .format(round(tot_soc_simul, 3), round(tot_soc_meas, 3), iteration + 1))
 
-    QApplication.processEvents()  # allow event loop to update unprocessed events
+    report_progress()  # allow event loop to update unprocessed events
 
     # add npp by Zaks to management
     # =============================
@@ -107,32 +116,71 @@ def _cn_steady_state(form, parameters, weather, management, soil_vars, subarea):
 
     return carbon_change, nitrogen_change, soil_water, converge_flag
 
-def _cn_forward_run(parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss, crop_model):
+def _first_changed_tstep(mngmnt_base, mngmnt_scnr):
     """
-
+    forward run timestep at which scenario management first differs from that of the base run
+    """
+    ntsteps = min(mngmnt_base.ntsteps, mngmnt_scnr.ntsteps)
+    if mngmnt_base.ntsteps != mngmnt_scnr.ntsteps:
+        return 0
+
+    # inhibition rate modifier applies to the whole run and depends on the first fertiliser type
+    # ==========================================================================================
+    fert_types_base = [fert['fert_type'] for fert in mngmnt_base.fert_n if fert is not None]
+    fert_types_scnr = [fert['fert_type'] for fert in mngmnt_scnr.fert_n if fert is not None]
+    if fert_types_base[:1] != fert_types_scnr[:1]:
+        return 0
+
+    for tstep in range(ntsteps):
+        for attrib in MNGMNT_TSTEP_ATTRIBS:
+            if getattr(mngmnt_base, attrib)[tstep] != getattr(mngmnt_scnr, attrib)[tstep]:
+                return tstep
+
+    return ntsteps
+
+def _cn_forward_run(parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss, crop_model,
+                                                                                                    base_run=None):
+    """
+    base_run: optional complete runs and management of a forward run with the same weather and steady state;
+              the run then resumes from the base run at the month where management first differs
     """
     pettmp = weather.pettmp_fwd
     if mngmnt_fwd.ntsteps > len(pettmp['precip']):
         print('Cannot proceed with forward run due to insuffient weather timesteps ')
         return None
 
-    complete_runs = {}
+    tstep_strt = 0
+    if base_run is not None:
+        complete_runs_base, mngmnt_base = base_run
+        tstep_strt = _first_changed_tstep(mngmnt_base, mngmnt_fwd)
+        mngmnt_fwd.npp_zaks[:tstep_strt] = mngmnt_base.npp_zaks[:tstep_strt]
+        nmnths_ss = len(n_change_ss.data['no3_end'])
 
-    continuity = EnsureContinuity()
-    continuity.adjust_soil_water(soil_water_ss)
+    complete_runs = {}
 
     for npp_model in NPP_MODELS:
-        c_change = deepcopy(c_change_ss)
-        soil_water = deepcopy(soil_water_ss)
-        n_change = deepcopy(n_change_ss)
+        if tstep_strt > 0:
+            c_change, n_change, soil_water = _abbrev_to_steady_state(*complete_runs_base[npp_model],
+                                                                                        nmnths_ss + tstep_strt)
+        else:
+            c_change = c_change_ss.fork()
+            soil_water = soil_water_ss.fork()
+            n_change = n_change_ss.fork()
+
+        # each model starts from the steady state or the base run checkpoint
+        # ===================================================================
+        continuity = EnsureContinuity()
+        continuity.adjust_soil_water(soil_water)
 
         # run RothC
         # =========
-        run_rothc(parameters, pettmp, mngmnt_fwd, c_change, soil_vars, soil_water, continuity, crop_model, npp_model)
+        run_rothc(parameters, pettmp, mngmnt_fwd, c_change, soil_vars, soil_water, continuity, crop_model, npp_model,
+                                                                                                        tstep_strt)
         continuity.adjust_soil_water(soil_water)
 
         continuity.adjust_soil_n_change(n_change)
-        soil_nitrogen(c_change, soil_water, parameters, pettmp, mngmnt_fwd, soil_vars, n_change, continuity)
+        soil_nitrogen(c_change, soil_water, parameters, pettmp, mngmnt_fwd, soil_vars, n_change, continuity,
+                                                                                                        tstep_strt)
 
         complete_run = (c_change, n_change, soil_water)
         crop_model.add_management_fwd(complete_run, mngmnt_fwd, npp_model)
@@ -141,19 +189,65 @@ def _cn_forward_run(parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_c
 
     return complete_runs
 
-def run_soil_cn_algorithms(form):
+def _cn_forward_run_task(parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss,
+                                                                                        crop_model, base_run=None):
     """
-    retrieve weather and soil
-    NB return code convention is 0 for success, -1 for failure
+    wrapper for use in a worker process - management is returned as it acquires the Zaks NPPs during the run
+    parameters may be a reference to those published by the parent process
+    """
+    complete_runs = _cn_forward_run(resolve(parameters), weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss,
+                                                                            soil_water_ss, crop_model, base_run)
+    return complete_runs, mngmnt_fwd
+
+def _cn_forward_run_task_packed(*args):
+    """
+    as above but monthly values of the complete runs are returned in a mapped file rather than pickled
+    """
+    complete_runs, mngmnt_fwd = _cn_forward_run_task(*args)
+    owners = [] if complete_runs is None else complete_run_objects(complete_runs.values())
+
+    return pack_results((complete_runs, mngmnt_fwd), owners)
+
+def _fan_out_forward_runs(fwd_tasks, max_workers=None):
+    """
+    run forward runs which share the same steady state concurrently, one worker process per task
+    fwd_tasks is a dictionary of argument tuples for _cn_forward_run_task keyed by scenario
+    max_workers: optional limit on worker processes, use 1 to run in this process e.g. when farms are already
+                 being run concurrently
+    returns results in the same order as the tasks
+    """
+    if max_workers is None:
+        max_workers = cpu_count()
+    max_workers = min(len(fwd_tasks), max_workers)
+
+    if max_workers <= 1:
+        return {scnr: _cn_forward_run_task(*fwd_tasks[scnr]) for scnr in fwd_tasks}
+
+    # tasks share the parameters so these are passed to each worker once rather than with each task
+    # ============================================================================================
+    parms_ref = publish('fwd_parms', next(iter(fwd_tasks.values()))[0])
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=install, initargs=published()) as executor:
+        futures = {scnr: executor.submit(_cn_forward_run_task_packed, parms_ref, *fwd_tasks[scnr][1:])
+                                                                                            for scnr in fwd_tasks}
+        fwd_results = {scnr: unpack_results(futures[scnr].result()) for scnr in futures}
+
+    return fwd_results
+
+def read_farm_inputs(form):
+    """
+    read stage: parameters, unless unchanged since initiation, and the run file
+    returns parameters, study, weather and subareas or None if inputs are invalid
     """
-    excel_out_flag = form.settings['write_excel']
     out_dir = form.settings['out_dir']
 
     parms_xls_fname = form.settings['params_xls']
-    print('Reading: ' + parms_xls_fname)
-    ora_parms = ReadCropOwNitrogenParms(parms_xls_fname)
+    if getattr(form, 'ora_parms_mtime', None) == getmtime(parms_xls_fname):
+        ora_parms = form.ora_parms      # unchanged since read during initiation
+    else:
+        print('Reading: ' + parms_xls_fname)
+        ora_parms = ReadCropOwNitrogenParms(parms_xls_fname)
     if ora_parms.ow_parms is None:
-        return -1
+        return None
 
     rate_inhibit = 0.6
     ora_parms.syn_fert_parms = edit_rate_inhibit(rate_inhibit, ora_parms.syn_fert_parms)
@@ -162,9 +256,7 @@ def run_soil_cn_algorithms(form):
     run_xls_fname = join(mgmt_dir, FNAME_RUN)
     if not isfile(run_xls_fname):
         print(ERROR_STR + 'Excel run file ' + run_xls_fname + 'must exist')
-        return -1
-
-    lookup_df = form.lookup_df
+        return None
 
     # read input Excel workbook
     # =========================
@@ -172,19 +264,44 @@ def run_soil_cn_algorithms(form):
     study = ReadStudy(form, mgmt_dir, run_xls_fname, out_dir)
     retcode = read_xls_run_file(run_xls_fname, ora_parms.crop_vars, study.latitude)
     if retcode is None:
-        return -1
+        return None
 
     ora_weather, ora_subareas = retcode
 
-    # clear previously recorded outputs
-    # =================================
-    form.all_runs_output = {}
-    form.all_runs_crop_model = {}
+    return ora_parms, study, ora_weather, ora_subareas
+
+def wthr_scnr_ntsteps(ora_subareas):
+    """
+    alternative forward run weather is stretched or truncated to the longest forward run of the farm
+    """
+    return max([ora_subareas[sba].ntsteps_fwd for sba in ora_subareas])
+
+def compute_farm(ora_parms, ora_weather, ora_subareas, fwd_wthr_scnrs=None, form=None, max_workers=None,
+                                                                                                    sbas=None):
+    """
+    compute stage: steady state and forward runs of each subarea; does not alter the form so can be run in
+    a worker process
+    returns dictionary of results, those for alternative scenarios are keyed by scenario then subarea
+    ora_parms may be a reference to parameters published by the parent process
+    sbas: optional list of subareas to compute so that a large farm can be split into tasks, see merge_farm_results
+    """
+    ora_parms = resolve(ora_parms)
+    farm_rslts = {'all_runs': {}, 'all_runs_scnrs': {}, 'scnr_summaries': {}, 'crop_models': {}, 'mngmnts_ss': {},
+                                                                        'mngmnts_fwd': {}, 'scnr_outputs': []}
+
+    # alternative forward run climates
+    # ================================
+    wthr_scnrs = {}
+    if fwd_wthr_scnrs is not None:
+        ntsteps_fwd = wthr_scnr_ntsteps(ora_subareas)
+        for scnr in fwd_wthr_scnrs:
+            wthr_scnrs[scnr] = make_fwd_wthr_scenario(ora_weather, fwd_wthr_scnrs[scnr], ntsteps_fwd)
 
     # process each subarea
     # ====================
-    all_runs = {}
-    for sba in ora_subareas:
+    all_runs_scnrs = farm_rslts['all_runs_scnrs']
+    scnr_summaries = farm_rslts['scnr_summaries']
+    for sba in (ora_subareas if sbas is None else sbas):
         integrity_flag = chck_weather_mngmnt(ora_weather, ora_subareas, sba)
         if not integrity_flag:
             continue
@@ -204,99 +321,225 @@ def run_soil_cn_algorithms(form):
         mngmnt_fwd = MngmntSubarea(ora_subareas[sba].crop_mngmnt_fwd, ora_weather, mngmnt_ss)  # also calculates MIAMI
         crop_model.nyears_fwd = mngmnt_fwd.nyears
 
-        complete_runs = _cn_forward_run(ora_parms, ora_weather, mngmnt_fwd, soil_vars,
-                                                c_change, n_change, soil_water, crop_model)
+        # forward runs for the run file weather and management, any alternative climates and any alternative
+        # management share the steady state - tasks are keyed by weather and management scenario names
+        # ======================================================================================================
+        fwd_tasks = {(None, None): (ora_parms, ora_weather, mngmnt_fwd, soil_vars,
+                                                                    c_change, n_change, soil_water, crop_model)}
+        for wthr_scnr in wthr_scnrs:
+            mngmnt_scnr = MngmntSubarea(ora_subareas[sba].crop_mngmnt_fwd, wthr_scnrs[wthr_scnr], mngmnt_ss)
+            fwd_tasks[(wthr_scnr, None)] = (ora_parms, wthr_scnrs[wthr_scnr], mngmnt_scnr, soil_vars,
+                                                                    c_change, n_change, soil_water, crop_model)
+
+        fwd_results = _fan_out_forward_runs(fwd_tasks, max_workers)
+
+        complete_runs, mngmnt_fwd = fwd_results[(None, None)]
         if complete_runs is None:
             continue
 
-        complete_run = complete_runs['Zaks']
-        form.all_runs_crop_model[sba] = crop_model
-        form.crop_run = True
+        # management scenarios resume from the run file forward run at the month where management first differs
+        # ======================================================================================================
+        fwd_tasks = {}
+        crop_mngmnt_fwd_scnrs = ora_subareas[sba].crop_mngmnt_fwd_scnrs
+        for mngmnt_scnr_nm in crop_mngmnt_fwd_scnrs:
+            mngmnt_scnr = MngmntSubarea(crop_mngmnt_fwd_scnrs[mngmnt_scnr_nm], ora_weather, mngmnt_ss)
+            fwd_tasks[(None, mngmnt_scnr_nm)] = (ora_parms, ora_weather, mngmnt_scnr, soil_vars, c_change, n_change,
+                                                        soil_water, crop_model, (complete_runs, mngmnt_fwd))
 
-        # outputs only
-        # ============
-        form.all_runs_output[sba] = complete_run
-        if excel_out_flag:
-            generate_excel_outfiles(form.lggr, study, sba, lookup_df, out_dir, ora_weather, complete_run,
-                                                                                    mngmnt_ss, mngmnt_fwd)
-        print()
-        all_runs[sba] = complete_run
+        fwd_results.update(_fan_out_forward_runs(fwd_tasks, max_workers))
 
-    if len(all_runs) > 0:
-        if excel_out_flag:
-            write_excel_all_subareas(study, out_dir, lookup_df, all_runs)
+        scnr_summaries[sba] = {SCNR_BASELINE: summarise_fwd_run(complete_runs['Zaks'], mngmnt_fwd)}
+        for wthr_scnr, mngmnt_scnr_nm in fwd_results:
+            if wthr_scnr is None and mngmnt_scnr_nm is None:
+                continue
 
-        # update GUI by activating the livestock and new Excel output files push buttons
-        # ==============================================================================
-        if not check_livestock_run_data(mgmt_dir, form.anml_prodn):
-            print('\nNo livestock to process')
+            complete_runs_scnr, mngmnt_scnr = fwd_results[(wthr_scnr, mngmnt_scnr_nm)]
+            if complete_runs_scnr is None:
+                continue
 
-        '''
-        if study.output_excel:
-            retrieve_output_xls_files(form, study.study_name)
-        '''
+            if wthr_scnr is None:
+                scnr, wthr_scnr_obj = mngmnt_scnr_nm, ora_weather
+            else:
+                scnr, wthr_scnr_obj = wthr_scnr, wthr_scnrs[wthr_scnr]
+
+            complete_run_scnr = complete_runs_scnr['Zaks']
+            scnr_summaries[sba][scnr] = summarise_fwd_run(complete_run_scnr, mngmnt_scnr)
+            if scnr not in all_runs_scnrs:
+                all_runs_scnrs[scnr] = {}
+            all_runs_scnrs[scnr][sba] = complete_run_scnr
+            farm_rslts['scnr_outputs'].append((sba, scnr, wthr_scnr_obj, complete_run_scnr, mngmnt_scnr))
+
+        farm_rslts['crop_models'][sba] = crop_model
+        farm_rslts['mngmnts_ss'][sba] = mngmnt_ss
+        farm_rslts['mngmnts_fwd'][sba] = mngmnt_fwd
+        farm_rslts['all_runs'][sba] = complete_runs['Zaks']
+        print()
+
+    return farm_rslts
+
+def merge_farm_results(farm_rslts_list, ora_subareas):
+    """
+    combine results of compute_farm for groups of subareas of the same farm; subareas are in the order of the farm
+    """
+    farm_rslts = {'all_runs': {}, 'all_runs_scnrs': {}, 'scnr_summaries': {}, 'crop_models': {}, 'mngmnts_ss': {},
+                                                                        'mngmnts_fwd': {}, 'scnr_outputs': []}
+    for rslts in farm_rslts_list:
+        for key in ['all_runs', 'scnr_summaries', 'crop_models', 'mngmnts_ss', 'mngmnts_fwd']:
+            farm_rslts[key].update(rslts[key])
+
+        for scnr in rslts['all_runs_scnrs']:
+            if scnr not in farm_rslts['all_runs_scnrs']:
+                farm_rslts['all_runs_scnrs'][scnr] = {}
+            farm_rslts['all_runs_scnrs'][scnr].update(rslts['all_runs_scnrs'][scnr])
+
+        farm_rslts['scnr_outputs'] += rslts['scnr_outputs']
+
+    sba_order = list(ora_subareas)
+    for key in ['all_runs', 'scnr_summaries', 'crop_models', 'mngmnts_ss', 'mngmnts_fwd']:
+        farm_rslts[key] = {sba: farm_rslts[key][sba] for sba in sba_order if sba in farm_rslts[key]}
+    for scnr in farm_rslts['all_runs_scnrs']:
+        runs_scnr = farm_rslts['all_runs_scnrs'][scnr]
+        farm_rslts['all_runs_scnrs'][scnr] = {sba: runs_scnr[sba] for sba in sba_order if sba in runs_scnr}
+    farm_rslts['scnr_outputs'].sort(key=lambda scnr_output: sba_order.index(scnr_output[0]))
+
+    return farm_rslts
+
+def record_farm_results(form, ora_weather, ora_subareas, farm_rslts):
+    """
+    bridge results to the livestock and economics models and to recalculation and optimisation functions
+    """
+    form.all_runs_output = dict(farm_rslts['all_runs'])
+    form.all_runs_crop_model = dict(farm_rslts['crop_models'])
+    form.all_runs_mngmnt_fwd = dict(farm_rslts['mngmnts_fwd'])
+    form.all_runs_scnrs = farm_rslts['all_runs_scnrs']
+    if len(farm_rslts['all_runs']) > 0:
+        form.crop_run = True
 
     # need these for subsequent functionality
     # =======================================
     form.ora_weather = ora_weather
     form.ora_subareas = ora_subareas
 
-    print('\nCarbon, Nitrogen and Soil Water model run complete after {} subareas processed\n'.format(len(all_runs)))
-    return 0
+    return
 
-def _amend_crop_mngmnt(crop_mngmnt, mnth_appl, ow_type, owex_amnt):
+def write_farm_outputs(form, study, ora_weather, farm_rslts, sbas=None):
     """
-    amend crop management organic waste application
+    write stage: Excel outputs, when requested, and comparison of forward run scenarios
+    sbas: optional list of subareas whose outputs are to be rewritten, outputs combining all subareas are then
+          rewritten only if the list is not empty
     """
-    crop_mngmnt_mod = copy(crop_mngmnt)
+    all_runs = farm_rslts['all_runs']
+    if len(all_runs) == 0 or (sbas is not None and len(sbas) == 0):
+        return
 
-    warn_flag = True
-    org_fert_mod = []
-    for imnth, ow_apl in enumerate(crop_mngmnt['org_fert']):
-        mnth = MNTH_NAMES_SHORT[imnth % 12]
-        if mnth == mnth_appl:
-            if ow_apl is None:
-                new_amt = owex_amnt
-            else:
-                new_amt = ow_apl['amount'] + owex_amnt
-                if ow_type != ow_apl['ow_type']:
-                    if warn_flag:
-                        print(WARN_STR + 'changing organic waste from ' + ow_apl['ow_type'] + ' to ' + ow_type)
-                        warn_flag = False
+    out_dir = form.settings['out_dir']
+    lookup_df = form.lookup_df
+    excel_out_flag = form.settings['write_excel']
+    if excel_out_flag:
+        for sba in all_runs:
+            if sbas is not None and sba not in sbas:
+                continue
 
-            ow_apl_new = {'ow_type': ow_type, 'amount': new_amt}
-        else:
-            ow_apl_new = ow_apl
+            for sba_scnr, scnr, wthr_scnr_obj, complete_run_scnr, mngmnt_scnr in farm_rslts['scnr_outputs']:
+                if sba_scnr == sba:
+                    generate_excel_outfiles(form.lggr, study, sba + ' ' + scnr, lookup_df, out_dir, wthr_scnr_obj,
+                                                        complete_run_scnr, farm_rslts['mngmnts_ss'][sba], mngmnt_scnr)
 
-        org_fert_mod.append(ow_apl_new)
+            generate_excel_outfiles(form.lggr, study, sba, lookup_df, out_dir, ora_weather, all_runs[sba],
+                                                farm_rslts['mngmnts_ss'][sba], farm_rslts['mngmnts_fwd'][sba])
 
-    crop_mngmnt_mod['org_fert'] = org_fert_mod
-    return crop_mngmnt_mod
+        write_excel_all_subareas(study, out_dir, lookup_df, all_runs)
+        for scnr in farm_rslts['all_runs_scnrs']:
+            write_excel_all_subareas(study, out_dir, lookup_df, farm_rslts['all_runs_scnrs'][scnr], scnr)
 
+    # compare forward run scenarios
+    # =============================
+    if len(farm_rslts['all_runs_scnrs']) > 0:
+        print_scenario_comparison(farm_rslts['scnr_summaries'])
+        write_excel_scenario_comparison(study, out_dir, farm_rslts['scnr_summaries'])
 
-def _abbrev_to_steady_state(carbon_change, nitrogen_change, soil_water, nmnths_ss):
+    return
+
+def run_soil_cn_algorithms(form, fwd_wthr_scnrs=None):
     """
-    abbreviate carbon, nitrogen and soil water objects to steady state only
+    retrieve weather and soil
+    fwd_wthr_scnrs: optional dictionary of forward run weather, each consisting of precip and tair lists, or the
+                    name of a weather resource from which the weather of the farm is extracted, keyed by scenario
+                    name e.g. ClimGen_A1B; these share the steady state of each subarea
+    forward run management scenarios are read from the run file and likewise share the steady state
+    the read, compute and write stages are separate functions so that batch runs can overlap them across farms
+    only subareas whose inputs have changed since the previous run are recomputed and rewritten, see ora_result_cache
+    NB return code convention is 0 for success, -1 for failure
     """
-    carbon_chng = CarbonChange()
-    for var_name in carbon_chng.var_name_list:
-        carbon_chng.data[var_name] = carbon_change.data[var_name][:nmnths_ss]
+    farm_inputs = read_farm_inputs(form)
+    if farm_inputs is None:
+        return -1
 
-    nitrogen_chng = NitrogenChange()
-    for var_name in nitrogen_chng.var_name_list:
-        nitrogen_chng.data[var_name] = nitrogen_change.data[var_name][:nmnths_ss]
+    ora_parms, study, ora_weather, ora_subareas = farm_inputs
+    fwd_wthr_scnrs = site_wthr_scnrs(form, fwd_wthr_scnrs, study.latitude, study.longitude)
 
-    soil_h2o_chng = SoilWaterChange()
-    for var_name in soil_h2o_chng.var_name_list:
-        soil_h2o_chng.data[var_name] = soil_water.data[var_name][:nmnths_ss]
+    # clear previously recorded outputs
+    # =================================
+    form.all_runs_output = {}
+    form.all_runs_crop_model = {}
+    form.all_runs_scnrs = {}
 
-    return carbon_chng, nitrogen_chng, soil_h2o_chng
+    # reuse results of unchanged subareas
+    # ==================================
+    out_dir = form.settings['out_dir']
+    result_cache = ResultCache(out_dir, study.study_name)
+    ntsteps_fwd = wthr_scnr_ntsteps(ora_subareas)
+    fingerprints = {sba: subarea_fingerprint(ora_parms, ora_weather, ora_subareas[sba], fwd_wthr_scnrs,
+                                                                    ntsteps_fwd=ntsteps_fwd) for sba in ora_subareas}
+    cached_rslts = result_cache.load(fingerprints)
+    sbas = [sba for sba in ora_subareas if sba not in cached_rslts]
+    if len(cached_rslts) > 0:
+        print('Reusing results of unchanged subareas: ' + ', '.join(cached_rslts))
+
+    farm_rslts_list = list(cached_rslts.values())
+    if len(sbas) > 0:
+        farm_rslts = compute_farm(ora_parms, ora_weather, ora_subareas, fwd_wthr_scnrs, form,
+                                                                    form.settings.get('max_workers'), sbas=sbas)
+        result_cache.store(farm_rslts, fingerprints)
+        farm_rslts_list.append(farm_rslts)
+
+    farm_rslts = merge_farm_results(farm_rslts_list, ora_subareas)
+    record_farm_results(form, ora_weather, ora_subareas, farm_rslts)
+
+    # rewrite outputs of recomputed subareas and of unchanged subareas whose outputs are missing
+    # ==========================================================================================
+    if form.settings['write_excel']:
+        sbas += [sba for sba in cached_rslts if result_cache.outputs_missing(sba)]
+    write_farm_outputs(form, study, ora_weather, farm_rslts, sbas)
+
+    # update GUI by activating the livestock and new Excel output files push buttons
+    # ==============================================================================
+    if len(farm_rslts['all_runs']) > 0:
+        if not check_livestock_run_data(form.settings['mgmt_dir'], form.anml_prodn):
+            print('\nNo livestock to process')
+
+        '''
+        if study.output_excel:
+            retrieve_output_xls_files(form, study.study_name)
+        '''
+
+    print('\nCarbon, Nitrogen and Soil Water model run complete after {} subareas processed\n'
+                                                                                .format(len(farm_rslts['all_runs'])))
+    return 0
+
+def _abbrev_to_steady_state(carbon_change, nitrogen_change, soil_water, nmnths_ss):
+    """
+    abbreviate carbon, nitrogen and soil water objects to steady state only or, more generally, to the first
+    nmnths_ss months e.g. to resume a forward run; values are shared with the original objects, not copied
+    """
+    return carbon_change.fork(nmnths_ss), nitrogen_change.fork(nmnths_ss), soil_water.fork(nmnths_ss)
 
 
 def recalc_fwd_soil_cn(form):
     """
     apply modified management to the forward run
     typically additional organic waste or irrigation
+    all increments of organic waste are evaluated together by the vectorised forward run
     """
     func_name = __prog__ + '\trecalc_fwd_soil_cn'
 
@@ -321,37 +564,108 @@ def recalc_fwd_soil_cn(form):
     owext_incr = (owex_max - owex_min) / nsteps
 
     mnth_appl = form.w_mnth_appl.currentText()
+    dose_grid = DoseGrid(ow_amnts=arange(owex_min, owex_max, owext_incr), mnths_appl=[mnth_appl],
+                                                                                            ow_types=[ow_type])
 
     # process each subarea
     # ====================
     all_runs_out = {}  # clear previously recorded outputs
+    dose_summaries = {}
     for sba in ora_subareas:
+        if sba not in all_runs_output:
+            continue
 
         nmnths_ss = len(ora_subareas[sba].crop_mngmnt_ss['fert_n'])
 
-        all_runs_out[sba] = {}
-
         carbon_change, nitrogen_change, soil_water = all_runs_output[sba]
         soil_vars = ora_subareas[sba].soil_for_area
-        pi_tonnes = carbon_change.data['c_pi_mnth']
         carbon_chng, nitrogen_chng, soil_h2o = _abbrev_to_steady_state(carbon_change,
                                                                        nitrogen_change, soil_water, nmnths_ss)
-        for owex_amnt in arange(owex_min, owex_max, owext_incr):
 
-            owext_str = str(round(owex_amnt, 3))
-            crop_mngmnt_fwd = _amend_crop_mngmnt(ora_subareas[sba].crop_mngmnt_fwd, mnth_appl, ow_type, owex_amnt)
+        dose_rspns = vector_forward_run(ora_parms, ora_weather, form.all_runs_mngmnt_fwd[sba], soil_vars,
+                                carbon_chng, nitrogen_chng, soil_h2o, form.all_runs_crop_model[sba], dose_grid)
+        if dose_rspns is None:
+            continue
+
+        # outputs only
+        # ============
+        all_runs_out[sba] = dose_rspns
+        dose_summaries[sba] = summarise_doses(dose_grid, dose_rspns)
+
+    print_scenario_comparison(dose_summaries)
+    print('\nForward run recalculation complete after {} increments processed\n'.format(dose_grid.ndoses))
+    return all_runs_out
 
-            mngmnt_fwd = MngmntSubarea(crop_mngmnt_fwd, ora_parms, pi_tonnes)
-            complete_run = _cn_forward_run(ora_parms, ora_weather, mngmnt_fwd, soil_vars, carbon_chng,
-                                           nitrogen_chng, soil_h2o)
-            carbon_chng, nitrogen_chng, soil_h2o = _abbrev_to_steady_state(carbon_chng,
-                                                                           nitrogen_chng, soil_h2o, nmnths_ss)
-            if complete_run is None:
+def _current_application(form, mngmnt_fwd):
+    """
+    month and type of organic waste selected in the GUI or, when headless, of the first organic waste application
+    of the forward run; None if there is neither
+    """
+    if hasattr(form, 'w_mnth_appl'):
+        return form.w_mnth_appl.currentText(), form.w_combo13.currentText()
+
+    for tstep, ow_apl in enumerate(mngmnt_fwd.org_fert):
+        if ow_apl is not None:
+            return MNTH_NAMES_SHORT[tstep % 12], ow_apl['ow_type']
+
+    return None
+
+def optimise_fwd_soil_cn(form, target='yld_n_lim', limits=None, owex_min=0.0, owex_max=10.0, mnths_appl=None,
+                                                                            ow_types=None, fert_n_bounds=None):
+    """
+    search organic waste amount, and optionally fertiliser N scaling, which maximise the target subject to limits
+    e.g. {'n2o_emiss': 5.0, 'no3_leach': 20.0}
+    months and organic waste types default to the current application, see _current_application, since each
+    combination requires its own search; pass lists of these, or SEARCH_ALL, to search them also
+    """
+    from ora_cn_optimise import OptimiseApplication     # scipy is only needed when optimising
+
+    ora_subareas = form.ora_subareas
+    all_runs_output = form.all_runs_output
+
+    if (owex_max - owex_min) <= 0:
+        print(ERROR_STR + ' maximum organic waste applied must exceed minimum')
+        return None
+
+    if mnths_appl is not None and SEARCH_ALL in mnths_appl:
+        mnths_appl = MNTH_NAMES_SHORT
+    if ow_types is not None and SEARCH_ALL in ow_types:
+        ow_types = list(form.ora_parms.ow_parms.keys())
+
+    # process each subarea
+    # ====================
+    optim_runs = {}
+    for sba in ora_subareas:
+        if sba not in all_runs_output:
+            continue
+
+        mngmnt_fwd = form.all_runs_mngmnt_fwd[sba]
+        mnths_sba, ow_types_sba = mnths_appl, ow_types
+        if mnths_sba is None or ow_types_sba is None:
+            current = _current_application(form, mngmnt_fwd)
+            if current is None:
+                print(WARN_STR + 'subarea ' + sba + ' has no organic waste application, specify month and type')
                 continue
+            if mnths_sba is None:
+                mnths_sba = [current[0]]
+            if ow_types_sba is None:
+                ow_types_sba = [current[1]]
+
+        print('\nOptimising application for subarea: ' + sba)
+        nmnths_ss = len(ora_subareas[sba].crop_mngmnt_ss['fert_n'])
+
+        carbon_change, nitrogen_change, soil_water = all_runs_output[sba]
+        carbon_chng, nitrogen_chng, soil_h2o = _abbrev_to_steady_state(carbon_change,
+                                                                       nitrogen_change, soil_water, nmnths_ss)
+
+        optimiser = OptimiseApplication(form.ora_parms, form.ora_weather, mngmnt_fwd,
+                                        ora_subareas[sba].soil_for_area, carbon_chng, nitrogen_chng, soil_h2o,
+                                        form.all_runs_crop_model[sba], target, limits, form.lggr)
+        best = optimiser.optimise(owex_min, owex_max, mnths_sba, ow_types_sba, fert_n_bounds)
+        if best is None:
+            continue
 
-            # outputs only
-            # ============
-            all_runs_out[sba][owext_str] = complete_run
+        optim_runs[sba] = {'best': best, 'trail': optimiser.trail}
 
-    print('\nForward run recalculation complete after {} increments processed\n'.format(nsteps))
-    return all_runs_out
+    print('\nOptimisation complete after {} subareas processed\n'.format(len(optim_runs)))
+    return optim_runs
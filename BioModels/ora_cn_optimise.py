@@ -0,0 +1,125 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_cn_optimise.py
+# Purpose:     search organic waste and fertiliser applications which maximise a forward run target
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   derivative free methods are used: bounded Brent for the organic waste amount or Nelder-Mead when the
+#   fertiliser N scaling is also searched; months of application and organic waste types are discrete so
+#   each combination has its own search, hence only those requested are searched, usually a single month and
+#   type. Limits e.g. on N2O or leaching are imposed by a penalty
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_cn_optimise.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from scipy.optimize import minimize_scalar, minimize
+
+from ora_cn_vector_model import DoseGrid, vector_forward_run
+from ora_cn_summary_fns import SUMMARY_METRICS
+
+PENALTY_WGHT = 1000.0   # penalty per unit of relative exceedance of a limit
+XATOL = 0.01            # tolerance on organic waste amount (t/ha)
+MAX_ITERS = 50
+
+WARN_STR = '*** Warning *** '
+ERROR_STR = '*** Error *** '
+
+class OptimiseApplication(object, ):
+    """
+    maximise a summary metric of the forward run, usually N limited yield or SOC change, for one subarea
+    """
+    def __init__(self, parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss,
+                                                        crop_model, target='yld_n_lim', limits=None, lggr=None):
+        """
+        limits is an optional dictionary of maximum values keyed by summary metric e.g. {'n2o_emiss': 5.0}
+        """
+        self.fwd_args = (parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss,
+                                                                                                        crop_model)
+        self.target = target
+        self.limits = {} if limits is None else limits
+        self.lggr = lggr
+        self.trail = []     # evaluation trail
+        self.cache = {}
+
+    def _log(self, mess):
+        """
+        print and, when a logger is available, record
+        """
+        print(mess)
+        if self.lggr is not None:
+            self.lggr.info(mess)
+
+    def evaluate(self, owex_amnt, mnth_appl, ow_type, fert_n_scale=1.0):
+        """
+        objective is the negated target plus penalties for exceeded limits; each evaluation is one forward run
+        """
+        key = (round(float(owex_amnt), 6), mnth_appl, ow_type, round(float(fert_n_scale), 6))
+        if key in self.cache:
+            return self.cache[key]['objective']
+
+        dose_grid = DoseGrid([key[0]], [mnth_appl], [ow_type], [key[3]])
+        dose_rspns = vector_forward_run(*self.fwd_args, dose_grid)
+        summary = {metric: float(dose_rspns[metric].flat[0]) for metric in SUMMARY_METRICS}
+
+        penalty = 0.0
+        for metric, limit in self.limits.items():
+            penalty += max(0.0, summary[metric] - limit) / max(abs(limit), 1.0)
+
+        objective = - summary[self.target] + PENALTY_WGHT * penalty
+        evaltn = {'owex_amnt': key[0], 'mnth_appl': mnth_appl, 'ow_type': ow_type, 'fert_n_scale': key[3],
+                                    'summary': summary, 'penalty': penalty, 'objective': objective}
+        self.cache[key] = evaltn
+        self.trail.append(evaltn)
+
+        mess = 'Evaluation {}\tOW: {} t/ha {} {}\tfert N scale: {}\t{}: {}'.format(len(self.trail), round(key[0], 3),
+                                mnth_appl, ow_type, round(key[3], 3), self.target, round(summary[self.target], 4))
+        if penalty > 0.0:
+            mess += '\tpenalty: {}'.format(round(penalty, 4))
+        self._log(mess)
+
+        return objective
+
+    def optimise(self, owex_min, owex_max, mnths_appl, ow_types, fert_n_bounds=None):
+        """
+        search each combination of month and organic waste type and return the best evaluation
+        fert_n_bounds: optional lower and upper fertiliser N scaling
+        """
+        if self.target not in SUMMARY_METRICS:
+            print(ERROR_STR + 'target ' + self.target + ' must be one of ' + ', '.join(SUMMARY_METRICS))
+            return None
+
+        pettmp = self.fwd_args[1].pettmp_fwd
+        if self.fwd_args[2].ntsteps > len(pettmp['precip']):
+            print(ERROR_STR + 'cannot optimise due to insuffient weather timesteps')
+            return None
+
+        for mnth_appl in mnths_appl:
+            for ow_type in ow_types:
+                if fert_n_bounds is None:
+                    minimize_scalar(self.evaluate, bounds=(owex_min, owex_max), method='bounded',
+                                    args=(mnth_appl, ow_type), options={'xatol': XATOL, 'maxiter': MAX_ITERS})
+                else:
+                    x0 = [(owex_min + owex_max) / 2, (fert_n_bounds[0] + fert_n_bounds[1]) / 2]
+                    minimize(lambda xvals: self.evaluate(xvals[0], mnth_appl, ow_type, xvals[1]), x0,
+                             method='Nelder-Mead', bounds=[(owex_min, owex_max), fert_n_bounds],
+                             options={'xatol': XATOL, 'maxfev': MAX_ITERS})
+
+        # prefer evaluations which satisfy all limits
+        # ===========================================
+        feasible = [evaltn for evaltn in self.trail if evaltn['penalty'] == 0.0]
+        if len(feasible) == 0:
+            print(WARN_STR + 'no application satisfies the limits, returning the least penalised')
+            feasible = self.trail
+
+        best = min(feasible, key=lambda evaltn: evaltn['objective'])
+
+        self._log('Best after {} evaluations\tOW: {} t/ha {} {}\tfert N scale: {}\t{}: {}'
+                  .format(len(self.trail), round(best['owex_amnt'], 3), best['mnth_appl'], best['ow_type'],
+                                round(best['fert_n_scale'], 3), self.target, round(best['summary'][self.target], 4)))
+        return best
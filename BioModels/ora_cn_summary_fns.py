@@ -0,0 +1,129 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_cn_summary_fns.py
+# Purpose:     summarise forward runs so that alternative scenarios can be compared
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   metrics are totals or changes over the forward run only
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_cn_summary_fns.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from numpy import array, zeros
+
+SCNR_BASELINE = 'Run file'    # forward run using the weather and management of the run file
+
+SUMMARY_METRICS = {'soc_chng': 'SOC change (t/ha)', 'co2_emiss': 'CO2-C emitted (t/ha)',
+                   'n2o_emiss': 'N2O-N emitted (kg/ha)', 'no3_leach': 'Nitrate-N leached (kg/ha)',
+                   'nh4_volat': 'Volatilised N (kg/ha)', 'yld_n_lim': 'N limited yield (t/ha/yr)',
+                   'fert_n': 'Fertiliser N applied (kg/ha)', 'ow_amnt': 'Organic waste applied (t/ha)',
+                   'irrig': 'Irrigation (mm)'}
+
+def grow_season_indices(crop_names):
+    """
+    return start and end indices of each growing season i.e. contiguous months with a crop
+    """
+    seasons = []
+    indx_strt = None
+    for tstep, crop_name in enumerate(crop_names):
+        if crop_name is None:
+            if indx_strt is not None:
+                seasons.append((indx_strt, tstep))
+                indx_strt = None
+        elif indx_strt is None:
+            indx_strt = tstep
+
+    if indx_strt is not None:
+        seasons.append((indx_strt, len(crop_names)))
+
+    return seasons
+
+def n_lim_yield(crop_names, crop_defns, n_crop_dem, n_crop_dem_adj, nyears):
+    """
+    mean annual N limited yield, as in CropProdModel.record_values, i.e. typical yield scaled by adjusted
+    cumulative N uptake for each growing season
+    the N demand arrays can have leading dimensions e.g. one for each dose of a perturbation matrix
+    """
+    n_crop_dem = array(n_crop_dem, dtype=float)
+    n_crop_dem_adj = array(n_crop_dem_adj, dtype=float)
+
+    yld_n_lim = zeros(n_crop_dem.shape[:-1])
+    ncrop_defns = len(crop_defns)
+    if ncrop_defns == 0 or nyears == 0:
+        return yld_n_lim
+
+    for icrp, (indx_strt, indx_end) in enumerate(grow_season_indices(crop_names)):
+        cml_n_uptk = n_crop_dem[..., indx_strt:indx_end].sum(axis=-1)
+        cml_n_uptk_adj = n_crop_dem_adj[..., indx_strt:indx_end].sum(axis=-1)
+        yld_typ = crop_defns[icrp % ncrop_defns].yield_typ
+        safe_uptk = cml_n_uptk + (cml_n_uptk == 0)     # avoid division by zero when there is no uptake
+        yld_n_lim += yld_typ * (cml_n_uptk > 0) * cml_n_uptk_adj / safe_uptk
+
+    return yld_n_lim / nyears
+
+def _mngmnt_totals(mngmnt):
+    """
+    total fertiliser N, organic waste and irrigation applied
+    """
+    fert_n = sum([fert['fert_n'] for fert in mngmnt.fert_n if fert is not None])
+    ow_amnt = sum([ow_apl['amount'] for ow_apl in mngmnt.org_fert if ow_apl is not None])
+    irrig = sum(mngmnt.irrig)
+
+    return fert_n, ow_amnt, irrig
+
+def summarise_fwd_run(complete_run, mngmnt_fwd):
+    """
+    complete run comprises carbon, nitrogen and soil water objects spanning steady state and forward run
+    """
+    carbon_change, nitrogen_change, soil_water = complete_run
+    nfwd = mngmnt_fwd.ntsteps
+    c_data = carbon_change.data
+    n_data = nitrogen_change.data
+
+    # leached nitrate is adjusted for other losses in the same way as denitrified nitrate
+    # ==================================================================================
+    no3_leach = sum([leach * adj_rat for leach, adj_rat in zip(n_data['no3_leach'][-nfwd:],
+                                                                         n_data['loss_adj_rat_no3'][-nfwd:])])
+    n2o_emiss = sum(n_data['n2o_emiss_denit'][-nfwd:]) + sum(n_data['n2o_emiss_nitrif'][-nfwd:])
+
+    crop_names = n_data['crop_name'][-nfwd:]
+    yld_n_lim = n_lim_yield(crop_names, mngmnt_fwd.crop_defns, n_data['n_crop_dem'][-nfwd:],
+                                                                n_data['n_crop_dem_adj'][-nfwd:], mngmnt_fwd.nyears)
+    fert_n, ow_amnt, irrig = _mngmnt_totals(mngmnt_fwd)
+
+    summary = {'soc_chng': c_data['tot_soc_simul'][-1] - c_data['tot_soc_simul'][-nfwd - 1],
+               'co2_emiss': sum(c_data['co2_emiss'][-nfwd:]),
+               'n2o_emiss': n2o_emiss,
+               'no3_leach': no3_leach,
+               'nh4_volat': sum(n_data['nh4_volat_adj'][-nfwd:]),
+               'yld_n_lim': float(yld_n_lim),
+               'fert_n': fert_n, 'ow_amnt': ow_amnt, 'irrig': irrig}
+
+    return summary
+
+def print_scenario_comparison(scnr_summaries):
+    """
+    scnr_summaries is a dictionary of scenario summaries keyed by subarea
+    """
+    wdth_scnr = 16
+    wdth_val = 12
+    for sba in scnr_summaries:
+        print('\nComparison of forward run scenarios for subarea: ' + sba)
+        line = 'Scenario'.ljust(wdth_scnr)
+        for metric in SUMMARY_METRICS:
+            line += metric.rjust(wdth_val)
+        print(line)
+
+        for scnr, summary in scnr_summaries[sba].items():
+            line = scnr[:wdth_scnr - 1].ljust(wdth_scnr)
+            for metric in SUMMARY_METRICS:
+                line += '{:12.3f}'.format(summary[metric])
+            print(line)
+
+    return
@@ -0,0 +1,424 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_cn_vector_model.py
+# Purpose:     forward run of the carbon, nitrogen and soil water models for a grid of management perturbations
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   each dose of the perturbation grid is an element of a batch axis so that one pass through the monthly
+#   time loop evaluates every dose; equations follow fns run_rothc and soil_nitrogen with min, max and exp
+#   replaced by their numpy equivalents, functions of the scalar model which are free of these are called directly
+#   tests/test_ora_cn_vector_model.py checks each dose against a scalar forward run so any change to the equations
+#   of either model must be made to both
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_cn_vector_model.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from calendar import monthrange, month_abbr
+from itertools import product
+from numpy import array, zeros, ones, exp, arctan, minimum, maximum, where
+
+from ora_cn_fns import (get_soil_vars, get_values_for_tstep, get_crop_vars, inert_organic_carbon, GDDS_SCLE_FACTR,
+                        IWS_SCLE_FACTR)
+from ora_no3_nh4_fns import get_n_parameters, get_rate_inhibit, soil_nitrogen_supply, n2o_lost_nitrif
+from ora_water_model import get_soil_water_constants, WAT_STRSS_INDX_DFLT
+from ora_rothc_fns import K_DPM, K_RPM, K_BIO, K_HUM
+from ora_cn_summary_fns import n_lim_yield, SUMMARY_METRICS
+from ora_segmented_list import SegmentedList
+
+MNTH_NAMES_SHORT = [mnth for mnth in month_abbr[1:]]
+
+DOSE_AXES = ('ow_amnt', 'mnth_appl', 'ow_type', 'fert_n_scale', 'irrig_scale')
+DOSE_INPT_VARS = ('irrig', 'nh4_inorg_fert', 'ow_amnt', 'cow', 'nh4_ow_fert',
+                                                                    'c_n_rat_ow', 'prop_iom_ow', 'rat_dpm_hum_ow')
+N_DENITR_DAY_MAX = 0.2      # as in ora_no3_nh4_fns
+
+WARN_STR = '*** Warning *** '
+ERROR_STR = '*** Error *** '
+
+class DoseGrid(object, ):
+    """
+    perturbations of the forward run management
+    """
+    def __init__(self, ow_amnts=(0.0,), mnths_appl=(None,), ow_types=(None,), fert_n_scales=(1.0,),
+                                                                                            irrig_scales=(1.0,)):
+        """
+        each axis is a sequence of values, doses comprise every combination of axis values
+            ow_amnts:       extra organic waste (t/ha) added in the month of application of each year
+            mnths_appl:     month of application e.g. Mar, None leaves organic waste unchanged
+            ow_types:       organic waste type of the extra application
+            fert_n_scales:  multipliers for the fertiliser N of each application
+            irrig_scales:   multipliers for the irrigation of each month
+        """
+        self.axes = {'ow_amnt': list(ow_amnts), 'mnth_appl': list(mnths_appl), 'ow_type': list(ow_types),
+                     'fert_n_scale': list(fert_n_scales), 'irrig_scale': list(irrig_scales)}
+
+        self.shape = tuple([len(self.axes[axis]) for axis in DOSE_AXES])
+        self.doses = list(product(*[self.axes[axis] for axis in DOSE_AXES]))
+        self.ndoses = len(self.doses)
+
+    def dose_label(self, idose):
+        """
+        concatenate values of the axes which vary
+        """
+        vals = []
+        for axis, val in zip(DOSE_AXES, self.doses[idose]):
+            if len(self.axes[axis]) > 1:
+                if isinstance(val, float):
+                    val = round(val, 3)
+                vals.append(str(val))
+
+        if len(vals) == 0:
+            return 'dose ' + str(idose)
+
+        return ' '.join(vals)
+
+def amend_org_fert(org_fert, mnth_appl, ow_type, owex_amnt):
+    """
+    amend organic waste applications - previously _amend_crop_mngmnt in ora_cn_model
+    """
+    if mnth_appl is None:
+        return org_fert
+
+    warn_flag = True
+    org_fert_mod = []
+    for imnth, ow_apl in enumerate(org_fert):
+        mnth = MNTH_NAMES_SHORT[imnth % 12]
+        if mnth == mnth_appl:
+            if ow_apl is None:
+                new_amt = owex_amnt
+            else:
+                new_amt = ow_apl['amount'] + owex_amnt
+                if ow_type != ow_apl['ow_type']:
+                    if warn_flag:
+                        print(WARN_STR + 'changing organic waste from ' + ow_apl['ow_type'] + ' to ' + ow_type)
+                        warn_flag = False
+
+            ow_apl_new = {'ow_type': ow_type, 'amount': new_amt}
+        else:
+            ow_apl_new = ow_apl
+
+        org_fert_mod.append(ow_apl_new)
+
+    return org_fert_mod
+
+def _dose_inputs(parameters, mngmnt, dose_grid):
+    """
+    irrigation, fertiliser and organic waste inputs for each dose and timestep i.e. arrays of shape ndoses x ntsteps
+    """
+    ow_parms = parameters.ow_parms
+    ntsteps = mngmnt.ntsteps
+
+    irrig_base = array(mngmnt.irrig[:ntsteps], dtype=float)
+    fert_n_base = array([0.0 if fert is None else fert['fert_n'] for fert in mngmnt.fert_n[:ntsteps]])
+
+    dose_inpts = {var: zeros((dose_grid.ndoses, ntsteps)) for var in DOSE_INPT_VARS}
+    for idose, (owex_amnt, mnth_appl, ow_type_appl, fert_n_scale, irrig_scale) in enumerate(dose_grid.doses):
+        dose_inpts['irrig'][idose] = irrig_scale * irrig_base
+        dose_inpts['nh4_inorg_fert'][idose] = fert_n_scale * fert_n_base
+
+        org_fert = amend_org_fert(mngmnt.org_fert, mnth_appl, ow_type_appl, owex_amnt)
+        for tstep, ow_apl in enumerate(org_fert[:ntsteps]):
+            if ow_apl is None:
+                ow_type = 'Fresh waste'
+                amount = 0
+            else:
+                ow_type = ow_apl['ow_type']
+                amount = ow_apl['amount']
+
+            dose_inpts['ow_amnt'][idose, tstep] = amount
+            dose_inpts['cow'][idose, tstep] = amount * ow_parms[ow_type]['pcnt_c']
+            dose_inpts['nh4_ow_fert'][idose, tstep] = amount * ow_parms[ow_type]['pcnt_urea']
+            dose_inpts['c_n_rat_ow'][idose, tstep] = ow_parms[ow_type]['c_n_rat']
+            dose_inpts['prop_iom_ow'][idose, tstep] = ow_parms[ow_type]['prop_iom_ow']
+            dose_inpts['rat_dpm_hum_ow'][idose, tstep] = ow_parms[ow_type]['rat_dpm_hum_ow']
+
+    return dose_inpts
+
+def _npp_zaks_ratio(management, pettmp, crop_model, wat_strss_indx, tstep):
+    """
+    ratio of Zaks NPP for this month to that of the steady state, see fns run_rothc and add_npp_zaks_by_month
+    wat_strss_indx comprises steady state values followed by arrays for each forward timestep
+    """
+    if management.pi_props[tstep] > 0.0:
+        tgdd = pettmp['grow_dds'][tstep]
+        npp = (0.0396 / (1 + exp(6.33 - 1.5 * (tgdd / GDDS_SCLE_FACTR)))) * (39.58 * wat_strss_indx[tstep] - 14.52)
+        npp_atyp = IWS_SCLE_FACTR * maximum(0, npp)  # (eq.3.2.1)
+    else:
+        npp_atyp = 0.0
+
+    try:
+        npp_typ = crop_model.data['npp_zaks'][tstep]
+    except IndexError:
+        npp_typ = 0
+
+    if npp_typ == 0:
+        return 1.0
+
+    return npp_atyp / npp_typ
+
+def _rate_mod(tair, pH, salinity, wc_fld_cap, wc_pwp, wc_tstep):
+    """
+    see fn get_rate_temp
+    """
+    tair = max(-15, tair)
+    rate_temp = 47.91 / (1.0 + exp(106.06 / (tair + 18.27)))  # (eq.2.1.3)
+    rate_moisture = minimum(1.0, 1.0 - (0.8 * (wc_fld_cap - wc_tstep)) / (wc_fld_cap - wc_pwp))  # (eq.2.1.4)
+    rate_ph = 0.56 + (arctan(3.14 * 0.45 * (pH - 5.0))) / 3.14  # (eq.2.1.5)
+    rate_salinity = exp(-0.09 * salinity)  # (eq.2.1.6)
+
+    return rate_temp * rate_moisture * rate_ph * rate_salinity
+
+def _loss_adjustment_ratio(n_start, n_sum_inputs, n_sum_losses):
+    """
+    see fn loss_adjustment_ratio (eq.2.4.1)
+    """
+    n_avail = n_start + n_sum_inputs
+    no_adj = n_sum_losses <= n_avail
+
+    return where(no_adj, 1.0, n_avail / where(no_adj, 1.0, n_sum_losses))
+
+def _prop_n_opt(soil_n_sply, nut_n_fert, nut_n_min, nut_n_opt):
+    """
+    see fn prop_n_opt_from_soil_n_supply (eq.3.3.1)
+    """
+    denom = nut_n_opt - nut_n_min
+    if denom == 0.0:
+        prop_n_opt = 0.5 * ones(soil_n_sply.shape)
+    else:
+        prop_n_opt = (soil_n_sply + nut_n_fert - nut_n_min) / denom
+
+    return maximum(minimum(prop_n_opt, 1), 0)
+
+def _no3_denitrific(days_in_mnth, t_depth, wat_soil, wc_pwp, wc_fld_cap, co2_aerobic_decomp, no3_avail, n_d50):
+    """
+    see fn no3_denitrific - returns denitrified N and proportions of N2 according to soil water and soil nitrate-N
+    """
+    no3_d50 = n_d50 * t_depth
+    n_denit_max = minimum(no3_avail, N_DENITR_DAY_MAX * days_in_mnth * (t_depth / 5))  # (eq.2.4.9)
+    rate_denit_no3 = no3_avail / (no3_d50 + no3_avail)  # (eq.2.4.10)
+
+    sigma_c = wat_soil - wc_pwp
+    sigma_f = wc_fld_cap - wc_pwp
+    prop_n2_wat = 0.5 * (sigma_c / sigma_f)  # (eq.2.4.14)
+    prop_n2_no3 = 1 - no3_avail / (40 * t_depth + no3_avail)  # (eq.2.4.15)
+
+    rate_denit_moist = minimum(1, ((abs((sigma_c / sigma_f) - 0.62)) / 0.38) ** 1.74)  # (eq.2.4.11)
+    rate_denit_bio = minimum(1, co2_aerobic_decomp * 0.1)  # (eq.2.4.12)
+
+    n_denit = n_denit_max * rate_denit_no3 * rate_denit_moist * rate_denit_bio  # (eq.2.4.8)
+
+    return n_denit, prop_n2_wat, prop_n2_no3
+
+def _no3_nh4_crop_uptake(prop_n_opt, n_crop_dem, no3_avail, nh4_avail, pi_tonnes):
+    """
+    see fn no3_nh4_crop_uptake
+    """
+    if pi_tonnes == 0:
+        n_zeros = zeros(prop_n_opt.shape)
+        return n_zeros, n_zeros, n_zeros
+
+    n_crop_dem_adj = prop_n_opt * n_crop_dem  # (eq.2.4.17)
+    no3_crop_dem = n_crop_dem * (no3_avail / (no3_avail + nh4_avail))  # (eq.2.4.18)
+    nh4_crop_dem = n_crop_dem * (nh4_avail / (no3_avail + nh4_avail))  # (eq.2.4.26)
+
+    return n_crop_dem_adj, no3_crop_dem, nh4_crop_dem
+
+def vector_forward_run(parameters, weather, mngmnt_fwd, soil_vars, c_change_ss, n_change_ss, soil_water_ss,
+                                                                            crop_model, dose_grid, npp_model='Zaks'):
+    """
+    forward run of RothC and the nitrogen model for every dose of the grid together
+    state variables are arrays with one element per dose which start from the end of the steady state
+    returns a dictionary of arrays, each with the shape of the dose grid, keyed by summary metric
+    """
+    pettmp = weather.pettmp_fwd
+    ntsteps = mngmnt_fwd.ntsteps
+    if ntsteps > len(pettmp['precip']):
+        print(ERROR_STR + 'cannot proceed with vectorised forward run due to insuffient weather timesteps')
+        return None
+
+    ndoses = dose_grid.ndoses
+    n_parms = parameters.n_parms
+    dose_inpts = _dose_inputs(parameters, mngmnt_fwd, dose_grid)
+
+    t_depth, dum, t_pH_h2o, t_salinity, dum, prop_hum, prop_bio, prop_co2 = get_soil_vars(soil_vars)
+    no3_atmos, nh4_atmos, k_nitrif, min_no3_nh4, n_d50, c_n_rat_soil, precip_critic, prop_volat = \
+                                                                                            get_n_parameters(n_parms)
+    rate_inhibit = get_rate_inhibit(mngmnt_fwd, parameters)
+
+    # carbon, soil water and nitrogen at the end of the steady state are common to all doses
+    # ======================================================================================
+    ones_dose = ones(ndoses)
+    pool_c_dpm, pool_c_rpm, pool_c_bio, pool_c_hum, pool_c_iom, c_input_bio, c_input_hum, \
+        c_loss_dpm, c_loss_rpm, c_loss_hum, c_loss_bio, tot_soc = \
+                                            [val * ones_dose for val in c_change_ss.get_last_tstep_pools()]
+    tot_soc_ss = c_change_ss.data['tot_soc_simul'][-1]
+
+    wc_t0 = soil_water_ss.data['wat_soil'][-1] * ones_dose
+    aet_prev = soil_water_ss.data['aet'][-1] * ones_dose
+    wat_strss_indx = SegmentedList(soil_water_ss.data['wat_strss_indx'])
+
+    no3_start = n_change_ss.data['no3_end'][-1] * ones_dose
+    nh4_start = n_change_ss.data['nh4_end'][-1] * ones_dose
+    c_n_rat_dpm_prev = n_change_ss.data['c_n_rat_dpm'][-1] * ones_dose
+    c_n_rat_rpm_prev = n_change_ss.data['c_n_rat_rpm'][-1] * ones_dose
+    c_n_rat_hum_prev = n_change_ss.data['c_n_rat_hum'][-1] * ones_dose
+    pool_c_dpm_prev, pool_c_rpm_prev, pool_c_hum_prev = pool_c_dpm, pool_c_rpm, pool_c_hum
+
+    co2_emiss_sum, n2o_emiss_sum, no3_leach_sum, nh4_volat_sum = [zeros(ndoses) for ic in range(4)]
+    n_crop_dems, n_crop_dems_adj = [], []
+
+    # main temporal loop
+    # ==================
+    for tstep in range(ntsteps):
+        imnth = tstep % 12 + 1
+        dummy, days_in_mnth = monthrange(2011, imnth)   # use 2011 as this is not a leap year
+
+        tair, precip, pet_prev, pet, dum, c_pi_mnth, dum, rat_dpm_rpm, dum, dum, dum, max_root_dpth, dum = \
+                                            get_values_for_tstep(pettmp, mngmnt_fwd, parameters, t_depth, tstep)
+        irrig = dose_inpts['irrig'][:, tstep]
+        cow = dose_inpts['cow'][:, tstep]
+        c_n_rat_ow = dose_inpts['c_n_rat_ow'][:, tstep]
+        prop_iom_ow = dose_inpts['prop_iom_ow'][:, tstep]
+        rat_dpm_hum_ow = dose_inpts['rat_dpm_hum_ow'][:, tstep]
+        nh4_ow_fert = dose_inpts['nh4_ow_fert'][:, tstep]
+        nh4_inorg_fert = dose_inpts['nh4_inorg_fert'][:, tstep]
+
+        # soil water (eq.2.2.14) and water stress index (eq.3.2.3)
+        # ========================================================
+        wc_fld_cap, wc_pwp, pcnt_c = get_soil_water_constants(soil_vars, n_parms, tot_soc)
+        wc_t1 = maximum(wc_pwp, minimum(wc_t0 + precip - pet + irrig, wc_fld_cap))
+        if pet_prev > 0.0:
+            wat_strss_indx.append(aet_prev / pet_prev)
+        else:
+            wat_strss_indx.append(WAT_STRSS_INDX_DFLT * ones_dose)
+        aet_prev = minimum(min(pet_prev, 5 * days_in_mnth), wc_t1 - wc_pwp)
+
+        if npp_model == 'Zaks':
+            c_pi_mnth = c_pi_mnth * _npp_zaks_ratio(mngmnt_fwd, pettmp, crop_model, wat_strss_indx, tstep)
+
+        # RothC pools
+        # ===========
+        rate_mod = _rate_mod(tair, t_pH_h2o, t_salinity, wc_fld_cap, wc_pwp, wc_t1)
+        pi_to_dpm = c_pi_mnth * rat_dpm_rpm / (1.0 + rat_dpm_rpm)  # (eq.2.1.10)
+        cow_to_dpm = cow * rat_dpm_hum_ow * (1.0 - prop_iom_ow) / (1 + rat_dpm_hum_ow)  # (eq.2.1.12)
+        pool_c_dpm = maximum(0, pool_c_dpm + pi_to_dpm + cow_to_dpm - c_loss_dpm)
+
+        pi_to_rpm = c_pi_mnth * 1.0 / (1.0 + rat_dpm_rpm)  # (eq.2.1.11)
+        pool_c_rpm = pool_c_rpm + pi_to_rpm - c_loss_rpm
+
+        pool_c_bio = pool_c_bio + c_input_bio - c_loss_bio
+
+        cow_to_hum = cow * (1 - prop_iom_ow) / (1 + rat_dpm_hum_ow)  # (eq.2.1.13)
+        pool_c_hum = pool_c_hum + cow_to_hum + c_input_hum - c_loss_hum
+
+        pool_c_iom = pool_c_iom + inert_organic_carbon(prop_iom_ow, cow)
+
+        # carbon losses (eq.2.1.2)
+        # ========================
+        c_loss_dpm = pool_c_dpm * (1.0 - exp(-K_DPM * rate_mod))
+        c_loss_rpm = pool_c_rpm * (1.0 - exp(-K_RPM * rate_mod))
+        c_loss_bio = pool_c_bio * (1.0 - exp(-K_BIO * rate_mod))
+        c_loss_hum = pool_c_hum * (1.0 - exp(-K_HUM * rate_mod))
+        c_loss_total = c_loss_dpm + c_loss_rpm + c_loss_hum + c_loss_bio
+
+        c_input_bio = prop_bio * c_loss_total
+        c_input_hum = prop_hum * c_loss_total
+        co2_emiss = prop_co2 * c_loss_total
+
+        tot_soc = pool_c_dpm + pool_c_rpm + pool_c_bio + pool_c_hum + pool_c_iom
+
+        # soil nitrogen supply, equs 3.3.7 to 3.3.12
+        # ==========================================
+        crop_name, nut_n_min, n_crop_dem, n_respns_coef, c_n_rat_pi = \
+                                                            get_crop_vars(mngmnt_fwd, parameters.crop_vars, tstep)
+        soil_n_sply, n_release, n_adjust, c_n_rat_dpm, c_n_rat_rpm, c_n_rat_hum = \
+            soil_nitrogen_supply(prop_hum, prop_bio, prop_co2, c_n_rat_pi, c_n_rat_ow, c_n_rat_soil,
+                                    cow_to_dpm, pi_to_dpm, pool_c_dpm_prev, c_loss_dpm, c_n_rat_dpm_prev,
+                                                pi_to_rpm, pool_c_rpm_prev, c_loss_rpm, c_n_rat_rpm_prev,
+                                    cow_to_hum,            pool_c_hum_prev, c_loss_hum, c_n_rat_hum_prev, c_loss_bio)
+
+        prop_n_opt = _prop_n_opt(soil_n_sply, nh4_ow_fert + nh4_inorg_fert, nut_n_min, n_crop_dem)
+
+        # ammonium inputs and nitrification (eqs.2.4.21 to 2.4.23)
+        # ========================================================
+        nh4_miner = maximum(soil_n_sply, 0)
+        nh4_immob = minimum(- minimum(soil_n_sply, 0), min_no3_nh4)
+        nh4_total_inp = nh4_inorg_fert + nh4_miner + nh4_atmos
+        nh4_nitrif = minimum(nh4_total_inp * (1 - exp(-k_nitrif * rate_mod * rate_inhibit)),
+                                                                                    nh4_total_inp - min_no3_nh4)
+
+        no3_total_inp = no3_atmos + nh4_nitrif
+        no3_avail = no3_start + no3_total_inp
+        nh4_avail = nh4_start + nh4_total_inp
+        n_crop_dem_adj, no3_crop_dem, nh4_crop_dem = _no3_nh4_crop_uptake(prop_n_opt, n_crop_dem, no3_avail,
+                                                                        nh4_avail, mngmnt_fwd.pi_tonnes[tstep])
+
+        # nitrate losses
+        # ==============
+        no3_immob = minimum(- minimum(soil_n_sply - nh4_immob, 0), min_no3_nh4)  # (eq.2.4.5)
+        precip_n = pettmp['precip'][tstep]
+        pet_n = pettmp['pet'][tstep]
+        wat_drain = maximum((precip_n - pet_n) - (wc_fld_cap - wc_t0), 0)  # (eq.2.4.7)
+        no3_leach = ((no3_start + no3_total_inp - min_no3_nh4) / (wc_t0 + precip_n - pet_n)) * wat_drain
+
+        no3_denit, prop_n2_wat, prop_n2_no3 = _no3_denitrific(days_in_mnth, t_depth, wc_t1, wc_pwp, wc_fld_cap,
+                                                                                    co2_emiss, no3_avail, n_d50)
+
+        no3_total_loss = no3_immob + no3_leach + no3_denit + no3_crop_dem
+        loss_adj_rat_no3 = _loss_adjustment_ratio(no3_start, no3_total_inp, no3_total_loss)
+        no3_end = no3_start + no3_total_inp - loss_adj_rat_no3 * no3_total_loss
+        n2o_emiss_denit = (1.0 - (prop_n2_wat * prop_n2_no3)) * no3_denit * loss_adj_rat_no3  # (eq.2.4.13)
+
+        # ammonium losses
+        # ===============
+        if precip_n < precip_critic:
+            nh4_volat = prop_volat * (nh4_ow_fert + nh4_inorg_fert)  # (eq.2.4.25)
+        else:
+            nh4_volat = zeros(ndoses)
+        nh4_total_loss = nh4_immob + nh4_nitrif + nh4_volat + nh4_crop_dem
+        loss_adj_rat_nh4 = _loss_adjustment_ratio(nh4_start, nh4_total_inp, nh4_total_loss)
+        nh4_end = nh4_start + nh4_total_inp - loss_adj_rat_nh4 * nh4_total_loss
+        n2o_emiss_nitrif = n2o_lost_nitrif(nh4_nitrif, wc_t1, wc_fld_cap, n_parms)
+
+        # accumulate forward run totals
+        # =============================
+        co2_emiss_sum += co2_emiss
+        n2o_emiss_sum += n2o_emiss_denit + n2o_emiss_nitrif
+        no3_leach_sum += no3_leach * loss_adj_rat_no3
+        nh4_volat_sum += nh4_volat * loss_adj_rat_nh4
+        n_crop_dems.append(n_crop_dem * ones_dose)
+        n_crop_dems_adj.append(n_crop_dem_adj)
+
+        pool_c_dpm_prev, pool_c_rpm_prev, pool_c_hum_prev = pool_c_dpm, pool_c_rpm, pool_c_hum
+        c_n_rat_dpm_prev, c_n_rat_rpm_prev, c_n_rat_hum_prev = c_n_rat_dpm, c_n_rat_rpm, c_n_rat_hum
+
+        wc_t0 = wc_t1
+        no3_start = no3_end
+        nh4_start = nh4_end
+
+    yld_n_lim = n_lim_yield(mngmnt_fwd.crop_names[:ntsteps], mngmnt_fwd.crop_defns, array(n_crop_dems).T,
+                                                                    array(n_crop_dems_adj).T, mngmnt_fwd.nyears)
+
+    dose_rspns = {'soc_chng': tot_soc - tot_soc_ss, 'co2_emiss': co2_emiss_sum, 'n2o_emiss': n2o_emiss_sum,
+                  'no3_leach': no3_leach_sum, 'nh4_volat': nh4_volat_sum, 'yld_n_lim': yld_n_lim,
+                  'fert_n': dose_inpts['nh4_inorg_fert'].sum(axis=1), 'ow_amnt': dose_inpts['ow_amnt'].sum(axis=1),
+                  'irrig': dose_inpts['irrig'].sum(axis=1)}
+
+    return {metric: dose_rspns[metric].reshape(dose_grid.shape) for metric in dose_rspns}
+
+def summarise_doses(dose_grid, dose_rspns):
+    """
+    convert dose response arrays to summaries keyed by dose label, as used in fn print_scenario_comparison
+    """
+    dose_summaries = {}
+    for idose in range(dose_grid.ndoses):
+        summary = {metric: float(dose_rspns[metric].flat[idose]) for metric in SUMMARY_METRICS}
+        dose_summaries[dose_grid.dose_label(idose)] = summary
+
+    return dose_summaries
@@ -0,0 +1,83 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_cyclic_series.py
+# Purpose:     series of monthly weather which repeats its source
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   used when weather is stretched or truncated to the length of a simulation: values are read from the source
+#   modulo its length so that nothing is copied however long the simulation; values derived from weather,
+#   e.g. PET and growing degree days, can be computed once for the source and viewed in the same way
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_cyclic_series.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from collections.abc import Sequence
+
+def cyclic_weather(pettmp, nmnths, offset=0):
+    """
+    view each metric of a dictionary of weather with the given number of months
+    """
+    return {metric: CyclicSeries(pettmp[metric], nmnths, offset) for metric in pettmp}
+
+def source_years(series):
+    """
+    source of a cyclic series which starts at the beginning of a year of its source and whose source consists of
+    complete years, otherwise None
+    """
+    if isinstance(series, CyclicSeries) and len(series.source) % 12 == 0 and series.offset % 12 == 0:
+        return series.source
+
+    return None
+
+class CyclicSeries(Sequence):
+    """
+    read only; the source must not be altered while viewed
+    """
+    def __init__(self, source, nvals, offset=0):
+        """
+        value indx is that of the source at offset + indx modulo the length of the source
+        """
+        if isinstance(source, CyclicSeries):
+            offset += source.offset     # avoid chains of views
+            source = source.source
+
+        if len(source) == 0 and nvals > 0:
+            raise ValueError('CyclicSeries source is empty')
+
+        self.source = source
+        self.nvals = nvals
+        self.offset = offset % len(source) if len(source) > 0 else 0
+
+    def __len__(self):
+        return self.nvals
+
+    def __getitem__(self, indx):
+        if isinstance(indx, slice):
+            return [self[jndx] for jndx in range(*indx.indices(self.nvals))]
+
+        if indx < 0:
+            indx += self.nvals
+        if indx < 0 or indx >= self.nvals:
+            raise IndexError('CyclicSeries index out of range')
+
+        return self.source[(self.offset + indx) % len(self.source)]
+
+    def __iter__(self):
+        nsrc = len(self.source)
+        for indx in range(self.nvals):
+            yield self.source[(self.offset + indx) % nsrc]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
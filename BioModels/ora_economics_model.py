@@ -176,6 +176,9 @@ def test_economics_algorithms(form):
     mgmt_dir = form.settings['mgmt_dir']
     econ_xls_fname = normpath(join(mgmt_dir, FNAME_ECONOMICS))
     if not isfile(econ_xls_fname):
+        if form.settings.get('econ_xls_fn') is None:
+            print(WARN_STR + 'economics model not run - economics template file not found during set up')
+            return -1
         try:
             copyfile(form.settings['econ_xls_fn'], econ_xls_fname)
         except (FileNotFoundError, KeyError) as err:
@@ -16,12 +16,14 @@ __version__ = '0.0.0'
 #
 from os.path import isfile, join, isdir, normpath, split
 from os import mkdir
-from PyQt5.QtWidgets import QApplication
 from calendar import month_abbr
 from time import time
 import sys
 
-from thornthwaite import thornthwaite
+from numpy import array, float64
+
+from ora_progress_fns import report_progress
+from ora_water_model import thornthwaite_pet
 
 MNTH_NAMES_SHORT = [mnth for mnth in month_abbr[1:]]
 KEYS = ['Initiation', 'Plant inputs', 'DPM carbon', 'RPM carbon', 'BIO carbon', 'HUM carbon', 'IOM carbon', 'TOTAL SOC']
@@ -43,7 +45,7 @@ def chck_weather_mngmnt(ora_weather, ora_subareas, sba):
         mess = warn_str
         mess += 'Foward run weather months: {}\tmanagement months: {}'.format(pettmp_fwd_nvals, ntsteps_fwd)
         print(mess)
-        QApplication.processEvents()
+        report_progress()
 
     pettmp_ss_nvals = len(ora_weather.pettmp_ss['precip'])
     ntsteps_ss = ora_subareas[sba].ntsteps_ss
@@ -52,7 +54,7 @@ def chck_weather_mngmnt(ora_weather, ora_subareas, sba):
         mess = warn_str
         mess += 'Steady state weather months: {}\tmanagement months: {}'.format(pettmp_ss_nvals, ntsteps_ss)
         print(mess)
-        QApplication.processEvents()
+        report_progress()
 
     return integrity_flag
 
@@ -150,33 +152,16 @@ def average_weather(latitude, precip, tair):
     """
     func_name = __prog__ + '\taverage_weather'
 
-    indx_start = 0
-    indx_end = len(precip)
-
-    # use dict-comprehension to initialise precip. and tair dictionaries
+    # long term average climate of each month from arrays of years by 12 months
     # =========================================================================
-    hist_precip = {mnth: 0.0 for mnth in MNTH_NAMES_SHORT}
-    hist_tmean = {mnth: 0.0 for mnth in MNTH_NAMES_SHORT}
-
-    for indx in range(indx_start, indx_end, 12):
-
-        for imnth, month in enumerate(MNTH_NAMES_SHORT):
-            hist_precip[month] += precip[indx + imnth]
-            hist_tmean[month] += tair[indx + imnth]
-
-    # write stanza for input.txt file consisting of long term average climate
-    # =======================================================================
-    ave_precip = []
-    ave_tmean = []
-    num_years = len(precip) / 12
-    for month in MNTH_NAMES_SHORT:
-        ave_precip.append(hist_precip[month] / num_years)
-        ave_tmean.append(hist_tmean[month] / num_years)
+    nyears = len(precip) // 12
+    ave_precip = array(precip[:12 * nyears], dtype=float64).reshape(nyears, 12).mean(axis=0)
+    ave_tmean = array(tair[:12 * nyears], dtype=float64).reshape(nyears, 12).mean(axis=0)
 
     year = 2001  # not a leap year
-    pet = thornthwaite(ave_tmean, latitude, year)
+    pet = thornthwaite_pet(latitude, ave_tmean.reshape(1, 12), [year])[0]
 
-    return ave_precip, ave_tmean, pet
+    return ave_precip.tolist(), ave_tmean.tolist(), pet.tolist()
 
 def gui_optimisation_cycle(form, subarea=None, iteration=None):
     """
@@ -193,6 +178,6 @@ def gui_optimisation_cycle(form, subarea=None, iteration=None):
         mess += ' {:6d}'.format(iteration + 1)
         sys.stdout.flush()
         sys.stdout.write('\r' + mess)
-        QApplication.processEvents()
+        report_progress()
 
     return
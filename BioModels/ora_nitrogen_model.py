@@ -24,10 +24,12 @@ from ora_no3_nh4_fns import (soil_nitrogen_supply, no3_nh4_crop_uptake, get_n_pa
                     get_rate_inhibit,
                     nh4_mineralisation, nh4_immobilisation, nh4_nitrification, nh4_volatilisation, n2o_lost_nitrif)
 
-def soil_nitrogen(carbon_obj, soil_water_obj, parameters, pettmp, management, soil_vars, nitrogen_change, continuity):
+def soil_nitrogen(carbon_obj, soil_water_obj, parameters, pettmp, management, soil_vars, nitrogen_change, continuity,
+                                                                                                    tstep_strt=0):
     """
     The soil organic matter pools (BIO and HUM-N) are assumed to have a constant C:N ratio (8.5 after Bradbury et al., 1993)
     also default for c_n_rat_hum_prev
+    tstep_strt: timestep from which to resume, nitrogen object must be populated up to this timestep
     """
     no3_start, nh4_start, c_n_rat_hum_prev = continuity.get_n_change_vars()
     n_parms = parameters.n_parms
@@ -66,8 +68,8 @@ def soil_nitrogen(carbon_obj, soil_water_obj, parameters, pettmp, management, so
 
     # main temporal loop
     # ==================
-    imnth = 1   # may not always be January
-    for tstep in range(management.ntsteps):
+    imnth = tstep_strt % 12 + 1   # may not always be January
+    for tstep in range(tstep_strt, management.ntsteps):
         precip = pettmp['precip'][tstep]
         pet = pettmp['pet'][tstep]
         crop_name, nut_n_min, n_crop_dem, n_respns_coef, c_n_rat_pi = get_crop_vars(management, crop_vars, tstep)
@@ -79,8 +81,8 @@ def soil_nitrogen(carbon_obj, soil_water_obj, parameters, pettmp, management, so
 
         cow, rate_mod, co2_emiss, c_loss_bio, pool_c_dpm, pi_to_dpm, cow_to_dpm, c_loss_dpm, \
                             pool_c_hum, cow_to_hum, c_loss_hum, pool_c_rpm, pi_to_rpm, c_loss_rpm = \
-                                                                carbon_obj.get_cvals_for_tstep(tstep + len_n_change)
-        wat_soil, wc_pwp, wc_fld_cap = soil_water_obj.get_wvals_for_tstep(tstep + len_n_change)
+                                                    carbon_obj.get_cvals_for_tstep(tstep - tstep_strt + len_n_change)
+        wat_soil, wc_pwp, wc_fld_cap = soil_water_obj.get_wvals_for_tstep(tstep - tstep_strt + len_n_change)
 
         # equs 3.3.7 to 3.3.12
         # ====================
@@ -0,0 +1,39 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_progress_fns.py
+# Purpose:     route progress updates from the model and writers to an optional user interface
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   the model core does not import a GUI toolkit; a GUI registers a callback e.g. QApplication.processEvents
+#   whereas batch runs register nothing and progress reports cost nothing
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_progress_fns.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+_progress_callback = None
+
+def set_progress_callback(callback=None):
+    """
+    callback takes no arguments and is typically used to allow the event loop to update unprocessed events
+    use None for headless running
+    """
+    global _progress_callback
+
+    _progress_callback = callback
+
+    return
+
+def report_progress():
+    """
+    called by the model and writers after printing progress messages
+    """
+    if _progress_callback is not None:
+        _progress_callback()
+
+    return
@@ -0,0 +1,212 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_result_cache.py
+# Purpose:     reuse results of subareas whose inputs have not changed since the previous run
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   each subarea is given a fingerprint, a hash of its soil, its steady state, forward run and scenario
+#   management, the weather of the farm including alternative forward run climates and the number of months to
+#   which these are stretched or truncated, the parameters of the
+#   crops and organic wastes it uses together with the fertiliser and nitrogen parameters, and the source of
+#   the model and output modules
+#   the results of each subarea are stored with their fingerprint in a cache directory within the output
+#   directory so that only subareas whose fingerprint has changed need be recomputed and rewritten; the output
+#   files of each subarea are recorded with its results so that subareas whose outputs have been removed are rewritten
+#   delete the cache directory to force all subareas to be recomputed
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_result_cache.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import makedirs, replace
+from os.path import isfile, join
+from hashlib import sha256
+from pickle import dump, load, HIGHEST_PROTOCOL, UnpicklingError
+from importlib.util import find_spec
+from numpy import ndarray, generic
+
+from ora_segmented_list import SegmentedList
+from ora_cyclic_series import CyclicSeries
+from ora_shared_data import resolve
+
+CACHE_DIR = 'pyorator_cache'
+CACHE_EXT = '.pkl'
+MODEL_MODULES = ('ora_cn_model', 'ora_cn_fns', 'ora_cn_classes', 'ora_cn_vector_model', 'ora_cn_summary_fns',
+                 'ora_water_model', 'ora_nitrogen_model', 'ora_rothc_fns', 'ora_low_level_fns', 'ora_segmented_list',
+                 'ora_excel_read', 'ora_excel_write', 'ora_excel_write_cn_water')
+RSLTS_BY_SBA = ('all_runs', 'scnr_summaries', 'crop_models', 'mngmnts_ss', 'mngmnts_fwd')
+
+WARN_STR = '*** Warning *** '
+
+_code_version = None
+
+def _update_digest(digest, obj):
+    """
+    feed a canonical form of obj to the digest; dictionaries are order independent and numbers are type independent
+    """
+    if obj is None or isinstance(obj, (bool, str)):
+        digest.update(repr(obj).encode())
+    elif isinstance(obj, (int, float, generic)):
+        digest.update(b'n' + repr(float(obj)).encode())
+    elif isinstance(obj, dict):
+        digest.update(b'{')
+        for key in sorted(obj, key=str):
+            _update_digest(digest, key)
+            _update_digest(digest, obj[key])
+        digest.update(b'}')
+    elif isinstance(obj, (list, tuple, SegmentedList, CyclicSeries, ndarray)):
+        digest.update(b'[')
+        for val in obj:
+            _update_digest(digest, val)
+        digest.update(b']')
+    elif hasattr(obj, '__dict__'):
+        digest.update(type(obj).__name__.encode())
+        _update_digest(digest, vars(obj))
+    else:
+        digest.update(repr(obj).encode())
+
+    return
+
+def code_version():
+    """
+    hash of the source of the modules which determine the results and their outputs, computed once
+    """
+    global _code_version
+
+    if _code_version is None:
+        digest = sha256()
+        for module in MODEL_MODULES:
+            digest.update(module.encode())
+            spec = find_spec(module)
+            if spec is not None and spec.origin is not None and isfile(spec.origin):
+                with open(spec.origin, 'rb') as fsrc:
+                    digest.update(fsrc.read())
+
+        _code_version = digest.hexdigest()
+
+    return _code_version
+
+def _mngmnt_names(ora_subarea):
+    """
+    crops and organic wastes used by any management of a subarea
+    """
+    mngmnts = [ora_subarea.crop_mngmnt_ss, ora_subarea.crop_mngmnt_fwd] + \
+                                                                    list(ora_subarea.crop_mngmnt_fwd_scnrs.values())
+    crop_names = {crop for mngmnt in mngmnts for crop in mngmnt['crop_name'] if crop is not None}
+    ow_types = {org_fert['ow_type'] for mngmnt in mngmnts for org_fert in mngmnt['org_fert'] if org_fert is not None}
+
+    return crop_names, ow_types
+
+def subarea_fingerprint(ora_parms, ora_weather, ora_subarea, fwd_wthr_scnrs=None, area_flag=True, ntsteps_fwd=None):
+    """
+    hash of everything which determines the results of a subarea
+    area_flag: False to exclude the area which only sets the area of the crop model, see assign_subarea
+    ntsteps_fwd: months of the alternative forward run weather, set by all subareas of the farm, see wthr_scnr_ntsteps
+    """
+    ora_parms = resolve(ora_parms)
+    crop_names, ow_types = _mngmnt_names(ora_subarea)
+
+    digest = sha256(code_version().encode())
+    for obj in (ora_subarea.soil_for_area, ora_subarea.area_ha if area_flag else None, ora_subarea.crop_mngmnt_ss,
+                ora_subarea.crop_mngmnt_fwd, ora_subarea.crop_mngmnt_fwd_scnrs, ora_weather, fwd_wthr_scnrs,
+                None if fwd_wthr_scnrs is None else ntsteps_fwd,
+                {crop: ora_parms.crop_vars.get(crop) for crop in crop_names},
+                {ow_type: ora_parms.ow_parms.get(ow_type) for ow_type in ow_types},
+                ora_parms.syn_fert_parms, ora_parms.n_parms):
+        _update_digest(digest, obj)
+
+    return digest.hexdigest()
+
+def subarea_results(farm_rslts, sba):
+    """
+    results of compute_farm restricted to one subarea, in the same form so that they can be merged
+    """
+    sba_rslts = {key: {sba: farm_rslts[key][sba]} if sba in farm_rslts[key] else {} for key in RSLTS_BY_SBA}
+    sba_rslts['all_runs_scnrs'] = {scnr: {sba: runs_scnr[sba]}
+                                        for scnr, runs_scnr in farm_rslts['all_runs_scnrs'].items() if sba in runs_scnr}
+    sba_rslts['scnr_outputs'] = [scnr_output for scnr_output in farm_rslts['scnr_outputs'] if scnr_output[0] == sba]
+
+    return sba_rslts
+
+def subarea_outfiles(study_name, sba_rslts, sba):
+    """
+    names of the Excel files written for a subarea and each of its scenarios, see write_farm_outputs
+    """
+    return [study_name + ' ' + sba + ' ' + scnr_output[1] + '.xlsx' for scnr_output in sba_rslts['scnr_outputs']] + \
+                                                                                    [study_name + ' ' + sba + '.xlsx']
+
+def assign_subarea(sba_rslts, sba, area_ha):
+    """
+    give results of a single subarea, e.g. of an identical subarea of another farm, to subarea sba of a given area
+    """
+    farm_rslts = {key: {sba: val for val in sba_rslts[key].values()} for key in RSLTS_BY_SBA}
+    farm_rslts['all_runs_scnrs'] = {scnr: {sba: val for val in runs_scnr.values()}
+                                                                for scnr, runs_scnr in sba_rslts['all_runs_scnrs'].items()}
+    farm_rslts['scnr_outputs'] = [(sba,) + tuple(scnr_output[1:]) for scnr_output in sba_rslts['scnr_outputs']]
+    for crop_model in farm_rslts['crop_models'].values():
+        crop_model.area_ha = area_ha
+
+    return farm_rslts
+
+class ResultCache(object, ):
+    """
+    results of each subarea of a farm together with their fingerprint
+    """
+    def __init__(self, out_dir, study_name):
+        self.out_dir = out_dir
+        self.cache_dir = join(out_dir, CACHE_DIR)
+        self.study_name = study_name
+        self.outfiles = {}      # output files recorded with the results of each subarea loaded
+
+    def _fname(self, sba):
+        return join(self.cache_dir, self.study_name + ' ' + sba + CACHE_EXT)
+
+    def load(self, fingerprints):
+        """
+        return results, keyed by subarea, of subareas whose cached fingerprint matches
+        """
+        cached_rslts = {}
+        for sba, fingerprint in fingerprints.items():
+            fname = self._fname(sba)
+            if not isfile(fname):
+                continue
+            try:
+                with open(fname, 'rb') as fcache:
+                    cached_fingerprint, sba_rslts, outfiles = load(fcache)
+            except (OSError, EOFError, UnpicklingError, AttributeError, ImportError, ValueError) as err:
+                print(WARN_STR + 'ignoring cached results ' + fname + ': ' + str(err))
+                continue
+
+            if cached_fingerprint == fingerprint and sba in sba_rslts['all_runs']:
+                cached_rslts[sba] = sba_rslts
+                self.outfiles[sba] = outfiles
+
+        return cached_rslts
+
+    def outputs_missing(self, sba):
+        """
+        True if any output file recorded for a loaded subarea is not present in the output directory
+        """
+        return not all(isfile(join(self.out_dir, fname)) for fname in self.outfiles[sba])
+
+    def store(self, farm_rslts, fingerprints):
+        """
+        write results and output file names of each computed subarea
+        """
+        try:
+            makedirs(self.cache_dir, exist_ok=True)
+            for sba in farm_rslts['all_runs']:
+                fname = self._fname(sba)
+                sba_rslts = subarea_results(farm_rslts, sba)
+                outfiles = subarea_outfiles(self.study_name, sba_rslts, sba)
+                with open(fname + '.tmp', 'wb') as fcache:
+                    dump((fingerprints[sba], sba_rslts, outfiles), fcache, HIGHEST_PROTOCOL)
+                replace(fname + '.tmp', fname)
+        except OSError as err:
+            print(WARN_STR + 'could not cache results in ' + self.cache_dir + ': ' + str(err))
+
+        return
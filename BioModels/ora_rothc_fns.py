@@ -23,9 +23,9 @@ K_BIO = 0.66 / 12
 K_HUM = 0.02 / 12  # rate constants for decomposition of the pool per month
 
 def run_rothc(parameters, pettmp, management, carbon_change, soil_vars, soil_water, continuity,
-              crop_model=None, npp_model=None):
+              crop_model=None, npp_model=None, tstep_strt=0):
     """
-    C
+    tstep_strt: timestep from which to resume, carbon and soil water objects must be populated up to this timestep
     """
 
     # retrieve water content, stress index and C pool values for initial and first time step
@@ -44,8 +44,8 @@ def run_rothc(parameters, pettmp, management, carbon_change, soil_vars, soil_wat
             c_input_bio, c_input_hum, c_loss_dpm, c_loss_rpm, c_loss_hum, c_loss_bio, tot_soc = vals_prev
 
     ntsteps = management.ntsteps
-    imnth = 1
-    for tstep in range(ntsteps):
+    imnth = tstep_strt % 12 + 1
+    for tstep in range(tstep_strt, ntsteps):
 
         vals_for_tstep = get_values_for_tstep(pettmp, management, parameters, t_depth, tstep)
         tair, precip, pet_prev, pet, irrig, c_pi_mnth, c_n_rat_ow, rat_dpm_rpm, cow, rat_dpm_hum_ow, prop_iom_ow, \
@@ -0,0 +1,83 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_segmented_list.py
+# Purpose:     list whose leading values are shared with another list
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   used when forking carbon, nitrogen and soil water objects: the history, typically the steady state, is
+#   shared by reference and values appended during the forward run go to a list owned by the fork
+#
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_segmented_list.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from collections.abc import Sequence
+
+class SegmentedList(Sequence):
+    """
+    head is shared and must not be altered for the first nhead values; the tail is owned
+    """
+    def __init__(self, head=None, nhead=None):
+        """
+        nhead defaults to, and cannot exceed, the length of head
+        """
+        if head is None:
+            head = []
+        if nhead is None or nhead > len(head):
+            nhead = len(head)
+
+        # avoid chains of segmented lists when the view lies within the head of the parent
+        # ==================================================================================
+        if isinstance(head, SegmentedList) and nhead <= head.nhead:
+            head = head.head
+
+        self.head = head
+        self.nhead = nhead
+        self.tail = []
+
+    def __len__(self):
+        return self.nhead + len(self.tail)
+
+    def __getitem__(self, indx):
+        if isinstance(indx, slice):
+            return [self[jndx] for jndx in range(*indx.indices(len(self)))]
+
+        if indx < 0:
+            indx += len(self)
+        if indx < 0 or indx >= len(self):
+            raise IndexError('SegmentedList index out of range')
+
+        if indx < self.nhead:
+            return self.head[indx]
+
+        return self.tail[indx - self.nhead]
+
+    def __iter__(self):
+        for indx in range(self.nhead):
+            yield self.head[indx]
+
+        for val in self.tail:
+            yield val
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def append(self, val):
+        self.tail.append(val)
+
+def fork_data(data, nmnths=None):
+    """
+    share each list of values of a carbon, nitrogen or soil water object with a new dictionary
+    """
+    return {var_name: SegmentedList(data[var_name], nmnths) for var_name in data}
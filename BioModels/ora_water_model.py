@@ -16,12 +16,19 @@ __version__ = '0.0.0'
 # Version history
 # ---------------
 #
-from calendar import monthrange
+from calendar import monthrange, isleap
 from copy import copy
+from functools import lru_cache
+from numpy import array, full, zeros, maximum, where, allclose, errstate, nan_to_num, float64
 
 from thornthwaite import thornthwaite
 
+from ora_segmented_list import fork_data
+from ora_cyclic_series import CyclicSeries, source_years
+
 WAT_STRSS_INDX_DFLT = 1.0
+THRNTHWT_T_REF = 10.0       # uniform monthly temperature used to derive the monthly factors of thornthwaite
+THRNTHWT_T_CHECK = (-2.0, 1.0, 4.5, 9.0, 14.0, 19.5, 24.0, 27.5, 22.0, 15.0, 7.5, 0.0)
 
 def _theta_values(pcnt_c, pcnt_clay, pcnt_silt, pcnt_sand, halaba_flag=False):
     """
@@ -78,43 +85,89 @@ def get_soil_water_constants(soil_vars, n_parms, tot_soc):
 
     return wc_fld_cap, wc_pwp, pcnt_c
 
-def add_pet_to_weather(latitude, pettmp_grid_cell):
+def _heat_index_exponent(tair):
     """
-    feed monthly annual temperatures to Thornthwaite equations to estimate Potential Evapotranspiration [mm/month]
+    annual heat index and exponent of the Thornthwaite equation for an array of years by 12 months
     """
-    # initialise output var
-    # =====================
-    nyears = int(len(pettmp_grid_cell['precip']) / 12)
-    pettmp_reform = {}
-    for var in list(['precip', 'tair', 'pet']):
-        pettmp_reform[var] = []
+    heat_indx = ((maximum(tair, 0.0) / 5.0) ** 1.514).sum(axis=1, keepdims=True)
+    expnt = (6.75e-07 * heat_indx ** 3) - (7.71e-05 * heat_indx ** 2) + (1.792e-02 * heat_indx) + 0.49239
 
-    precip = pettmp_grid_cell['precip']  #
-    temper = pettmp_grid_cell['tair']
+    return heat_indx, expnt
 
-    indx1 = 0
-    for year in range(nyears):
+def _thornthwaite_array(tair, factors):
+    """
+    Thornthwaite equation applied to an array of years by 12 months; months below zero have no PET
+    """
+    heat_indx, expnt = _heat_index_exponent(tair)
+    with errstate(divide='ignore', invalid='ignore'):
+        pet = factors * (10.0 * maximum(tair, 0.0) / heat_indx) ** expnt
 
-        indx2 = indx1 + 12
+    return where(tair > 0.0, nan_to_num(pet), 0.0)
 
-        # precipitation and temperature
-        precipitation = precip[indx1:indx2]  #
-        tmean = temper[indx1:indx2]
+@lru_cache(maxsize=None)
+def _thornthwaite_factors(latitude, leap_flag):
+    """
+    monthly factors for day length and month length of thornthwaite derived from a uniform temperature; None if
+    thornthwaite does not reproduce a check year with these factors, in which case it is called for each year
+    """
+    year = 2000 if leap_flag else 2001
+    heat_indx, expnt = _heat_index_exponent(full((1, 12), THRNTHWT_T_REF))
+    factors = array(thornthwaite([THRNTHWT_T_REF] * 12, latitude, year), dtype=float64) / \
+                                                        (10.0 * THRNTHWT_T_REF / heat_indx[0, 0]) ** expnt[0, 0]
+
+    pet_chck = thornthwaite(list(THRNTHWT_T_CHECK), latitude, year)
+    if not allclose(_thornthwaite_array(array([THRNTHWT_T_CHECK]), factors)[0], pet_chck, rtol=1e-9, atol=1e-9):
+        return None
 
-        # pet
-        if max(tmean) > 0.0:
-            pet = thornthwaite(tmean, latitude, year)
+    return factors
+
+def thornthwaite_pet(latitude, tair, years):
+    """
+    Potential Evapotranspiration [mm/month] for an array of years by 12 months of mean air temperature
+    years: year of each row, only used to identify leap years; years with no month above zero have no PET
+    """
+    leap_flags = array([isleap(year) for year in years], dtype=bool)
+    pet = zeros(tair.shape)
+    for leap_flag in (False, True):
+        rows = leap_flags == leap_flag
+        if not rows.any():
+            continue
+
+        factors = _thornthwaite_factors(latitude, leap_flag)
+        if factors is None:
+            pet[rows] = [thornthwaite(tmean.tolist(), latitude, int(year)) if tmean.max() > 0.0 else [0.0] * 12
+                                                            for tmean, year in zip(tair[rows], array(years)[rows])]
         else:
-            pet = [0.0] * 12
-            mess = '*** Warning *** monthly temperatures are all below zero for latitude: {}'.format(latitude)
-            print(mess)
+            pet[rows] = _thornthwaite_array(tair[rows], factors)
 
-        pettmp_reform['precip'] += precipitation
-        pettmp_reform['tair'] += tmean
-        pettmp_reform['pet'] += pet
+    pet[tair.max(axis=1) <= 0.0] = 0.0
 
-        indx1 += 12
+    return pet
 
+def add_pet_to_weather(latitude, pettmp_grid_cell):
+    """
+    feed monthly annual temperatures to Thornthwaite equations to estimate Potential Evapotranspiration [mm/month]
+    only complete years are retained; for stretched weather PET is computed once for each month of the source
+    """
+    precip, tair = pettmp_grid_cell['precip'], pettmp_grid_cell['tair']
+    tair_src, precip_src = source_years(tair), source_years(precip)
+    if tair_src is not None and precip_src is not None:
+        nmnths = 12 * int(len(precip) / 12)
+        pet_src = add_pet_to_weather(latitude, {'precip': precip_src, 'tair': tair_src})['pet']
+        return {'precip': CyclicSeries(precip, nmnths), 'tair': CyclicSeries(tair, nmnths),
+                                                                        'pet': CyclicSeries(pet_src, nmnths, tair.offset)}
+
+    nyears = int(len(pettmp_grid_cell['precip']) / 12)
+    nmnths = 12 * nyears
+    tair = array(pettmp_grid_cell['tair'][:nmnths], dtype=float64).reshape(nyears, 12)
+
+    pet = thornthwaite_pet(latitude, tair, range(nyears))
+    for year in range(nyears):
+        if tair[year].max() <= 0.0:
+            print('*** Warning *** monthly temperatures are all below zero for latitude: {}'.format(latitude))
+
+    pettmp_reform = {'precip': list(pettmp_grid_cell['precip'][:nmnths]),
+                     'tair': list(pettmp_grid_cell['tair'][:nmnths]), 'pet': pet.ravel().tolist()}
     return pettmp_reform
 
 def get_soil_water(precip, pet, irrig, wc_fld_cap, wc_pwp, wc_t0):
@@ -156,6 +209,14 @@ class SoilWaterChange(object, ):
 
         self.var_name_list = var_name_list
 
+    def fork(self, nmnths=None):
+        """
+        new object sharing the first nmnths values of each variable, by default all, with this object
+        """
+        forked = SoilWaterChange()
+        forked.data = fork_data(self.data, nmnths)
+        return forked
+
     def get_wvals_for_tstep(self, tstep):
         """
         C
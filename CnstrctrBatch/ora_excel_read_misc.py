@@ -15,9 +15,6 @@ from os.path import join, split, dirname
 from glob import glob
 from openpyxl import load_workbook
 from pandas import DataFrame
-import requests
-
-import hwsd_bil
 
 ERROR_STR = '*** Error *** '
 WARN_STR = '*** Warning *** '
@@ -37,6 +34,8 @@ def fetch_isda_soil_data(lggr, lat, lon):
 
     It is possible to request specific properties: '&lat={}&lon={}&property=ph&depth=0-20'.format(lat, lon)
     """
+    import requests
+
     soil_recs = []
     request_str = ISDA_URL + '?key=' + SOIL_DATA_API_KEY + '&lat={}&lon={}'.format(lat, lon)
     soil_data = requests.get(request_str)
@@ -59,6 +58,8 @@ def retrieve_hwsd_soil_recs(lggr, hwsd_dir, lat, lon):
     """
     extract required metrics from the HWSD database
     """
+    import hwsd_bil
+
     try:
         hwsd = hwsd_bil.HWSD_bil(lggr, hwsd_dir)
     except:
@@ -0,0 +1,280 @@
+#-------------------------------------------------------------------------------
+# Name:        ora_wthr_extract.py
+# Purpose:     extract monthly weather for many sites from gridded NetCDF datasets with a local cache
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   sites are mapped to the indices of the grid cells of a weather dataset catalogued by read_weather_dsets_detail
+#   cells not already cached are grouped into blocks of the grid; each block is read from the precipitation and
+#   temperature datasets as a single slab covering its cells, rather than one read per site, and the series of
+#   each cell are written to a compressed npz file in the cache directory of the dataset
+#   a cached cell is used until either of the dataset files changes
+#   forward run weather scenarios given as the name of a weather resource, e.g. --fwd_wthr A1B=ClimGen_A1B, are
+#   taken from the grid cell of each farm through the cache, see site_wthr_scnrs
+#
+#   usage: ora_wthr_extract.py WTHR_DIR RESOURCE POINTS_CSV [--cache_dir DIR] where POINTS_CSV has latitude and
+#          longitude in the first two columns and RESOURCE is e.g. CRU_hist or ClimGen_A1B
+#-------------------------------------------------------------------------------
+#!/usr/bin/env python
+
+__prog__ = 'ora_wthr_extract.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import makedirs, replace, stat
+from os.path import isfile, join, basename, normpath
+from argparse import ArgumentParser
+from calendar import monthrange
+from csv import reader
+from numpy import load, savez_compressed, float32, nan, isnan, array
+
+CACHE_DIR = 'pyorator_wthr_cache'
+BLOCK_SIZE = 32         # grid cells along each side of a block read as one slab
+METRICS = {'precip': ('ds_precip', 'precip', 'pr'), 'tair': ('ds_tas', 'tas', 'tas')}   # dataset, variable, default
+KELVIN = 273.15
+
+ERROR_STR = '*** Error *** '
+WARN_STR = '*** Warning *** '
+
+def grid_indices(wthr_set, latitude, longitude):
+    """
+    indices of the grid cell nearest to a site or None if the site lies outside the dataset
+    """
+    ilat = int(round((latitude - wthr_set['lat_frst']) / wthr_set['resol_lat']))
+    ilon = int(round((longitude - wthr_set['lon_frst']) / wthr_set['resol_lon']))
+    if 0 <= ilat < len(wthr_set['latitudes']) and 0 <= ilon < len(wthr_set['longitudes']):
+        return ilat, ilon
+
+    return None
+
+def _dset_signature(wthr_set):
+    """
+    names, sizes and modification times of the precipitation and temperature datasets
+    """
+    sigs = []
+    for metric in METRICS:
+        nc_fname = normpath(wthr_set[METRICS[metric][0]])
+        fstat = stat(nc_fname)
+        sigs.append('{}:{}:{}'.format(basename(nc_fname), fstat.st_size, int(fstat.st_mtime)))
+
+    return ';'.join(sigs)
+
+def _to_model_units(values, units, year_start):
+    """
+    convert Kelvin to degrees C and fluxes in kg m-2 s-1 to mm per month; values are months by cells
+    """
+    if units == 'K':
+        return values - KELVIN
+
+    if units == 'kg m-2 s-1':
+        secs = array([86400 * monthrange(year_start + imnth // 12, imnth % 12 + 1)[1]
+                                                                            for imnth in range(values.shape[0])])
+        return values * secs.reshape(-1, *[1] * (values.ndim - 1))
+
+    return values
+
+def _read_slab(nc_dset, var_name, lat_var, lon_var, lat_slice, lon_slice):
+    """
+    read one slab of a variable and return it as months by latitudes by longitudes
+    """
+    nc_var = nc_dset.variables[var_name]
+    dims = list(nc_var.dimensions)
+    slices = [lat_slice if dim == lat_var else lon_slice if dim == lon_var else slice(None) for dim in dims]
+    slab = nc_var[tuple(slices)]
+    if hasattr(slab, 'filled'):
+        slab = slab.astype(float).filled(nan)      # masked cells e.g. sea
+
+    order = [indx for indx, dim in enumerate(dims) if dim not in (lat_var, lon_var)] + \
+                                                                        [dims.index(lat_var), dims.index(lon_var)]
+    units = nc_var.units if 'units' in nc_var.ncattrs() else ''
+
+    return slab.transpose(order), units
+
+class WthrCache(object, ):
+    """
+    series of each grid cell of a weather dataset held as compressed npz files
+    """
+    def __init__(self, cache_dir, wthr_rsrc, wthr_set):
+        self.cache_dir = join(cache_dir, wthr_rsrc)
+        self.wthr_set = wthr_set
+        self.signature = _dset_signature(wthr_set)
+        makedirs(self.cache_dir, exist_ok=True)
+
+    def _fname(self, cell):
+        return join(self.cache_dir, '{}_{}.npz'.format(*cell))
+
+    def load(self, cell):
+        """
+        cached weather of a cell, which may have no data, or None if not cached or out of date
+        """
+        fname = self._fname(cell)
+        if not isfile(fname):
+            return None
+        try:
+            with load(fname) as npz:
+                if str(npz['signature']) != self.signature:
+                    return None
+                if not npz['valid']:
+                    return {}
+                return {metric: npz[metric].tolist() for metric in METRICS}
+        except (OSError, KeyError, ValueError) as err:
+            print(WARN_STR + 'ignoring cached weather ' + fname + ': ' + str(err))
+            return None
+
+    def store(self, cell, series):
+        """
+        write weather of a cell; a cell with missing values is recorded as having no data
+        """
+        valid = all(not isnan(series[metric]).any() for metric in METRICS)
+        fname = self._fname(cell)
+        with open(fname + '.tmp', 'wb') as fcache:
+            savez_compressed(fcache, signature=self.signature, valid=valid,
+                                        **{metric: series[metric].astype(float32) for metric in METRICS})
+        replace(fname + '.tmp', fname)
+
+        return {metric: series[metric].astype(float32).tolist() for metric in METRICS} if valid else {}
+
+    def extract(self, cells):
+        """
+        read cells not cached, a block of the grid at a time, and add them to the cache; returns weather by cell
+        """
+        from netCDF4 import Dataset     # deferred until weather datasets are used
+
+        blocks = {}
+        for cell in cells:
+            blocks.setdefault((cell[0] // BLOCK_SIZE, cell[1] // BLOCK_SIZE), []).append(cell)
+
+        wthr_set = self.wthr_set
+        lat_var, lon_var = wthr_set['lat_var'], wthr_set['lon_var']
+        nc_dsets = {metric: Dataset(normpath(wthr_set[METRICS[metric][0]]), 'r') for metric in METRICS}
+        wthr_cells = {}
+        try:
+            for block_cells in blocks.values():
+                lat_slice = slice(min([cell[0] for cell in block_cells]), max([cell[0] for cell in block_cells]) + 1)
+                lon_slice = slice(min([cell[1] for cell in block_cells]), max([cell[1] for cell in block_cells]) + 1)
+                slabs = {}
+                for metric, (dset_key, var_key, var_dflt) in METRICS.items():
+                    slab, units = _read_slab(nc_dsets[metric], wthr_set.get(var_key, var_dflt), lat_var, lon_var,
+                                                                                                lat_slice, lon_slice)
+                    slabs[metric] = _to_model_units(slab, units, wthr_set['year_start'])
+
+                for cell in block_cells:
+                    series = {metric: slabs[metric][:, cell[0] - lat_slice.start, cell[1] - lon_slice.start]
+                                                                                                for metric in METRICS}
+                    wthr_cells[cell] = self.store(cell, series)
+        finally:
+            for nc_dset in nc_dsets.values():
+                nc_dset.close()
+
+        print('Read {} grid cells in {} slabs from each dataset'.format(len(cells), len(blocks)))
+        return wthr_cells
+
+def extract_sites_wthr(wthr_rsrc, wthr_set, sites, cache_dir):
+    """
+    monthly precipitation [mm] and mean air temperature [degrees C] of the grid cell of each site as a list,
+    aligned with sites, of dictionaries or None where the site is outside the dataset or its cell has no data
+    sites: sequence of latitude and longitude pairs
+    """
+    wthr_cache = WthrCache(cache_dir, wthr_rsrc, wthr_set)
+
+    site_cells = [grid_indices(wthr_set, lat, lon) for lat, lon in sites]
+    cells = sorted({cell for cell in site_cells if cell is not None})
+    wthr_cells = {}
+    for cell in cells:
+        wthr = wthr_cache.load(cell)
+        if wthr is not None:
+            wthr_cells[cell] = wthr
+    ncached = len(wthr_cells)
+
+    missing = [cell for cell in cells if cell not in wthr_cells]
+    if len(missing) > 0:
+        wthr_cells.update(wthr_cache.extract(missing))
+
+    print('{} sites in {} grid cells of {}: {} cells from cache, {} read'
+                                                    .format(len(sites), len(cells), wthr_rsrc, ncached, len(missing)))
+    nout = len([cell for cell in site_cells if cell is None])
+    if nout > 0:
+        print(WARN_STR + '{} sites lie outside {}'.format(nout, wthr_rsrc))
+
+    return [None if cell is None or len(wthr_cells[cell]) == 0 else wthr_cells[cell] for cell in site_cells]
+
+def site_wthr_scnrs(form, fwd_wthr_scnrs, latitude, longitude):
+    """
+    forward run weather scenarios of a site: a scenario given as the name of a weather resource is replaced by the
+    weather of the grid cell of the site, others are unchanged; scenarios without weather for the site are omitted
+    """
+    if fwd_wthr_scnrs is None or all(not isinstance(pettmp, str) for pettmp in fwd_wthr_scnrs.values()):
+        return fwd_wthr_scnrs
+
+    wthr_sets = getattr(form, 'wthr_sets', None)
+    site_scnrs = {}
+    for scnr, pettmp in fwd_wthr_scnrs.items():
+        if not isinstance(pettmp, str):
+            site_scnrs[scnr] = pettmp
+            continue
+
+        if wthr_sets is None or pettmp not in wthr_sets:
+            print(WARN_STR + 'weather resource ' + pettmp + ' of scenario ' + scnr + ' not found in weather datasets')
+            continue
+
+        cache_dir = join(form.settings['wthr_dir'], CACHE_DIR)
+        site_wthr = extract_sites_wthr(pettmp, wthr_sets[pettmp], [(latitude, longitude)], cache_dir)[0]
+        if site_wthr is None:
+            print(WARN_STR + 'no weather for scenario ' + scnr + ' at latitude {} longitude {}'.format(latitude,
+                                                                                                        longitude))
+            continue
+        site_scnrs[scnr] = site_wthr
+
+    return site_scnrs
+
+def _read_points(points_fn):
+    """
+    latitude and longitude from the first two columns, rows which are not numeric e.g. headers are skipped
+    """
+    sites = []
+    with open(points_fn, 'r', newline='') as fpoints:
+        for row in reader(fpoints):
+            try:
+                sites.append((float(row[0]), float(row[1])))
+            except (ValueError, IndexError):
+                continue
+
+    return sites
+
+class _WthrForm(object, ):
+    """
+    holds settings and attributes created by read_weather_dsets_detail
+    """
+    def __init__(self, wthr_dir):
+        self.settings = {'wthr_dir': wthr_dir}
+
+def main():
+    """
+    Entry point: populate the cache for a list of sites
+    """
+    from weather_datasets import read_weather_dsets_detail
+
+    argparser = ArgumentParser(prog=__prog__, description='Extract weather for many sites from a NetCDF dataset')
+    argparser.add_argument('wthr_dir', help='weather datasets directory')
+    argparser.add_argument('resource', help='weather resource e.g. CRU_hist or ClimGen_A1B')
+    argparser.add_argument('points', help='CSV file of latitude and longitude of each site')
+    argparser.add_argument('--cache_dir', help='defaults to ' + CACHE_DIR + ' in the weather datasets directory')
+    args = argparser.parse_args()
+
+    wthr_sets = read_weather_dsets_detail(_WthrForm(args.wthr_dir))
+    if wthr_sets is None or args.resource not in wthr_sets:
+        print(ERROR_STR + 'weather resource ' + args.resource + ' not found in ' + args.wthr_dir)
+        return
+
+    cache_dir = args.cache_dir
+    if cache_dir is None:
+        cache_dir = join(args.wthr_dir, CACHE_DIR)
+
+    sites = _read_points(args.points)
+    extract_sites_wthr(args.resource, wthr_sets[args.resource], sites, cache_dir)
+
+if __name__ == '__main__':
+    main()
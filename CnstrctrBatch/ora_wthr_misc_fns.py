@@ -14,7 +14,8 @@ __author__ = 's03mm5'
 
 from os.path import isfile
 from csv import reader, Sniffer
-from math import ceil
+
+from ora_cyclic_series import cyclic_weather
 
 ERROR_STR = '*** Error *** '
 WARN_STR = '*** Warning *** '
@@ -84,57 +85,24 @@ def read_csv_wthr_file(csv_fn, w_csv_dscr = None):
 def fetch_csv_wthr(csv_fn, nyrs_ss, nyrs_fwd):
     """
     read and check weather data from a CSV file
-    stretch weather to fulfill total number of years
+    stretch weather to fulfill total number of years by repeating it without copying, see CyclicSeries
     """
-    func_name =  __prog__ + ' read_csv_wthr'
-
     csv_valid_flag, pettmp = read_csv_wthr_file(csv_fn)
     if not csv_valid_flag:
         return None
 
     nmnths_read = len(pettmp['precip'])
-
-    pettmp_strtch = {'precip': [], 'tair': []}
-    pettmp_ss = {'precip': [], 'tair': []}
-    pettmp_fwd = {'precip': [], 'tair': []}
-
     nmnths_rqrd = 12 * (nyrs_ss + nyrs_fwd)
     print('Total number of months required {} for run, read {} months'.format(nmnths_rqrd, nmnths_read))
 
-    # stretch data if necessary to cover steady state and forward run
-    # =======================================================#=======
-    nstrtch = ceil(nmnths_rqrd / nmnths_read)
-    if nstrtch > 1:
-        for ic in range(nstrtch):
-            for metric in pettmp:
-                pettmp_strtch[metric] += pettmp[metric]
-
-        # overwrite with stretched
-        # ========================
-        for metric in pettmp:
-            pettmp[metric] = pettmp_strtch[metric]
-
-    # stanza to discard surplus
-    # =========================
-    nmnths_read = len(pettmp['tair'])
-    nmnths_diff = nmnths_read - nmnths_rqrd
-    if nmnths_diff > 0:
-        for metric in pettmp:
-            pettmp[metric] = pettmp[metric][:-nmnths_diff]
-    elif nmnths_diff < 0:
-        mess = ERROR_STR + 'problem in ' + func_name
-        print(mess + ' stretch failed - months read: {}\trequired'.format(nmnths_read, nmnths_rqrd))
-        return None
-
-    # split into steady state and forward run
-    # =======================================
+    # split into steady state and forward run, stretching data if necessary
+    # =====================================================================
     nmnths_ss = 12 * nyrs_ss
     nmnths_fwd = 12 * nyrs_fwd
-    for metric in pettmp:
-        pettmp_ss[metric] = pettmp[metric][:nmnths_ss]
-        pettmp_fwd[metric] = pettmp[metric][nmnths_ss:nmnths_ss + nmnths_fwd]
+    pettmp_ss = cyclic_weather(pettmp, nmnths_ss)
+    pettmp_fwd = cyclic_weather(pettmp, nmnths_fwd, nmnths_ss)
 
-    return len(pettmp_ss[metric]), pettmp_ss, len(pettmp_fwd[metric]), pettmp_fwd
+    return nmnths_ss, pettmp_ss, nmnths_fwd, pettmp_fwd
 
 def _write_coords_for_key(mess, climgen, proximate_keys, lookup_key, func_name):
 
@@ -15,9 +15,7 @@ __version__ = '0.0.0'
 # Version history
 # ---------------
 # 
-import cftime  # required for pyinstaller
 from os.path import join, normpath, isdir
-from netCDF4 import Dataset, num2date
 from glob import glob
 
 GRANULARITY = 120
@@ -40,6 +38,9 @@ def _fetch_weather_nc_parms(nc_fname, weather_resource, resol_time, scenario):
         lat = 'lat'
         lon = 'lon'
 
+    import cftime  # required for pyinstaller
+    from netCDF4 import Dataset, num2date     # deferred until weather datasets are used
+
     nc_fname = normpath(nc_fname)
     nc_dset = Dataset(nc_fname, 'r')
     time_var = nc_dset.variables[time_var_name]
@@ -104,7 +105,7 @@ def _fetch_weather_nc_parms(nc_fname, weather_resource, resol_time, scenario):
     wthr_rsrc = {'year_start': start_year,  'year_end': end_year,
             'resol_lat': resol_lat, 'lat_frst': lat_frst, 'lat_last': lat_last, 'lat_ll': lat_ll, 'lat_ur': lat_ur,
             'resol_lon': resol_lon, 'lon_frst': lon_frst, 'lon_last': lon_last, 'lon_ll': lon_ll, 'lon_ur': lon_ur,
-            'longitudes': longitudes, 'latitudes': latitudes,
+            'longitudes': longitudes, 'latitudes': latitudes, 'lat_var': lat, 'lon_var': lon,
             'resol_time': resol_time,  'scenario': scenario}
 
     print('{} start and end year: {} {}\tresolution: {} degrees'
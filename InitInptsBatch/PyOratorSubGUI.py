@@ -13,14 +13,19 @@ __author__ = 's03mm5'
 import sys
 from os.path import normpath, split, join
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QPixmap, QFont
 from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGridLayout, QLabel,
-                                                            QPushButton, QApplication, QFileDialog)
-from subprocess import Popen, PIPE, STDOUT
+                                                            QPushButton, QApplication, QFileDialog, QListWidget)
+from threading import Thread
+from queue import Queue, Empty
 
 from initialise_sub_funcs import read_config_file, initiation, write_config_file
+from ora_worker_service import submit_runs, describe_status
+from ora_job_queue import JobQueue, JOB_MEMORY_MB
 
 WDGT_SIZE_110 = 110
+POLL_INTERVAL = 1000    # milliseconds between checks of the job queue
 
 class Form(QWidget):
     """
@@ -35,6 +40,9 @@ class Form(QWidget):
         self.settings = None
 
         initiation(self)
+        self.job_queue = JobQueue(self.settings.get('max_jobs'), self.settings.get('job_memory_mb', JOB_MEMORY_MB))
+        self.service_msgs = Queue()     # status messages of submissions to the simulation service
+        self.service_jobs = []          # latest status of each submission, listed after jobs of the job queue
         font = QFont(self.font())
         font.setPointSize(font.pointSize() + 1)
         self.setFont(font)
@@ -96,11 +104,27 @@ class Form(QWidget):
         w_sub_job.clicked.connect(self.subBatchJob)
         grid.addWidget(w_sub_job, irow, 0)
 
+        w_cancel_job = QPushButton('Cancel job')
+        helpText = 'Cancel the selected job, if queued or running'
+        w_cancel_job.setToolTip(helpText)
+        w_cancel_job.setFixedWidth(WDGT_SIZE_110)
+        w_cancel_job.clicked.connect(self.cancelBatchJob)
+        grid.addWidget(w_cancel_job, irow, 1)
+
+        w_max_jobs = QLabel('Maximum concurrent jobs: {}'.format(self.job_queue.max_running))
+        grid.addWidget(w_max_jobs, irow, 2, 1, 3)
+
         # ==================
         w_exit = QPushButton('Exit', self)
         grid.addWidget(w_exit, irow, 6)
         w_exit.clicked.connect(self.exitClicked)
 
+        # ========== queued, running and completed jobs
+        irow += 1
+        w_jobs = QListWidget()
+        grid.addWidget(w_jobs, irow, 0, 1, 7)
+        self.w_jobs = w_jobs
+
         # ==================
         # add grid to RH vertical box
         rh_vbox.addLayout(grid)
@@ -113,23 +137,77 @@ class Form(QWidget):
 
         # posx, posy, width, height
         # =========================
-        self.setGeometry(300, 300, 600, 250)
+        self.setGeometry(300, 300, 600, 400)
         self.setWindowTitle('Submit PyOrator batch job')
 
         # reads and set values from last run
         # ==================================
         read_config_file(self)
 
+        # poll the job queue to start queued jobs and refresh elapsed times
+        # ==================================================================
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.pollBatchJobs)
+        self.timer.start(POLL_INTERVAL)
+
     def subBatchJob(self):
         """
-        run the make simulations script
+        run the make simulations script or, if the setup file has a service_port, submit to the simulation service
         """
         run_fn = normpath(self.w_run_fn.text())
         run_dir = split(run_fn)[0]
         self.settings['run_dir'] = run_dir
 
-        cmd_str = self.settings['python_exe'] + ' ' + self.settings['sub_prog'] + ' "' + self.settings['run_dir'] + '"'
-        new_inst = Popen(cmd_str, stdin=PIPE, stderr=STDOUT)
+        service_port = self.settings.get('service_port')
+        if service_port is not None:
+            self.service_jobs.append('Service\tsubmitting\t' + run_dir)
+            Thread(target=self._submitServiceRun, args=(len(self.service_jobs) - 1, run_dir, service_port),
+                                                                                                daemon=True).start()
+            self.pollBatchJobs()
+            return
+
+        cmd_args = [self.settings['python_exe'], self.settings['sub_prog'], self.settings['run_dir'],
+                                                                '--max_workers', str(self.job_queue.workers_per_job)]
+        self.job_queue.submit(cmd_args, run_dir)
+        self.pollBatchJobs()
+
+    def _submitServiceRun(self, isubmit, run_dir, service_port):
+        """
+        runs in a thread; status messages are queued for display by pollBatchJobs
+        """
+        nfailed = submit_runs([run_dir], service_port, status_fn=lambda msg: self.service_msgs.put((isubmit, msg)))
+        if nfailed is None:
+            self.service_msgs.put((isubmit, {'job_id': None, 'run_dir': run_dir, 'status': 'failed', 'elapsed': 0,
+                                    'mess': 'simulation service on port {} could not be reached'.format(service_port)}))
+
+    def pollBatchJobs(self):
+        """
+        start queued jobs when slots become free and display status and elapsed time of each job
+        """
+        self.job_queue.poll()
+        while True:
+            try:
+                isubmit, msg = self.service_msgs.get_nowait()
+            except Empty:
+                break
+            if msg['status'] != 'finished':
+                self.service_jobs[isubmit] = 'Service ' + describe_status(msg)
+
+        lines = [job.describe() for job in self.job_queue.jobs] + self.service_jobs
+        for irow, line in enumerate(lines):
+            if irow < self.w_jobs.count():
+                self.w_jobs.item(irow).setText(line)
+            else:
+                self.w_jobs.addItem(line)
+
+    def cancelBatchJob(self):
+        """
+        cancel job selected in the list
+        """
+        irow = self.w_jobs.currentRow()
+        if 0 <= irow < len(self.job_queue.jobs):     # submissions to the service cannot be cancelled
+            self.job_queue.cancel(self.job_queue.jobs[irow].job_id)
+            self.pollBatchJobs()
 
     def fetchRunFile(self):
         """
@@ -143,8 +221,11 @@ class Form(QWidget):
 
     def exitClicked(self):
         """
-        write last GUI selections
+        write last GUI selections; running jobs continue but queued jobs are abandoned
         """
+        nqueued = self.job_queue.nqueued()
+        if nqueued > 0:
+            print('Abandoned {} queued jobs'.format(nqueued))
         write_config_file(self)
         self.close()
 
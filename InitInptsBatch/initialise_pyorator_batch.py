@@ -15,19 +15,18 @@ __version__ = '0.0.0'
 # Version history
 # ---------------
 # 
-from os.path import isfile, isdir, normpath, join, exists, lexists, split
-from os import listdir, getcwd, makedirs
+from os.path import isfile, isdir, normpath, join, exists, lexists, split, getmtime
+from os import listdir, getcwd, makedirs, scandir, stat
 from calendar import month_abbr
 
 from json import load as load_json, dump as dump_json
 from json.decoder import JSONDecodeError
 
-from time import sleep
+from time import sleep, perf_counter
+from copy import copy, deepcopy
 import sys
 
 from ora_excel_read_misc import identify_study_areas
-from hwsd_bil import check_hwsd_integrity
-from weather_datasets import read_weather_dsets_detail
 
 from set_up_logging import set_up_logging
 from ora_excel_read import (check_xls_run_file, check_params_excel_file, ReadStudy,
@@ -55,20 +54,23 @@ EXTRA_ORG_WASTE = list(['owex_min', 'owex_max', 'ow_type_indx', 'mnth_appl_indx'
 
 FNAME_ECON = 'PurchasesSalesLabour.xlsx'
 FNAME_RUN = 'FarmWthrMgmt.xlsx'
+FNAME_STARTUP_CACHE = '_startup_cache.json'  # prefixed by program id and written to the config directory
 
-def initiation(form):
+def initiation(form, headless=False):
     """
     this function is called to initiate the programme and process all settings
+    headless: server or batch profile which skips desktop only checks e.g. for Excel and Notepad
     """
     # retrieve settings
     # =================
-    form.settings, form.lookup_df = _read_setup_file(PROGRAM_ID)
+    form.settings, form.lookup_df = _read_setup_file(PROGRAM_ID, headless)
 
     # ORATOR parameters file
     # ======================
     parms_xls_fn = form.settings['params_xls']
     print('Reading: ' + parms_xls_fn)
     form.ora_parms = ReadCropOwNitrogenParms(parms_xls_fn)
+    form.ora_parms_mtime = getmtime(parms_xls_fn)   # parameters are reused by runs until the file changes
     form.anml_prodn = ReadAnmlProdn(parms_xls_fn, form.ora_parms.crop_vars)
 
     # check weather data
@@ -76,6 +78,8 @@ def initiation(form):
     if form.settings['wthr_dir'] is None:
         form.wthr_sets = None
     else:
+        from weather_datasets import read_weather_dsets_detail     # NetCDF is only needed for datasets
+
         form.wthr_sets = read_weather_dsets_detail(form)
         if len(form.wthr_sets) == 0:
             form.wthr_sets = None
@@ -85,6 +89,7 @@ def initiation(form):
     # ===============================================================================
     form.all_runs_output = {}
     form.all_runs_crop_model = {}
+    form.all_runs_mngmnt_fwd = {}
 
     # Set flags to show if crop and livestock models have run
     # ===============================================================================
@@ -94,11 +99,97 @@ def initiation(form):
 
     return
 
-def _read_setup_file(program_id):
+def copy_form(form):
+    """
+    copy of a form which has been through initiation so that it can be used for another farm without repeating
+    initiation; settings are altered by each run whereas parameters and lookup table are shared
+    """
+    new_form = copy(form)
+    new_form.settings = deepcopy(form.settings)
+    new_form.all_runs_output = {}
+    new_form.all_runs_crop_model = {}
+    new_form.all_runs_mngmnt_fwd = {}
+    new_form.crop_run = False
+    new_form.livestock_run = False
+
+    return new_form
+
+def _path_mtimes(path, entries_flag=False):
+    """
+    modification times, in nanoseconds, of a path and optionally of its immediate entries
+    used to decide whether cached start up checks are still valid
+    """
+    if not isdir(path):
+        return None
+
+    mtimes = {path: stat(path).st_mtime_ns}
+    if entries_flag:
+        for entry in scandir(path):
+            mtimes[entry.path] = entry.stat().st_mtime_ns
+
+    return mtimes
+
+def _read_startup_cache(cache_fn):
+    """
+    return dictionary of cached start up checks, each comprising the mtimes on which the check depends and its result
+    """
+    if isfile(cache_fn):
+        try:
+            with open(cache_fn, 'r') as fcache:
+                return load_json(fcache)
+
+        except (JSONDecodeError, OSError, IOError) as err:
+            print(WARN_STR + 'ignoring start up cache file ' + cache_fn + ': ' + str(err))
+
+    return {}
+
+def _write_startup_cache(cache_fn, startup_cache):
+    """
+    failure to write is not fatal - the checks will be repeated at the next start up
+    """
+    try:
+        with open(cache_fn, 'w') as fcache:
+            dump_json(startup_cache, fcache, indent=2)
+
+    except (OSError, IOError) as err:
+        print(WARN_STR + 'could not write start up cache file ' + cache_fn + ': ' + str(err))
+
+    return
+
+def _cached_check(startup_cache, check_name, mtimes, check_fn, *args):
+    """
+    return result of check from the cache if the mtimes are unchanged, otherwise run the check and cache the result
+    result must be JSON serialisable; None indicates failure and is not cached
+    """
+    if check_name in startup_cache and mtimes is not None and startup_cache[check_name]['mtimes'] == mtimes:
+        return startup_cache[check_name]['result']
+
+    result = check_fn(*args)
+    if result is None or mtimes is None:
+        startup_cache.pop(check_name, None)
+    else:
+        startup_cache[check_name] = {'mtimes': mtimes, 'result': result}
+
+    return result
+
+def _check_hwsd(hwsd_dir):
+    """
+    wrapper so that a successful integrity check can be cached
+    """
+    from hwsd_bil import check_hwsd_integrity
+
+    if check_hwsd_integrity(hwsd_dir) is False:
+        return None
+
+    return True
+
+def _read_setup_file(program_id, headless=False):
     """
     read settings used for programme from the setup file, if it exists,
     or create setup file using default values if file does not exist
+    the headless profile skips desktop only checks and validates only what batch runs need
     """
+    strt_time = perf_counter()
     # validate setup file
     # ===================
     fname_setup = program_id + '_setup_batch.json'
@@ -130,23 +221,15 @@ def _read_setup_file(program_id):
 
     print('Read setup file: {}\nLogs will be written to: {}'.format(setup_file, settings['log_dir']))
 
-    # TODO: consider situation when user uses Apache OpenOffice
-    # =========================================================
-    excel_flag = False
-    if isdir(settings['excel_dir']):
-        excel_path = join(settings['excel_dir'], 'EXCEL.EXE')
-        if isfile(excel_path):
-            excel_flag = True
-        else:
-            print(ERROR_STR + 'Excel progam must exist - expected here: ' + excel_path)
+    # Excel and Notepad are only used by the desktop, which is Windows only
+    # =====================================================================
+    headless = headless or settings.get('headless', False) or sys.platform != 'win32'
+    settings['headless'] = headless
+    if headless:
+        print('Using headless profile - desktop checks are skipped')
+        settings['excel_path'] = None
     else:
-        print(ERROR_STR + 'Excel directory must exist - usually here: ' + EXCEL_EXE_PATH)
-
-    if not excel_flag:
-        sleep(sleepTime)
-        sys.exit(0)
-
-    settings['excel_path'] = excel_path
+        settings['excel_path'] = _check_excel_path(settings['excel_dir'])
 
     # validate mandatory lookup table Excel file
     # ==========================================
@@ -171,6 +254,9 @@ def _read_setup_file(program_id):
     econ_xls_fn = normpath(join(tmplt_dir, FNAME_ECON))
     if isfile(econ_xls_fn):
         print('Economics file: ' + econ_xls_fn)
+    elif headless:
+        print(WARN_STR + 'Economics file ' + econ_xls_fn + ' does not exist - economics model cannot be run')
+        econ_xls_fn = None
     else:
         print(ERROR_STR + 'Economics file ' + econ_xls_fn + ' must exist')
         sleep(sleepTime)
@@ -181,7 +267,9 @@ def _read_setup_file(program_id):
     # used to display weather data
     # ============================
     notepad_path = NOTEPAD_EXE_PATH
-    if isfile(notepad_path):
+    if headless:
+        settings['notepad_path'] = None
+    elif isfile(notepad_path):
         settings['notepad_path'] = notepad_path
     else:
         print(WARN_STR + 'Could not find notepad exe file - usually here: ' + NOTEPAD_EXE_PATH)
@@ -207,15 +295,24 @@ def _read_setup_file(program_id):
 
     settings['wthr_dir'] = wthr_dir
 
-    # validate study areas
-    # ====================
-    settings['fname_run'] = FNAME_RUN
-    study_areas = identify_study_areas(None, settings['study_area_dir'], settings['fname_run'])
+    # results of slow checks are cached and reused while the directories they depend on are unchanged
+    # ================================================================================================
+    cache_fn = join(config_dir, program_id + FNAME_STARTUP_CACHE)
+    startup_cache = _read_startup_cache(cache_fn)
 
+    # validate study areas - batch runs are given their run files directory so do not require study areas
+    # ===================================================================================================
+    settings['fname_run'] = FNAME_RUN
+    study_area_dir = settings['study_area_dir']
+    study_areas = _cached_check(startup_cache, 'study_areas', _path_mtimes(study_area_dir), identify_study_areas,
+                                                                            None, study_area_dir, settings['fname_run'])
     if len(study_areas) == 0:
-        print(ERROR_STR + 'No valid study areas in: ' + settings['study_area_dir'])
-        sleep(sleepTime)
-        sys.exit(0)
+        if headless:
+            print(WARN_STR + 'No valid study areas in: ' + study_area_dir)
+        else:
+            print(ERROR_STR + 'No valid study areas in: ' + study_area_dir)
+            sleep(sleepTime)
+            sys.exit(0)
 
     studies = []
     for dirname in study_areas:
@@ -235,17 +332,44 @@ def _read_setup_file(program_id):
     # ===========
     hwsd_dir = settings['hwsd_dir']
     if isdir(hwsd_dir):
-        check_hwsd_integrity(hwsd_dir)
+        _cached_check(startup_cache, 'hwsd_integrity', _path_mtimes(hwsd_dir, entries_flag=True), _check_hwsd,
+                                                                                                        hwsd_dir)
+    elif headless:
+        print(WARN_STR + 'HWSD not detected in ' + hwsd_dir)
     else:
         print(ERROR_STR + 'HWSD not detected in ' + hwsd_dir)
         sleep(sleepTime)
         sys.exit(0)
 
+    _write_startup_cache(cache_fn, startup_cache)
+
     settings['inp_dir'] = ''  # this will be reset after valid Excel inputs file has been identified
     settings['study'] = ''
 
+    print('Validated setup in {:.3f} seconds'.format(perf_counter() - strt_time))
+
     return settings, lookup_df
 
+def _check_excel_path(excel_dir):
+    """
+    TODO: consider situation when user uses Apache OpenOffice
+    """
+    excel_flag = False
+    if isdir(excel_dir):
+        excel_path = join(excel_dir, 'EXCEL.EXE')
+        if isfile(excel_path):
+            excel_flag = True
+        else:
+            print(ERROR_STR + 'Excel progam must exist - expected here: ' + excel_path)
+    else:
+        print(ERROR_STR + 'Excel directory must exist - usually here: ' + EXCEL_EXE_PATH)
+
+    if not excel_flag:
+        sleep(sleepTime)
+        sys.exit(0)
+
+    return excel_path
+
 def read_config_file(form, run_fns_dir):
     """
     read widget settings used in the previous programme session from the config file, if it exists,
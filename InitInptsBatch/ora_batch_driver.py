@@ -0,0 +1,570 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_batch_driver.py
+# Purpose:     run many farms as a pipeline of read, compute and write stages
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   stages are orchestrated by asyncio and connected by bounded queues: a pool of reader threads parses the
+#   run files, a pool of processes runs the steady state and forward runs, and a pool of writer threads writes
+#   the Excel outputs, livestock and economics; while one farm is being computed the next is being read and the
+#   previous written so that neither cores nor disks sit idle
+#
+#   usage: ora_batch_driver.py DIR [DIR ...] [--journal FILE] where DIR is a farm run directory or a study area
+#          directory; with a journal a rerun skips farms which are done and retries those which failed
+#
+#   compute processes can be recycled after a number of farms, a farm can be given a wall clock timeout and
+#   a compute process which exceeds a memory cap is killed and its farm requeued, see ora_worker_pool
+#
+#   parameters read during initiation are published to the compute processes once rather than sent with each
+#   farm, see ora_shared_data, and the monthly values of the results are returned through a mapped file, see
+#   ora_shared_results
+#
+#   farms are dispatched longest first using a cost model learned from earlier batches and large farms are
+#   split into groups of subareas computed as separate tasks, see ora_batch_scheduler
+#
+#   a compute task is started only while the estimated and measured memory of the compute processes remains
+#   within a budget, by default a fraction of physical memory, so that the number of farms computed at once
+#   is limited by memory as well as by cores
+#
+#   identical subareas, e.g. of farms sharing a soil mapping unit, weather grid cell and management template,
+#   are computed once and their results given to each farm which uses them, see ora_result_cache
+#
+#   with --validate all run files are first checked together, see ora_preflight, and farms with errors are
+#   left out of the batch
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_batch_driver.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from argparse import ArgumentParser
+from asyncio import Queue, run, gather, get_running_loop, wrap_future
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count, listdir
+from os.path import abspath, normpath, expanduser, expandvars, isfile, isdir, join
+from time import time
+
+from initialise_pyorator_batch import initiation, read_config_file, copy_form
+from ora_cn_model import (read_farm_inputs, compute_farm, merge_farm_results, record_farm_results, write_farm_outputs,
+                                                                                                wthr_scnr_ntsteps)
+from run_batch_pyora import run_livestock_economics, _read_fwd_wthr_scnrs
+from ora_batch_journal import BatchJournal, MAX_RETRIES
+from ora_worker_pool import SupervisedPool
+from ora_shared_data import publish, published, install, freeze_published
+from ora_shared_results import pack_results, map_results, load_results, mapped_mb, complete_run_objects
+from ora_result_cache import subarea_fingerprint, subarea_results, assign_subarea
+from ora_batch_scheduler import CostModel, prescan_run_file, estimate_memory_mb, sba_units, FNAME_TIMINGS
+from ora_job_queue import physical_memory_mb
+from ora_wthr_extract import site_wthr_scnrs
+from ora_preflight import preflight, FNAME_REPORT
+
+FNAME_RUN = 'FarmWthrMgmt.xlsx'
+NREADERS = 2
+NWRITERS = 2
+MEMORY_FRACTION = 0.7   # default memory budget of compute processes as a fraction of physical memory
+MAX_SHARED_MB = 1024    # results of computed subareas retained for identical subareas of farms yet to be computed
+STAGES = ['read', 'compute', 'write']
+
+ERROR_STR = '*** Error *** '
+WARN_STR = '*** Warning *** '
+
+class FarmJob(object, ):
+    """
+    progress of one farm through the pipeline
+    """
+    def __init__(self, run_dir):
+        """
+        stage times are elapsed seconds keyed by stage
+        """
+        self.run_dir = run_dir
+        self.form = None
+        self.farm_inputs = None
+        self.farm_rslts = None
+        self.status = 'queued'
+        self.error = None
+        self.stage_times = {}
+        self.compute_secs = 0    # summed over the tasks of a farm which has been split
+        self.fwd_wthr_scnrs = None
+
+def _read_farm(warm_form, run_dir):
+    """
+    read stage, in a reader thread
+    """
+    form = copy_form(warm_form)
+    if not read_config_file(form, run_dir):
+        return form, None
+
+    return form, read_farm_inputs(form)
+
+def _compute_farm_packed(ora_parms, ora_weather, ora_subareas, fwd_wthr_scnrs, sbas=None):
+    """
+    compute stage, in a compute process; monthly values of the complete runs of each subarea are returned in a
+    mapped file so that the results of a subarea can be given to other farms
+    returns elapsed seconds and packed results keyed by subarea
+    """
+    strt_time = time()
+    farm_rslts = compute_farm(ora_parms, ora_weather, ora_subareas, fwd_wthr_scnrs, None, 1, sbas)
+    packed_sbas = {}
+    for sba in farm_rslts['all_runs']:
+        sba_rslts = subarea_results(farm_rslts, sba)
+        complete_runs = [sba_rslts['all_runs'][sba]] + [scnr_output[3] for scnr_output in sba_rslts['scnr_outputs']]
+        packed_sbas[sba] = pack_results(sba_rslts, complete_run_objects(complete_runs))
+
+    return time() - strt_time, packed_sbas
+
+def _write_farm(job):
+    """
+    write stage, in a writer thread
+    """
+    ora_parms, study, ora_weather, ora_subareas = job.farm_inputs
+    record_farm_results(job.form, ora_weather, ora_subareas, job.farm_rslts)
+    write_farm_outputs(job.form, study, ora_weather, job.farm_rslts)
+    run_livestock_economics(job.form)
+
+    return
+
+class FarmPipeline(object, ):
+    """
+    farms pass through the read, compute and write stages in order but stages overlap across farms
+    """
+    def __init__(self, warm_form, fwd_wthr_scnrs=None, nreaders=NREADERS, nworkers=None, nwriters=NWRITERS,
+                claim_fn=None, finish_fn=None, max_farms_per_worker=None, farm_timeout=None, max_rss_mb=None,
+                                                        cost_model=None, memory_budget_mb=None, dedup_flag=True):
+        """
+        warm_form has been through initiation; nworkers, the number of compute processes, defaults to the cores
+        claim_fn: optional function of the run directory called before reading, farms are skipped if it returns False
+        finish_fn: optional function called with each job which is done or has failed
+        max_farms_per_worker, farm_timeout (seconds) and max_rss_mb (per compute process) are optional limits which
+        apply to each task of a farm which has been split
+        cost_model: optional CostModel, farms are then dispatched longest first otherwise in the order given
+        memory_budget_mb: optional limit on the memory of the compute processes, see SupervisedPool
+        dedup_flag: compute identical subareas, of the same or different farms, once
+        """
+        if nworkers is None:
+            nworkers = cpu_count()
+
+        self.warm_form = warm_form
+        self.fwd_wthr_scnrs = fwd_wthr_scnrs
+        self.claim_fn = claim_fn
+        self.finish_fn = finish_fn
+        self.cost_model = cost_model
+        self.nworkers = {'read': nreaders, 'compute': nworkers, 'write': nwriters}
+        self.worker_limits = {'max_tasks_per_worker': max_farms_per_worker, 'timeout': farm_timeout,
+                                                        'max_rss_mb': max_rss_mb, 'memory_budget_mb': memory_budget_mb}
+        self.pools = None
+        self.pool_summary = None
+        self.parms_ref = None
+        self.jobs = []
+        self.dedup_flag = dedup_flag
+        self.shared_sbas = {}       # futures of mapped results keyed by subarea fingerprint
+        self.shared_mb = {}
+        self.dedup_counts = {'computed': 0, 'reused': 0, 'units_saved': 0}
+
+    async def _read(self, job):
+        """
+        parse the run file; None indicates the farm has been claimed by another node or is already complete
+        """
+        if self.claim_fn is not None:
+            if not await get_running_loop().run_in_executor(self.pools['read'], self.claim_fn, job.run_dir):
+                return None
+
+        job.form, job.farm_inputs = await get_running_loop().run_in_executor(self.pools['read'], _read_farm,
+                                                                                        self.warm_form, job.run_dir)
+        if job.farm_inputs is None:
+            return False
+
+        job.fwd_wthr_scnrs = await get_running_loop().run_in_executor(self.pools['read'], self._farm_wthr_scnrs, job)
+        return True
+
+    def _farm_wthr_scnrs(self, job):
+        """
+        forward run weather scenarios of a farm, those given as a weather resource are extracted for its location
+        """
+        if self.fwd_wthr_scnrs is None:
+            return None
+
+        study = job.farm_inputs[1]
+        return site_wthr_scnrs(job.form, self.fwd_wthr_scnrs, study.latitude, study.longitude)
+
+    def _subarea_keys(self, job):
+        """
+        subareas with the same key have identical results apart from the area of the crop model
+        """
+        ora_parms, study, ora_weather, ora_subareas = job.farm_inputs
+        if not self.dedup_flag:
+            return {sba: (job.run_dir, sba) for sba in ora_subareas}
+
+        ntsteps_fwd = wthr_scnr_ntsteps(ora_subareas)
+        return {sba: subarea_fingerprint(ora_parms, ora_weather, ora_subareas[sba], job.fwd_wthr_scnrs, False,
+                                                                                ntsteps_fwd) for sba in ora_subareas}
+
+    def _release_shared(self, keys):
+        """
+        results are retained for identical subareas of later farms until they exceed MAX_SHARED_MB, oldest first
+        """
+        if not self.dedup_flag:
+            for key in keys:
+                self.shared_sbas.pop(key, None)
+                self.shared_mb.pop(key, None)
+            return
+
+        tot_mb = sum(self.shared_mb.values())
+        for key in list(self.shared_mb):
+            if tot_mb <= MAX_SHARED_MB:
+                break
+            tot_mb -= self.shared_mb.pop(key)
+            del self.shared_sbas[key]
+
+        return
+
+    async def _compute(self, job):
+        """
+        forward runs of each farm are not fanned out further as the farms already occupy the cores
+        subareas identical to those already computed, or being computed, are not computed again; if the farm
+        computing such a subarea fails then the subarea is computed by this farm
+        """
+        ora_parms, study, ora_weather, ora_subareas = job.farm_inputs
+        if ora_parms is self.warm_form.ora_parms:
+            ora_parms = self.parms_ref      # unchanged since initiation so already held by the compute processes
+
+        sba_keys = await get_running_loop().run_in_executor(self.pools['read'], self._subarea_keys, job)
+        mapped_sbas = {}
+        own_keys = []
+        sbas = list(ora_subareas)
+        while len(sbas) > 0:
+            futures, own_sbas = self._share_subareas(ora_subareas, sbas, sba_keys)
+            own_keys += [sba_keys[sba] for sba in own_sbas]
+            if len(own_sbas) > 0:
+                await self._compute_own(job, own_sbas, sba_keys, ora_parms)
+
+            sbas = []
+            for sba, future in futures.items():
+                try:
+                    mapped_sbas[sba] = await future
+                except Exception as err:
+                    print(WARN_STR + 'computing subarea {} of {} as the farm sharing it failed: {}'
+                                                                                .format(sba, job.run_dir, err))
+                    self.dedup_counts['reused'] -= 1
+                    self.dedup_counts['units_saved'] -= sba_units(ora_subareas, [sba])[sba]
+                    sbas.append(sba)
+
+        farm_rslts_list = [assign_subarea(load_results(mapped), sba, ora_subareas[sba].area_ha)
+                                                        for sba, mapped in mapped_sbas.items() if mapped is not None]
+        job.farm_rslts = merge_farm_results(farm_rslts_list, ora_subareas)
+        self._release_shared(own_keys)
+        return True
+
+    def _share_subareas(self, ora_subareas, sbas, sba_keys):
+        """
+        return futures of results of each subarea and subareas to be computed by this farm, the others being
+        already computed, or being computed, by other farms
+        """
+        futures = {}
+        own_sbas = []
+        for sba in sbas:
+            key = sba_keys[sba]
+            if key in self.shared_sbas:
+                self.dedup_counts['reused'] += 1
+                self.dedup_counts['units_saved'] += sba_units(ora_subareas, [sba])[sba]
+            else:
+                self.shared_sbas[key] = get_running_loop().create_future()
+                self.shared_sbas[key].add_done_callback(lambda future: future.cancelled() or future.exception())
+                own_sbas.append(sba)
+            futures[sba] = self.shared_sbas[key]
+
+        return futures, own_sbas
+
+    async def _compute_own(self, job, own_sbas, sba_keys, ora_parms):
+        """
+        compute subareas not already computed and make their results available to identical subareas
+        """
+        study, ora_weather, ora_subareas = job.farm_inputs[1:]
+        own_subareas = {sba: ora_subareas[sba] for sba in own_sbas}
+        if self.cost_model is None:
+            sba_groups = [own_sbas]
+        else:
+            sba_groups = self.cost_model.subarea_groups(job.run_dir, own_subareas, self.nworkers['compute'])
+            if len(sba_groups) > 1:
+                print('Splitting {} into {} tasks: '.format(job.run_dir, len(sba_groups)) +
+                                                            ' '.join([','.join(sbas) for sbas in sba_groups]))
+
+        nwthr_scnrs = 0 if job.fwd_wthr_scnrs is None else len(job.fwd_wthr_scnrs)
+        try:
+            rslts = await gather(*[wrap_future(self.pools['compute'].submit_estimated(
+                                        estimate_memory_mb(ora_subareas, sbas, nwthr_scnrs), _compute_farm_packed,
+                                        ora_parms, ora_weather, ora_subareas, job.fwd_wthr_scnrs, sbas))
+                                                                                            for sbas in sba_groups])
+        except Exception as err:
+            for sba in own_sbas:
+                self.shared_sbas.pop(sba_keys[sba]).set_exception(err)  # waiting farms compute them, see _compute
+            raise
+
+        job.compute_secs = sum([elapsed for elapsed, packed_sbas in rslts])
+        for elapsed, packed_sbas in rslts:
+            for sba, packed in packed_sbas.items():
+                mapped = map_results(packed)
+                self.shared_mb[sba_keys[sba]] = mapped_mb(mapped)
+                self.shared_sbas[sba_keys[sba]].set_result(mapped)
+
+        for sba in own_sbas:
+            if not self.shared_sbas[sba_keys[sba]].done():
+                self.shared_sbas[sba_keys[sba]].set_result(None)  # e.g. steady state did not converge
+
+        self.dedup_counts['computed'] += len(own_sbas)
+        return
+
+    async def _write(self, job):
+        """
+        write outputs then run livestock and economics models
+        """
+        await get_running_loop().run_in_executor(self.pools['write'], _write_farm, job)
+
+        return True
+
+    def _finish(self, job):
+        """
+        a finish function must not stop the pipeline
+        """
+        if self.cost_model is not None:
+            work_secs = job.compute_secs + sum([job.stage_times[stage] for stage in job.stage_times
+                                                                                        if stage != 'compute'])
+            self.cost_model.record(job, work_secs)
+
+        if self.finish_fn is not None:
+            try:
+                self.finish_fn(job)
+            except Exception as err:
+                print(WARN_STR + 'could not record status of {}: {}'.format(job.run_dir, err))
+
+        return
+
+    async def _stage_worker(self, stage, stage_fn, inp_queue, out_queue):
+        """
+        take jobs from the input queue until a sentinel is received; jobs which fail or are skipped are not passed on
+        """
+        while True:
+            job = await inp_queue.get()
+            if job is None:
+                break
+
+            job.status = stage
+            strt_time = time()
+            try:
+                ok_flag = await stage_fn(job)
+            except Exception as err:
+                job.error = '{}: {}'.format(type(err).__name__, err)
+                print(ERROR_STR + '{} stage failed for {}: {}'.format(stage, job.run_dir, job.error))
+                ok_flag = False
+            job.stage_times[stage] = time() - strt_time
+
+            if ok_flag is None:
+                job.status = 'skipped'
+                del job.stage_times[stage]
+            elif not ok_flag:
+                job.status = 'failed'
+                self._finish(job)
+            elif out_queue is None:
+                job.status = 'done'
+                self._finish(job)
+            else:
+                await out_queue.put(job)     # waits while the next stage is busy
+
+        return
+
+    async def _run_stage(self, stage, stage_fn, inp_queue, out_queue):
+        """
+        run the workers of a stage then signal the end of input to the next stage
+        """
+        await gather(*[self._stage_worker(stage, stage_fn, inp_queue, out_queue)
+                                                                        for iwrkr in range(self.nworkers[stage])])
+        if out_queue is not None:
+            next_stage = STAGES[STAGES.index(stage) + 1]
+            for iwrkr in range(self.nworkers[next_stage]):
+                await out_queue.put(None)
+
+        return
+
+    async def run_async(self, run_dirs):
+        """
+        queues between stages are bounded so that farms are not read far in advance of being computed
+        """
+        if self.cost_model is not None:
+            with ThreadPoolExecutor(self.nworkers['read']) as scan_pool:
+                scans = list(scan_pool.map(prescan_run_file, run_dirs))
+            self.cost_model.estimate(run_dirs, scans)
+            run_dirs = self.cost_model.longest_first(run_dirs)
+
+        self.jobs = [FarmJob(run_dir) for run_dir in run_dirs]
+
+        read_queue = Queue()
+        for job in self.jobs:
+            read_queue.put_nowait(job)
+        for iwrkr in range(self.nworkers['read']):
+            read_queue.put_nowait(None)
+
+        compute_queue = Queue(maxsize=self.nworkers['compute'])
+        write_queue = Queue(maxsize=self.nworkers['write'])
+
+        self.parms_ref = publish('ora_parms', self.warm_form.ora_parms)
+        freeze_published()
+
+        with ThreadPoolExecutor(self.nworkers['read']) as read_pool, \
+                SupervisedPool(self.nworkers['compute'], initializer=install, initargs=published(),
+                                                                    **self.worker_limits) as compute_pool, \
+                                                            ThreadPoolExecutor(self.nworkers['write']) as write_pool:
+            self.pools = {'read': read_pool, 'compute': compute_pool, 'write': write_pool}
+            await gather(self._run_stage('read', self._read, read_queue, compute_queue),
+                         self._run_stage('compute', self._compute, compute_queue, write_queue),
+                         self._run_stage('write', self._write, write_queue, None))
+        self.pool_summary = compute_pool.summary()
+        self.pools = None
+
+        return self.jobs
+
+    def run(self, run_dirs):
+        """
+        run all farms and report the time each spent in each stage
+        """
+        strt_time = time()
+        jobs = run(self.run_async(run_dirs))
+        wall_time = time() - strt_time
+
+        print('\nFarm pipeline summary')
+        print('\t{:<10}'.format('status') + ''.join(['{:>10}'.format(stage) for stage in STAGES]) + '\trun directory')
+        for job in jobs:
+            if job.status == 'skipped':
+                continue
+            line = '\t{:<10}'.format(job.status)
+            for stage in STAGES:
+                line += '{:>10.1f}'.format(job.stage_times[stage]) if stage in job.stage_times else ' ' * 10
+            print(line + '\t' + job.run_dir)
+            if job.error is not None:
+                print('\t\t' + job.error)
+
+        busy_time = sum([sum(job.stage_times.values()) for job in jobs])
+        ndone = len([job for job in jobs if job.status == 'done'])
+        nskipped = len([job for job in jobs if job.status == 'skipped'])
+        print('{} of {} farms completed in {:.1f} seconds; stage times total {:.1f} seconds'
+                                                        .format(ndone, len(jobs) - nskipped, wall_time, busy_time))
+        if nskipped > 0:
+            print('{} farms were skipped as claimed by other nodes or already complete'.format(nskipped))
+        print('Compute processes: ' + self.pool_summary)
+        if self.dedup_counts['reused'] > 0:
+            print('Subareas: {} computed, {} identical subareas reused saving {:.0f} subarea months'
+                .format(self.dedup_counts['computed'], self.dedup_counts['reused'], self.dedup_counts['units_saved']))
+        if self.cost_model is not None:
+            self.cost_model.save()
+
+        return jobs
+
+def expand_run_dirs(dirs):
+    """
+    a directory without a run file is treated as a study area and its farm directories with run files are used
+    """
+    run_dirs = []
+    for dirname in dirs:
+        dirname = abspath(normpath(expanduser(expandvars(dirname))))
+        if isfile(join(dirname, FNAME_RUN)):
+            run_dirs.append(dirname)
+        elif isdir(dirname):
+            farm_dirs = [join(dirname, farm) for farm in sorted(listdir(dirname))
+                                                                        if isfile(join(dirname, farm, FNAME_RUN))]
+            if len(farm_dirs) == 0:
+                print(WARN_STR + 'no run files in ' + dirname)
+            run_dirs += farm_dirs
+        else:
+            print(WARN_STR + dirname + ' is not a directory')
+
+    return run_dirs
+
+class _WarmForm(object, ):
+    """
+    holds attributes created by initiation
+    """
+
+def main():
+    """
+    Entry point
+    """
+    argparser = ArgumentParser(prog=__prog__, description='Run farms as a pipeline of read, compute and write stages')
+    argparser.add_argument('dirs', nargs='+', help='farm run directories or study area directories')
+    argparser.add_argument('--fwd_wthr', action='append', metavar='SCENARIO=CSV|RESOURCE',
+                           help='forward run weather for an additional climate scenario from a CSV file or a weather '
+                                'resource e.g. ClimGen_A1B, may be repeated')
+    argparser.add_argument('--nreaders', type=int, default=NREADERS, help='number of reader threads')
+    argparser.add_argument('--nworkers', type=int, help='number of compute processes, defaults to number of cores')
+    argparser.add_argument('--nwriters', type=int, default=NWRITERS, help='number of writer threads')
+    argparser.add_argument('--headless', action='store_true',
+                           help='server or batch profile which skips desktop only set up checks')
+    argparser.add_argument('--journal', metavar='FILE', help='journal file which allows the batch to be resumed')
+    argparser.add_argument('--max_retries', type=int, default=MAX_RETRIES,
+                           help='number of times a failed or interrupted farm is retried when the batch is resumed')
+    argparser.add_argument('--max_farms_per_worker', type=int,
+                           help='replace each compute process after this number of farms to release its memory')
+    argparser.add_argument('--farm_timeout', type=float, metavar='MINUTES',
+                           help='kill the computation of a farm which takes longer than this')
+    argparser.add_argument('--max_rss_mb', type=float,
+                           help='kill a compute process whose memory exceeds this and requeue its farm')
+    argparser.add_argument('--memory_budget_mb', type=float,
+                           help='memory available to compute processes, defaults to {:.0%} of physical memory'
+                                                                                        .format(MEMORY_FRACTION))
+    argparser.add_argument('--fifo', action='store_true',
+                           help='run farms in the order given rather than longest first and do not split farms')
+    argparser.add_argument('--timings', metavar='FILE',
+                           help='farm timings used to estimate costs, defaults to ' + FNAME_TIMINGS + ' in the '
+                                                                                            'configuration directory')
+    argparser.add_argument('--no_dedup', action='store_true',
+                           help='compute every subarea even if identical to a subarea already computed')
+    argparser.add_argument('--validate', action='store_true',
+                           help='check all run files before scheduling and leave out farms with errors')
+    argparser.add_argument('--report', default=FNAME_REPORT, help='validation report file, CSV')
+    args = argparser.parse_args()
+
+    run_dirs = expand_run_dirs(args.dirs)
+    if len(run_dirs) == 0:
+        print(ERROR_STR + 'no farms to run')
+        return
+
+    warm_form = _WarmForm()
+    initiation(warm_form, args.headless)
+    if args.validate:
+        run_dirs = preflight(run_dirs, warm_form.ora_parms, args.report, args.nworkers)
+        if len(run_dirs) == 0:
+            print(ERROR_STR + 'no valid farms to run')
+            return
+
+    if args.journal is None:
+        journal = None
+        claim_fn, finish_fn = None, None
+    else:
+        journal = BatchJournal(args.journal, args.max_retries, [warm_form.settings['params_xls']])
+        claim_fn, finish_fn = journal.start, journal.finish
+
+    if args.fifo:
+        cost_model = None
+    else:
+        timings_fn = args.timings
+        if timings_fn is None:
+            timings_fn = join(warm_form.settings['config_dir'], FNAME_TIMINGS)
+        cost_model = CostModel(timings_fn)
+
+    memory_budget_mb = args.memory_budget_mb
+    if memory_budget_mb is None:
+        mem_mb = physical_memory_mb()
+        if mem_mb is not None:
+            memory_budget_mb = MEMORY_FRACTION * mem_mb
+            print('Memory budget of compute processes: {:.0f} MB'.format(memory_budget_mb))
+
+    farm_timeout = None if args.farm_timeout is None else 60 * args.farm_timeout
+    pipeline = FarmPipeline(warm_form, _read_fwd_wthr_scnrs(args.fwd_wthr), args.nreaders, args.nworkers,
+                            args.nwriters, claim_fn, finish_fn, args.max_farms_per_worker, farm_timeout,
+                                    args.max_rss_mb, cost_model, memory_budget_mb, not args.no_dedup)
+    pipeline.run(run_dirs)
+    if journal is not None:
+        journal.close()
+
+if __name__ == '__main__':
+    main()
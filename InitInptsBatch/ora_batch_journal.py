@@ -0,0 +1,169 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_batch_journal.py
+# Purpose:     append only journal which allows batch runs to be resumed
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   each line of the journal is a JSON record of a farm being started, done or failed together with a hash of
+#   its inputs and, when finished, the status of each subarea and the output directory; on restart the journal
+#   is replayed so that farms which are done with unchanged inputs are skipped and farms which failed, or were
+#   interrupted, are retried up to a limit
+#   farms are started from the reader threads of the pipeline and finished from its event loop so access to the
+#   journal is serialised by a lock
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_batch_journal.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import fsync
+from os.path import isfile, join
+from hashlib import sha256
+from json import loads as loads_json, dumps as dumps_json
+from json.decoder import JSONDecodeError
+from datetime import datetime
+from threading import Lock
+
+FNAME_RUN = 'FarmWthrMgmt.xlsx'
+MAX_RETRIES = 2
+CHUNK_SIZE = 2**20
+
+WARN_STR = '*** Warning *** '
+
+def hash_files(fnames):
+    """
+    hash of the contents of files, missing files are hashed by name only
+    """
+    hasher = sha256()
+    for fname in fnames:
+        hasher.update(fname.encode())
+        if isfile(fname):
+            with open(fname, 'rb') as fobj:
+                for chunk in iter(lambda: fobj.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+class BatchJournal(object, ):
+    """
+    latest record and number of attempts of each farm are reconstructed from the journal
+    """
+    def __init__(self, journal_fn, max_retries=MAX_RETRIES, common_inputs=None):
+        """
+        common_inputs: optional files used by all farms e.g. the parameters workbook, a change reruns every farm
+        """
+        self.journal_fn = journal_fn
+        self.max_retries = max_retries
+        self.common_hash = hash_files([] if common_inputs is None else common_inputs)
+        self.farms = {}         # latest record keyed by run directory
+        self.attempts = {}      # number of attempts with the current inputs keyed by run directory
+        self.input_hashes = {}
+        self.lock = Lock()
+
+        self._replay()
+        self.fjournal = open(journal_fn, 'a')
+        if self.fjournal.tell() > 0:
+            with open(journal_fn, 'rb') as fjournal:
+                fjournal.seek(-1, 2)
+                if fjournal.read(1) != b'\n':
+                    self.fjournal.write('\n')     # terminate a partial record so it does not corrupt the next
+
+    def _replay(self):
+        """
+        a partial last line, e.g. after a power cut, is ignored
+        """
+        if not isfile(self.journal_fn):
+            return
+
+        nrecs = 0
+        with open(self.journal_fn, 'r') as fjournal:
+            for line in fjournal:
+                try:
+                    rec = loads_json(line)
+                except JSONDecodeError:
+                    print(WARN_STR + 'ignoring incomplete journal record: ' + line.strip()[:80])
+                    continue
+
+                run_dir = rec['run_dir']
+                prev_rec = self.farms.get(run_dir)
+                if prev_rec is None or prev_rec['input_hash'] != rec['input_hash']:
+                    self.attempts[run_dir] = 0
+                if rec['status'] == 'started':
+                    self.attempts[run_dir] += 1
+                self.farms[run_dir] = rec
+                nrecs += 1
+
+        ndone = len([rec for rec in self.farms.values() if rec['status'] == 'done'])
+        print('Replayed {} journal records: {} of {} farms done'.format(nrecs, ndone, len(self.farms)))
+
+        return
+
+    def _append(self, rec):
+        """
+        each record is flushed to disk so that it survives the process; called with the lock held
+        """
+        rec['time'] = datetime.now().isoformat(timespec='seconds')
+        self.fjournal.write(dumps_json(rec, default=float) + '\n')
+        self.fjournal.flush()
+        fsync(self.fjournal.fileno())
+
+        self.farms[rec['run_dir']] = rec
+
+        return
+
+    def _input_hash(self, run_dir):
+        """
+        run file and common inputs
+        """
+        return hash_files([join(run_dir, FNAME_RUN)]) + self.common_hash[:16]
+
+    def start(self, run_dir):
+        """
+        return False if the farm is done with unchanged inputs or has failed too often, otherwise record the start
+        an interrupted run counts as a failed attempt
+        """
+        input_hash = self._input_hash(run_dir)
+        with self.lock:
+            prev_rec = self.farms.get(run_dir)
+            if prev_rec is None or prev_rec['input_hash'] != input_hash:
+                self.attempts[run_dir] = 0
+            elif prev_rec['status'] == 'done':
+                return False
+            elif self.attempts[run_dir] > self.max_retries:
+                print(WARN_STR + 'not retrying {} after {} attempts'.format(run_dir, self.attempts[run_dir]))
+                return False
+
+            self.attempts[run_dir] += 1
+            self.input_hashes[run_dir] = input_hash
+            self._append({'run_dir': run_dir, 'status': 'started', 'input_hash': input_hash,
+                                                                                    'attempt': self.attempts[run_dir]})
+            return True
+
+    def finish(self, job):
+        """
+        record the farm, the status of each subarea and the output directory
+        """
+        sba_statuses = {}
+        if job.farm_inputs is not None:
+            ora_subareas = job.farm_inputs[3]
+            done_sbas = {} if job.farm_rslts is None else job.farm_rslts['all_runs']
+            for sba in ora_subareas:
+                sba_statuses[sba] = 'done' if sba in done_sbas and job.status == 'done' else 'failed'
+
+        out_dir = None if job.form is None else job.form.settings.get('out_dir')
+        with self.lock:
+            self._append({'run_dir': job.run_dir, 'status': job.status, 'input_hash': self.input_hashes[job.run_dir],
+                          'attempt': self.attempts[job.run_dir], 'subareas': sba_statuses, 'out_dir': out_dir,
+                                                                'stage_times': job.stage_times, 'error': job.error})
+        return
+
+    def close(self):
+        """
+        journal file remains valid if not closed
+        """
+        self.fjournal.close()
+
+        return
@@ -0,0 +1,215 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_batch_scheduler.py
+# Purpose:     estimate the cost of each farm so that a batch can be dispatched longest first
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   the cost of a farm, in units of subarea months, is estimated from a pre-scan of its run file which reads
+#   only the subareas sheet and the dimensions of the management sheets; seconds per unit are learned from the
+#   timings of earlier batches and farms which have been timed before use their own timing
+#   farms are dispatched longest first so that cores are not left idle by a long farm at the end of a batch and
+#   a farm whose cost exceeds the batch cost per compute process is split into groups of subareas
+#   the peak memory of a compute task is likewise estimated from its subarea months, see SupervisedPool
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_batch_scheduler.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os.path import isfile, join
+from json import load as load_json, dump as dump_json
+from json.decoder import JSONDecodeError
+from math import ceil
+
+from openpyxl import load_workbook
+
+from ora_excel_read import RUN_SHT_NAMES, MAX_SUB_AREAS, mngmnt_scnr_sheets
+
+FNAME_RUN = 'FarmWthrMgmt.xlsx'
+FNAME_TIMINGS = 'pyorator_farm_timings.json'
+LVSTCK_UNITS = 0.1      # livestock and economics relative to the subarea months of the farm
+WORKER_BASE_MB = 250    # compute process with models imported and parameters inherited
+MB_PER_SBA_MNTH = 0.01  # monthly lists of carbon, nitrogen and soil water objects for both NPP models
+
+WARN_STR = '*** Warning *** '
+
+def prescan_run_file(run_dir):
+    """
+    return subarea months including management scenarios and whether livestock is present, or None
+    """
+    run_xls_fn = join(run_dir, FNAME_RUN)
+    try:
+        wb_obj = load_workbook(run_xls_fn, read_only=True, data_only=True)
+    except (OSError, KeyError, ValueError) as err:
+        print(WARN_STR + 'could not pre-scan ' + run_xls_fn + ': ' + str(err))
+        return None
+
+    sba_units = {}
+    try:
+        sbas_sht = wb_obj[RUN_SHT_NAMES['sbas']]
+        sba_rows = list(sbas_sht.iter_rows(min_row=2, max_row=MAX_SUB_AREAS + 1, max_col=2, values_only=True))
+        sbas = [row[0] for row in sba_rows if row[0] is not None]
+        for sba, descr in sba_rows:
+            if descr is None or sba not in wb_obj.sheetnames:
+                continue
+
+            nmnths = wb_obj[sba].max_row - 1
+            nscnrs = len(mngmnt_scnr_sheets(wb_obj.sheetnames, sba, sbas))
+            sba_units[sba] = nmnths * (1 + nscnrs)
+
+        lvstck_flag = RUN_SHT_NAMES['lvstck'] in wb_obj.sheetnames and wb_obj[RUN_SHT_NAMES['lvstck']].max_row > 1
+
+    except (KeyError, TypeError, ValueError) as err:
+        print(WARN_STR + 'could not pre-scan ' + run_xls_fn + ': ' + str(err))   # sheet or its dimensions missing
+        return None
+
+    finally:
+        wb_obj.close()
+
+    return {'sba_units': sba_units, 'lvstck': lvstck_flag}
+
+def sba_units(ora_subareas, sbas=None):
+    """
+    subarea months, including forward run management scenarios, of each subarea of a farm which has been read
+    """
+    if sbas is None:
+        sbas = list(ora_subareas)
+
+    return {sba: ora_subareas[sba].ntsteps_ss + ora_subareas[sba].ntsteps_fwd *
+                                            (1 + len(ora_subareas[sba].crop_mngmnt_fwd_scnrs)) for sba in sbas}
+
+def estimate_memory_mb(ora_subareas, sbas=None, nwthr_scnrs=0):
+    """
+    peak memory of a compute process running the given subareas, by default all, of a farm
+    forward runs for alternative weather share the steady state of each subarea
+    """
+    units = sba_units(ora_subareas, sbas)
+    nmnths_fwd = sum([ora_subareas[sba].ntsteps_fwd for sba in units])
+
+    return WORKER_BASE_MB + MB_PER_SBA_MNTH * (sum(units.values()) + nwthr_scnrs * nmnths_fwd)
+
+def split_subareas(sba_units, ngroups):
+    """
+    assign subareas, largest first, to the group with the least units; groups keep the subarea order
+    """
+    groups = [[] for igrp in range(ngroups)]
+    group_units = [0] * ngroups
+    for sba in sorted(sba_units, key=sba_units.get, reverse=True):
+        igrp = group_units.index(min(group_units))
+        groups[igrp].append(sba)
+        group_units[igrp] += sba_units[sba]
+
+    order = list(sba_units)
+
+    return [sorted(group, key=order.index) for group in groups if len(group) > 0]
+
+class CostModel(object, ):
+    """
+    estimated seconds of each farm; unknown until timings have been recorded so costs are then in units
+    """
+    def __init__(self, timings_fn=None):
+        """
+        timings_fn: optional file of earlier timings keyed by run directory, updated by save
+        """
+        self.timings_fn = timings_fn
+        self.timings = {}
+        if timings_fn is not None and isfile(timings_fn):
+            try:
+                with open(timings_fn, 'r') as ftimings:
+                    self.timings = load_json(ftimings)
+            except (JSONDecodeError, OSError) as err:
+                print(WARN_STR + 'ignoring farm timings ' + timings_fn + ': ' + str(err))
+
+        self.scans = {}
+        self.costs = {}
+
+    def _secs_per_unit(self):
+        """
+        learned from all recorded farms, None if there are none
+        """
+        tot_units = sum([rec['units'] for rec in self.timings.values()])
+        tot_secs = sum([rec['secs'] for rec in self.timings.values()])
+
+        return None if tot_units == 0 else tot_secs / tot_units
+
+    @staticmethod
+    def _units(scan):
+        """
+        subarea months of the farm with an allowance for livestock and economics
+        """
+        units = sum(scan['sba_units'].values())
+
+        return units * (1 + LVSTCK_UNITS) if scan['lvstck'] else units
+
+    def estimate(self, run_dirs, scans):
+        """
+        scans are the results of prescan_run_file for each run directory; farms which could not be scanned are
+        given the mean cost; returns costs keyed by run directory
+        """
+        secs_per_unit = self._secs_per_unit()
+        for run_dir, scan in zip(run_dirs, scans):
+            self.scans[run_dir] = scan
+            if scan is None:
+                continue
+
+            units = self._units(scan)
+            rec = self.timings.get(run_dir)
+            if rec is not None and rec['units'] == units and secs_per_unit is not None:
+                self.costs[run_dir] = rec['secs']
+            else:
+                self.costs[run_dir] = units if secs_per_unit is None else units * secs_per_unit
+
+        known = [self.costs[run_dir] for run_dir in run_dirs if run_dir in self.costs]
+        mean_cost = sum(known) / len(known) if len(known) > 0 else 1
+        for run_dir in run_dirs:
+            if run_dir not in self.costs:
+                self.costs[run_dir] = mean_cost
+
+        return self.costs
+
+    def longest_first(self, run_dirs):
+        """
+        order of dispatch
+        """
+        return sorted(run_dirs, key=lambda run_dir: self.costs[run_dir], reverse=True)
+
+    def subarea_groups(self, run_dir, ora_subareas, nworkers):
+        """
+        groups of subareas to be computed as separate tasks, a single group unless the farm costs more than the
+        batch cost per compute process
+        """
+        tot_cost = sum(self.costs.values())
+        share = tot_cost / max(1, nworkers)
+        cost = self.costs.get(run_dir, 0)
+        if cost <= share or len(ora_subareas) < 2 or share <= 0:
+            return [list(ora_subareas)]
+
+        return split_subareas(sba_units(ora_subareas), min(len(ora_subareas), ceil(cost / share)))
+
+    def record(self, job, work_secs):
+        """
+        record seconds of work, summed over processes, of a completed farm
+        """
+        scan = self.scans.get(job.run_dir)
+        if job.status == 'done' and scan is not None:
+            self.timings[job.run_dir] = {'units': self._units(scan), 'secs': work_secs}
+
+        return
+
+    def save(self):
+        """
+        write timings for use by later batches
+        """
+        if self.timings_fn is None:
+            return
+
+        try:
+            with open(self.timings_fn, 'w') as ftimings:
+                dump_json(self.timings, ftimings, indent=2)
+        except OSError as err:
+            print(WARN_STR + 'could not write farm timings ' + self.timings_fn + ': ' + str(err))
+
+        return
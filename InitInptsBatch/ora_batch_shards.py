@@ -0,0 +1,332 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_batch_shards.py
+# Purpose:     share a batch of farms between nodes which mount the same file system
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   a manifest lists the farm run directories; each node runs the farm pipeline over the manifest and claims
+#   a farm, by exclusive creation of a claim file in the farm directory, just before reading it so that nodes
+#   share the farms in proportion to their throughput; the status and summary of each farm are written to its
+#   directory and a final merge step gathers them into a single file
+#   while a node holds a claim it touches the claim file periodically so that a claim is only judged stale, and
+#   taken over by another node, once its node has stopped updating it
+#
+#   usage: ora_batch_shards.py manifest MANIFEST DIR [DIR ...]
+#          ora_batch_shards.py node MANIFEST [--nworkers N] [--stale_hours H]
+#          ora_batch_shards.py merge MANIFEST
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_batch_shards.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from argparse import ArgumentParser
+from os import open as os_open, fdopen, rename, replace, getpid, utime, O_CREAT, O_EXCL, O_WRONLY
+from os.path import isfile, join, getmtime, splitext, abspath
+from socket import gethostname
+from json import load as load_json, dump as dump_json
+from json.decoder import JSONDecodeError
+from datetime import datetime
+from time import time
+from csv import writer as csv_writer
+from threading import Thread, Event, Lock
+
+from ora_batch_driver import FarmPipeline, expand_run_dirs, NREADERS, NWRITERS
+from ora_cn_summary_fns import SUMMARY_METRICS
+
+FNAME_CLAIM = 'pyorator_claim.json'
+FNAME_STATUS = 'pyorator_status.json'
+HEARTBEAT_SECS = 60     # interval between touches of the claim files held by a node
+
+ERROR_STR = '*** Error *** '
+WARN_STR = '*** Warning *** '
+
+class _WarmForm(object, ):
+    """
+    holds attributes created by initiation
+    """
+
+def _node_id():
+    """
+    identifies the node and process which claims a farm; safe for use in file names
+    """
+    return '{}_{}'.format(gethostname(), getpid())
+
+def _write_json_atomic(fname, contents):
+    """
+    write to a temporary file then rename so that readers never see a partial file
+    """
+    fname_tmp = fname + '.' + _node_id() + '.tmp'
+    with open(fname_tmp, 'w') as fobj:
+        dump_json(contents, fobj, indent=2, default=float)
+    replace(fname_tmp, fname)
+
+    return
+
+def write_manifest(manifest_fn, dirs):
+    """
+    list of farm run directories; study area directories are expanded into their farms
+    """
+    run_dirs = expand_run_dirs(dirs)
+    manifest = {'created': datetime.now().isoformat(timespec='seconds'), 'run_dirs': run_dirs}
+    _write_json_atomic(manifest_fn, manifest)
+    print('Wrote manifest of {} farms: {}'.format(len(run_dirs), manifest_fn))
+
+    return run_dirs
+
+def read_manifest(manifest_fn):
+    """
+    return list of farm run directories or None
+    """
+    try:
+        with open(manifest_fn, 'r') as fmanifest:
+            return load_json(fmanifest)['run_dirs']
+
+    except (JSONDecodeError, OSError, KeyError) as err:
+        print(ERROR_STR + 'could not read manifest ' + manifest_fn + ': ' + str(err))
+        return None
+
+def read_farm_status(run_dir):
+    """
+    return status written when the farm was done or failed, or None
+    """
+    status_fn = join(run_dir, FNAME_STATUS)
+    if not isfile(status_fn):
+        return None
+
+    try:
+        with open(status_fn, 'r') as fstatus:
+            return load_json(fstatus)
+
+    except (JSONDecodeError, OSError) as err:
+        print(WARN_STR + 'could not read ' + status_fn + ': ' + str(err))
+        return None
+
+def _claim_node(claim_fn):
+    """
+    node which holds a claim or None if the claim file cannot be read
+    """
+    try:
+        with open(claim_fn, 'r') as fclaim:
+            return load_json(fclaim)['node']
+
+    except (JSONDecodeError, OSError, KeyError):
+        return None
+
+class FarmClaims(object, ):
+    """
+    claims farms for this node; a claim of a node which has died can be taken over once it has not been touched
+    for stale_secs, see start_heartbeat
+    """
+    def __init__(self, stale_secs=None, heartbeat_secs=HEARTBEAT_SECS):
+        """
+        stale_secs: None means claims never become stale
+        heartbeat_secs: interval between touches of held claims, reduced if necessary to a quarter of stale_secs
+        """
+        self.node_id = _node_id()
+        self.stale_secs = stale_secs
+        if stale_secs is not None:
+            heartbeat_secs = min(heartbeat_secs, stale_secs / 4)
+        self.heartbeat_secs = heartbeat_secs
+        self.held = set()       # run directories claimed and not yet finished
+        self.held_lock = Lock()
+        self.stop_event = Event()
+        self.heartbeat = None
+
+    def start_heartbeat(self):
+        """
+        touch held claim files from a background thread until stop_heartbeat
+        """
+        self.stop_event.clear()
+        self.heartbeat = Thread(target=self._beat, daemon=True)
+        self.heartbeat.start()
+
+        return
+
+    def stop_heartbeat(self):
+        """
+        claims not finished are left to become stale
+        """
+        self.stop_event.set()
+        if self.heartbeat is not None:
+            self.heartbeat.join()
+            self.heartbeat = None
+
+        return
+
+    def _beat(self):
+        while not self.stop_event.wait(self.heartbeat_secs):
+            self.touch()
+
+        return
+
+    def touch(self):
+        """
+        update the modification time of each held claim; a claim which has been taken over by another node, e.g. after
+        this node was suspended, is no longer held
+        """
+        with self.held_lock:
+            held = list(self.held)
+
+        for run_dir in held:
+            claim_fn = join(run_dir, FNAME_CLAIM)
+            if _claim_node(claim_fn) != self.node_id:
+                print(WARN_STR + 'claim ' + claim_fn + ' has been taken over by another node')
+                with self.held_lock:
+                    self.held.discard(run_dir)
+                continue
+            try:
+                utime(claim_fn)
+            except OSError as err:
+                print(WARN_STR + 'could not touch claim ' + claim_fn + ': ' + str(err))
+
+        return
+
+    def claim(self, run_dir):
+        """
+        exclusive creation is atomic, including on NFS version 3 and later, so only one node succeeds
+        """
+        if isfile(join(run_dir, FNAME_STATUS)):
+            return False    # already complete
+
+        claim_fn = join(run_dir, FNAME_CLAIM)
+        try:
+            fd = os_open(claim_fn, O_CREAT | O_EXCL | O_WRONLY)
+        except FileExistsError:
+            return self._claim_stale(run_dir, claim_fn)
+        except OSError as err:
+            print(WARN_STR + 'could not claim ' + run_dir + ': ' + str(err))
+            return False
+
+        with fdopen(fd, 'w') as fclaim:
+            dump_json({'node': self.node_id, 'claimed': datetime.now().isoformat(timespec='seconds')}, fclaim)
+
+        with self.held_lock:
+            self.held.add(run_dir)
+
+        return True
+
+    def _claim_stale(self, run_dir, claim_fn):
+        """
+        renaming the stale claim is atomic so only one node can take it over
+        """
+        try:
+            if self.stale_secs is None or time() - getmtime(claim_fn) < self.stale_secs:
+                return False
+
+            rename(claim_fn, claim_fn + '.stale.' + self.node_id)
+        except OSError:
+            return False    # another node took it over first
+
+        print(WARN_STR + 'taking over stale claim ' + claim_fn)
+        return self.claim(run_dir)
+
+    def finish(self, job):
+        """
+        record status, stage times, output location and scenario summaries in the farm directory
+        """
+        with self.held_lock:
+            self.held.discard(job.run_dir)
+
+        status = {'run_dir': job.run_dir, 'node': self.node_id, 'status': job.status, 'error': job.error,
+                  'finished': datetime.now().isoformat(timespec='seconds'), 'stage_times': job.stage_times,
+                  'out_dir': None, 'summaries': {}}
+        if job.form is not None:
+            status['out_dir'] = job.form.settings.get('out_dir')
+        if job.farm_rslts is not None:
+            status['summaries'] = job.farm_rslts['scnr_summaries']
+
+        _write_json_atomic(join(job.run_dir, FNAME_STATUS), status)
+
+        return
+
+def run_node(manifest_fn, warm_form, nreaders=NREADERS, nworkers=None, nwriters=NWRITERS, stale_secs=None,
+                                                                                            fwd_wthr_scnrs=None):
+    """
+    process farms of the manifest which have not been claimed by other nodes
+    """
+    run_dirs = read_manifest(manifest_fn)
+    if run_dirs is None:
+        return None
+
+    claims = FarmClaims(stale_secs)
+    print('Node ' + claims.node_id + ' processing manifest of {} farms'.format(len(run_dirs)))
+    pipeline = FarmPipeline(warm_form, fwd_wthr_scnrs, nreaders, nworkers, nwriters, claims.claim, claims.finish)
+
+    claims.start_heartbeat()
+    try:
+        return pipeline.run(run_dirs)
+    finally:
+        claims.stop_heartbeat()
+
+def merge_shards(manifest_fn):
+    """
+    gather the status and scenario summaries of each farm into a CSV file alongside the manifest
+    """
+    run_dirs = read_manifest(manifest_fn)
+    if run_dirs is None:
+        return None
+
+    merged_fn = splitext(abspath(manifest_fn))[0] + '_merged.csv'
+    counts = {}
+    with open(merged_fn, 'w', newline='') as fmerged:
+        writer = csv_writer(fmerged)
+        writer.writerow(['run_dir', 'status', 'node', 'subarea', 'scenario'] + list(SUMMARY_METRICS))
+        for run_dir in run_dirs:
+            status = read_farm_status(run_dir)
+            if status is None:
+                status = {'status': 'claimed' if isfile(join(run_dir, FNAME_CLAIM)) else 'unclaimed',
+                                                                                        'node': '', 'summaries': {}}
+            counts[status['status']] = counts.get(status['status'], 0) + 1
+
+            if len(status['summaries']) == 0:
+                writer.writerow([run_dir, status['status'], status['node']])
+            for sba, scnr_summaries in status['summaries'].items():
+                for scnr, summary in scnr_summaries.items():
+                    writer.writerow([run_dir, status['status'], status['node'], sba, scnr] +
+                                                                [summary[metric] for metric in SUMMARY_METRICS])
+
+    print('Merged {} farms: '.format(len(run_dirs)) + ', '.join(['{} {}'.format(counts[key], key)
+                                                                                for key in sorted(counts)]))
+    print('Wrote: ' + merged_fn)
+
+    return counts
+
+def main():
+    """
+    Entry point
+    """
+    argparser = ArgumentParser(prog=__prog__, description='Share farms between nodes using a shared file system')
+    argparser.add_argument('command', choices=['manifest', 'node', 'merge'])
+    argparser.add_argument('manifest', help='manifest file of farm run directories')
+    argparser.add_argument('dirs', nargs='*', help='farm run or study area directories, for the manifest command')
+    argparser.add_argument('--fwd_wthr', action='append', metavar='SCENARIO=CSV|RESOURCE',
+                           help='forward run weather for an additional climate scenario from a CSV file or a weather '
+                                'resource e.g. ClimGen_A1B, may be repeated')
+    argparser.add_argument('--nreaders', type=int, default=NREADERS, help='number of reader threads')
+    argparser.add_argument('--nworkers', type=int, help='number of compute processes, defaults to number of cores')
+    argparser.add_argument('--nwriters', type=int, default=NWRITERS, help='number of writer threads')
+    argparser.add_argument('--stale_hours', type=float,
+                           help='claims not touched for this long, without a status, are assumed to be of nodes '
+                                'which died; must exceed the heartbeat of {} seconds'.format(HEARTBEAT_SECS))
+    args = argparser.parse_args()
+
+    if args.command == 'manifest':
+        write_manifest(args.manifest, args.dirs)
+    elif args.command == 'node':
+        from initialise_pyorator_batch import initiation
+        from run_batch_pyora import _read_fwd_wthr_scnrs
+
+        warm_form = _WarmForm()
+        initiation(warm_form, headless=True)
+        stale_secs = None if args.stale_hours is None else 3600 * args.stale_hours
+        run_node(args.manifest, warm_form, args.nreaders, args.nworkers, args.nwriters, stale_secs,
+                                                                            _read_fwd_wthr_scnrs(args.fwd_wthr))
+    else:
+        merge_shards(args.manifest)
+
+if __name__ == '__main__':
+    main()
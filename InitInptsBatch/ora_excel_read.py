@@ -19,7 +19,6 @@ __version__ = '0.0.0'
 #
 from os.path import isfile, isdir, split, normpath, join
 from os import mkdir, sep as os_sep
-from PyQt5.QtWidgets import QApplication
 
 from string import ascii_uppercase
 from copy import copy
@@ -28,13 +27,15 @@ from pandas import Series, read_excel, DataFrame
 from zipfile import BadZipFile
 from glob import glob
 from calendar import monthrange
-from numpy import nan, isnan, array
+from numpy import nan, isnan, array, resize, maximum, around, float64
 
 from ora_water_model import add_pet_to_weather
 from ora_cn_fns import plant_inputs_crops_distribution
 from ora_low_level_fns import average_weather
+from ora_cyclic_series import CyclicSeries, cyclic_weather, source_years
 from ora_classes_excel_write import pyoraId as oraId
 from ora_gui_misc_fns import format_sbas, farming_system, region_validate, LivestockEntity
+from ora_progress_fns import report_progress
 
 METRIC_LIST = list(['precip', 'tair'])
 
@@ -47,6 +48,7 @@ FARM_WTHR_SHEET_NAMES = {'lctn': 'Farm location', 'wthr': 'Weather'}
 RUN_SHT_NAMES = {'sign': 'Signature', 'lctn': 'Farm location', 'wthr': 'Weather', 'sbas': 'Subareas',
                  'lvstck': 'Livestock'}
 SOIL_METRICS = list(['t_depth', 't_clay', 't_sand', 't_silt', 't_carbon', 't_bulk', 't_pH', 't_salinity'])
+MNGMNT_SCNR_SEP = '_'  # separates subarea from scenario in names of forward run management scenario sheets
 MNGMNT_SHT_HDRS = ['period', 'year', 'month', 'crop_name', 'yld', 'fert_type', 'fert_n', 'ow_type', 'ow_amnt', 'irrig']
 
 CROP_PARM_NAMES = Series(list(['lu_code', 'rat_dpm_rpm', 'harv_indx', 'prop_npp_to_pi', 'max_root_dpth',
@@ -69,6 +71,7 @@ WARN_STR = '*** Warning *** '
 
 ALPHABET = list(ascii_uppercase)
 MAX_SUB_AREAS = 8
+MNTH_NDAYS = array([monthrange(2011, imnth)[1] for imnth in range(1, 13)])    # not a leap year
 NFEED_TYPES = 5
 
 def _validate_timesteps(run_xls_fn, subareas):
@@ -226,6 +229,7 @@ def check_xls_run_file(run_xls_fname, mgmt_dir):
 def _sync_wthr_to_mgmt(pettmp, ntsteps_wthr, ntsteps_sim):
     """
     Truncate or stretch supplied weather to match length for simulation period
+    weather is repeated as often as necessary without copying, see CyclicSeries
     """
     if ntsteps_sim > ntsteps_wthr:
         mess = 'Stretched'
@@ -236,17 +240,7 @@ def _sync_wthr_to_mgmt(pettmp, ntsteps_wthr, ntsteps_sim):
     nwthr_yrs = int(ntsteps_wthr / 12)
     print(mess + ' weather from {} years to match simulation period of {} years'.format(nwthr_yrs, nsim_yrs))
 
-    NPERIODS = 10
-    pettmp_sim = {}
-    for metric in pettmp:
-        pettmp_lst = []
-        for iyr in range(NPERIODS):
-            pettmp_lst += pettmp[metric]
-            if len(pettmp_lst) > ntsteps_sim:
-                pettmp_sim[metric] = pettmp_lst[:ntsteps_sim]
-                break
-
-    return pettmp_sim
+    return cyclic_weather(pettmp, ntsteps_sim)
 
 def read_xls_run_file(run_xls_fn, crop_vars, latitude):
     """
@@ -274,6 +268,7 @@ def read_xls_run_file(run_xls_fn, crop_vars, latitude):
     rows_generator = sbas_sht.values
     hdr_row = next(rows_generator)  # skip headers
     data_rows = [list(row) for (_, row) in zip(range(MAX_SUB_AREAS), rows_generator)]       # use list comprehension
+    sbas = [rec[0] for rec in data_rows if rec[0] is not None]
 
     ora_subareas = {}
     for rec in data_rows:
@@ -302,7 +297,7 @@ def read_xls_run_file(run_xls_fn, crop_vars, latitude):
             # read subarea sheet
             # ==================
             soil_for_area = Soil(soil_defn)
-            ora_subareas[sba] = ReadMngmntSubareas(wb_obj, sba, soil_for_area, crop_vars, area_ha)
+            ora_subareas[sba] = ReadMngmntSubareas(wb_obj, sba, soil_for_area, crop_vars, area_ha, sbas)
 
     if len(ora_subareas) == 0:
         print(ERR_STR + 'no subarea descriptions in subarea lookup sheet in run file: ' + run_xls_fn)
@@ -411,7 +406,7 @@ def _amend_pi_props_tonnes(crop_vars, this_crop, indx_strt, pi_props, pi_tonnes)
         pi_props[indx_strt:indx_end] = ngrow_mnths * [pi_props_mnth]
     else:
         print(WARN_STR + 'flexible growing periods for annuals not yet implemented')
-        QApplication.processEvents()
+        report_progress()
 
         pi_tonnes[indx_strt:indx_end] = ngrow_mnths * [999]
         pi_props[indx_strt:indx_end] = ngrow_mnths * [999]
@@ -515,49 +510,74 @@ def _create_ow_fert(df):
 
     return fert_ns, org_ferts, irrigs
 
+def _read_mngmnt_sheet(wb_obj, sht_name, crop_vars):
+    """
+    read a management sheet and split into steady state and forward run management
+    """
+    mgmt_sht = wb_obj[sht_name]
+
+    ntsteps = mgmt_sht.max_row - 1
+    rows_generator = mgmt_sht.values
+    header_row = next(rows_generator)
+    data_rows = [list(row) for (_, row) in zip(range(ntsteps), rows_generator)]
+
+    df = DataFrame(data_rows, columns=MNGMNT_SHT_HDRS)
+    period_list = list(df['period'].values)
+    try:
+        indx_trans = period_list.index('forward run')       # index marking the transition from steady state to forward run
+    except ValueError as err:
+        print(ERR_STR + 'bad subarea sheet ' + sht_name)
+        return None
+
+    crop_names = list(df['crop_name'].values)
+
+    crop_currs = _make_current_crop_list(crop_names)
+    fert_n_list, org_fert_list, irrigs = _create_ow_fert(df)
+    pi_props_ss, pi_tonnes_ss, crops_ss = _make_pi_props_tonnes(crop_names, 0, indx_trans, crop_vars)
+    pi_props_fwd, pi_tonnes_fwd, crops_fwd = _make_pi_props_tonnes(crop_names, indx_trans, None, crop_vars)
+
+    # TODO: crude and unpythonic
+    # ==========================
+    crop_mngmnt_ss = {'crop_name': crop_names[:indx_trans], 'crop_curr': crop_currs[:indx_trans],
+                      'crop_defns': crops_ss, 'fert_n': fert_n_list[:indx_trans],
+                      'org_fert': org_fert_list[:indx_trans], 'pi_prop': pi_props_ss,
+                      'pi_tonne': pi_tonnes_ss, 'irrig': irrigs[:indx_trans]}
+
+    crop_mngmnt_fwd = {'crop_name': crop_names[indx_trans:], 'crop_curr': crop_currs[indx_trans:],
+                       'crop_defns': crops_fwd, 'fert_n': fert_n_list[indx_trans:],
+                       'org_fert': org_fert_list[indx_trans:], 'pi_prop': pi_props_fwd,
+                       'pi_tonne': pi_tonnes_fwd, 'irrig': irrigs[indx_trans:]}
+
+    return crop_mngmnt_ss, crop_mngmnt_fwd
+
+def mngmnt_scnr_sheets(sheet_names, sba, sbas):
+    """
+    forward run management scenario sheets of a subarea keyed by scenario; sheets of subareas listed in sbas, and
+    their scenarios, are excluded so that e.g. subarea A_1 and its scenario A_1_highN do not belong to subarea A
+    """
+    prefix = sba + MNGMNT_SCNR_SEP
+    longer_sbas = [other + MNGMNT_SCNR_SEP for other in sbas if str(other).startswith(prefix)]
+
+    return {sht_name[len(prefix):]: sht_name for sht_name in sheet_names if sht_name.startswith(prefix) and
+                sht_name not in sbas and not any(sht_name.startswith(other) for other in longer_sbas)}
+
 class ReadMngmntSubareas(object, ):
     """
     X
     """
-    def __init__(self, wb_obj, sba, soil_for_area, crop_vars, area_ha):
+    def __init__(self, wb_obj, sba, soil_for_area, crop_vars, area_ha, sbas=()):
         """
-
+        forward run management scenarios are held in optional sheets named subarea, separator and scenario e.g. A_highN
+        only the forward run rows of a scenario sheet are used since all scenarios share the steady state
+        sbas: all subareas listed in the run file, none of which is a scenario
         """
         print('Reading management sheet ' + sba)
 
-        mgmt_sht = wb_obj[sba]
-
-        ntsteps = mgmt_sht.max_row - 1
-        rows_generator = mgmt_sht.values
-        header_row = next(rows_generator)
-        data_rows = [list(row) for (_, row) in zip(range(ntsteps), rows_generator)]
-
-        df = DataFrame(data_rows, columns=MNGMNT_SHT_HDRS)
-        period_list = list(df['period'].values)
-        try:
-            indx_trans = period_list.index('forward run')       # index marking the transition from steady state to forward run
-        except ValueError as err:
-            print(ERR_STR + 'bad subarea sheet ' + sba)
+        ret_var = _read_mngmnt_sheet(wb_obj, sba, crop_vars)
+        if ret_var is None:
             return
 
-        crop_names = list(df['crop_name'].values)
-
-        crop_currs = _make_current_crop_list(crop_names)
-        fert_n_list, org_fert_list, irrigs = _create_ow_fert(df)
-        pi_props_ss, pi_tonnes_ss, crops_ss = _make_pi_props_tonnes(crop_names, 0, indx_trans, crop_vars)
-        pi_props_fwd, pi_tonnes_fwd, crops_fwd = _make_pi_props_tonnes(crop_names, indx_trans, None, crop_vars)
-
-        # TODO: crude and unpythonic
-        # ==========================
-        crop_mngmnt_ss = {'crop_name': crop_names[:indx_trans], 'crop_curr': crop_currs[:indx_trans],
-                          'crop_defns': crops_ss, 'fert_n': fert_n_list[:indx_trans],
-                          'org_fert': org_fert_list[:indx_trans], 'pi_prop': pi_props_ss,
-                          'pi_tonne': pi_tonnes_ss, 'irrig': irrigs[:indx_trans]}
-
-        crop_mngmnt_fwd = {'crop_name': crop_names[indx_trans:], 'crop_curr': crop_currs[indx_trans:],
-                           'crop_defns': crops_fwd, 'fert_n': fert_n_list[indx_trans:],
-                           'org_fert': org_fert_list[indx_trans:], 'pi_prop': pi_props_fwd,
-                           'pi_tonne': pi_tonnes_fwd, 'irrig': irrigs[indx_trans:]}
+        crop_mngmnt_ss, crop_mngmnt_fwd = ret_var
 
         self.soil_for_area = soil_for_area
         self.crop_mngmnt_ss = crop_mngmnt_ss
@@ -567,23 +587,39 @@ class ReadMngmntSubareas(object, ):
         self.ntsteps_ss = len(crop_mngmnt_ss['crop_name'])
         self.ntsteps_fwd = len(crop_mngmnt_fwd['crop_name'])
 
+        # alternative forward run management
+        # ==================================
+        crop_mngmnt_fwd_scnrs = {}
+        for scnr, sht_name in mngmnt_scnr_sheets(wb_obj.sheetnames, sba, sbas).items():
+            print('Reading management scenario sheet ' + sht_name)
+            ret_var = _read_mngmnt_sheet(wb_obj, sht_name, crop_vars)
+            if ret_var is None:
+                continue
+
+            crop_mngmnt_scnr = ret_var[1]
+            ntsteps_scnr = len(crop_mngmnt_scnr['crop_name'])
+            if ntsteps_scnr != self.ntsteps_fwd:
+                print(WARN_STR + 'discarded management scenario sheet ' + sht_name + ' - has {} forward run months,'
+                                                ' subarea {} has {}'.format(ntsteps_scnr, sba, self.ntsteps_fwd))
+                continue
+
+            crop_mngmnt_fwd_scnrs[scnr] = crop_mngmnt_scnr
+
+        self.crop_mngmnt_fwd_scnrs = crop_mngmnt_fwd_scnrs
+
 def _add_tgdd_to_weather(tair_list):
     """
     growing degree days indicates the cumulative temperature when plant growth is assumed to be possible (above 5Â°C)
+    for stretched weather degree days are computed once for each month of the source
     """
-    imnth = 1
-    grow_dds = []
-    for tair in tair_list:
-
-        dummy, ndays = monthrange(2011, imnth)
-        n_grow_days = max(0, ndays * (tair - 5))  # (eq.3.2.2)
-        grow_dds.append(round(n_grow_days, 3))
+    tair_src = source_years(tair_list)
+    if tair_src is not None:
+        return CyclicSeries(_add_tgdd_to_weather(tair_src), len(tair_list), tair_list.offset)
 
-        imnth += 1
-        if imnth > 12:
-            imnth = 1
+    ndays = resize(MNTH_NDAYS, len(tair_list))      # series start in January
+    grow_dds = around(maximum(0.0, ndays * (array(tair_list, dtype=float64) - 5)), 3)  # (eq.3.2.2)
 
-    return grow_dds
+    return grow_dds.tolist()
 
 class WeatherRelated(object, ):
     """
@@ -595,6 +631,7 @@ class WeatherRelated(object, ):
         """
         # generate PET from weather
         # =========================
+        self.latitude = latitude
         self.pettmp_ss = add_pet_to_weather(latitude, pettmp_ss)
         self.n_ss_yrs = int(len(self.pettmp_ss['precip'])/12)
         self.pettmp_fwd = add_pet_to_weather(latitude, pettmp_fwd)
@@ -617,6 +654,21 @@ class WeatherRelated(object, ):
         self.ann_ave_precip_ss = sum(pettmp_ss['precip']) / nyrs
         self.ann_ave_temp_ss = sum(pettmp_ss['tair']) / nmnths
 
+def make_fwd_wthr_scenario(ora_weather, pettmp_fwd, ntsteps_fwd):
+    """
+    construct weather object for an alternative forward run climate which shares the steady state weather
+    """
+    ntsteps_wthr = len(pettmp_fwd['precip'])
+    if ntsteps_wthr != ntsteps_fwd:
+        pettmp_fwd = _sync_wthr_to_mgmt(pettmp_fwd, ntsteps_wthr, ntsteps_fwd)
+
+    wthr_scnr = copy(ora_weather)  # steady state weather and averages are shared by reference
+    wthr_scnr.pettmp_fwd = add_pet_to_weather(ora_weather.latitude, pettmp_fwd)
+    wthr_scnr.pettmp_fwd['grow_dds'] = _add_tgdd_to_weather(pettmp_fwd['tair'])
+    wthr_scnr.n_fws_yrs = int(len(wthr_scnr.pettmp_fwd['precip']) / 12)
+
+    return wthr_scnr
+
 class Soil(object, ):
     """
     X
@@ -24,11 +24,9 @@ from os.path import isfile, split, join
 from os import remove
 from glob import glob
 from pandas import DataFrame, ExcelWriter, Series
-from PyQt5.QtWidgets import QApplication
 from warnings import filterwarnings
 
 from openpyxl import load_workbook
-from openpyxl.chart import LineChart, Reference
 from openpyxl.styles import Alignment
 
 from ora_classes_excel_write import (A1SomChange, A2MineralN, A3SoilWater, A2aSoilNsupply, A2bCropNuptake,
@@ -36,6 +34,7 @@ from ora_classes_excel_write import (A1SomChange, A2MineralN, A3SoilWater, A2aSo
                 B1CropProduction, B1cNlimitation)
 
 from ora_lookup_df_fns import fetch_detail_from_varname
+from ora_progress_fns import report_progress
 
 PREFERRED_LINE_WIDTH = 25000       # 100020 taken from chart_example.py     width in EMUs
 
@@ -172,6 +171,8 @@ def _generate_metric_charts(lggr, fname, lookup_df, wb_map):
     '''
     add charts to pre-existing Excel file
     '''
+    from openpyxl.chart import LineChart, Reference
+
     func_name =  __prog__ + ' generate_charts'
 
     wb_obj = load_workbook(fname, data_only=True)
@@ -262,7 +263,7 @@ def _generate_metric_charts(lggr, fname, lookup_df, wb_map):
     except PermissionError as err:
         print(str(err) + ' - could not save: ' + fname)
 
-    QApplication.processEvents()
+    report_progress()
 
     return
 
@@ -25,11 +25,11 @@ from os import remove
 
 from string import ascii_uppercase
 from openpyxl import load_workbook
-from openpyxl.chart import LineChart, Reference
 from openpyxl.styles import Alignment
 from pandas import DataFrame, ExcelWriter
 
 from ora_lookup_df_fns import fetch_detail_from_varname
+from ora_cn_summary_fns import SUMMARY_METRICS
 
 ALPHABET = list(ascii_uppercase)
 WARN_STR = '*** Warning *** '
@@ -63,6 +63,7 @@ def _generate_comparison_charts(metrics_group, lookup_df, wb_obj, chart_sheet, n
     """
     generate charts for each metric
     """
+    from openpyxl.chart import LineChart, Reference
 
     # identify metric names and subarea sheets
     # ========================================
@@ -127,6 +128,8 @@ def _generate_pool_charts(lookup_df, wb_obj, chart_sheet, nrow_chart):
     """
     initially for carbon only: generate charts for each subarea for two sets of metrics in POOL_GROUPS
     """
+    from openpyxl.chart import LineChart, Reference
+
     for sht_indx, shtnm in enumerate(wb_obj.sheetnames):
         if shtnm not in ALPHABET:
             continue
@@ -215,15 +218,18 @@ def _generate_charts(fname, sub_system, lookup_df):
 
     return
 
-def write_excel_all_subareas(study, out_dir, lookup_df, all_runs):
+def write_excel_all_subareas(study, out_dir, lookup_df, all_runs, scnr=None):
     """
     Entry
+    scnr: optional forward run scenario name used to tag the output files
     """
     for indx, sub_system in enumerate(CHANGE_VARS):
 
         # make a safe name
         # ===============
         sht_abbrev = sub_system
+        if scnr is not None:
+            sht_abbrev += ' ' + scnr
         fname = join(out_dir, study.study_name + ' z_' + sht_abbrev + '.xlsx')  # add 'z' to force order
         if isfile(fname):
             try:
@@ -280,3 +286,34 @@ def write_excel_all_subareas(study, out_dir, lookup_df, all_runs):
         print('\tadded charts to: ' + fname)
 
     return 0
+
+def write_excel_scenario_comparison(study, out_dir, scnr_summaries):
+    """
+    write one sheet per subarea with a row of forward run metrics for each scenario
+    """
+    fname = join(out_dir, study.study_name + ' z_scenarios.xlsx')
+    if isfile(fname):
+        try:
+            remove(fname)
+        except PermissionError as err:
+            print(err)
+            return -1
+
+    writer = ExcelWriter(fname)
+    for subarea in scnr_summaries:
+        cmprsn_dict = {'Scenario': list(scnr_summaries[subarea].keys())}
+        for metric in SUMMARY_METRICS:
+            cmprsn_dict[SUMMARY_METRICS[metric]] = [round(summary[metric], 3)
+                                                            for summary in scnr_summaries[subarea].values()]
+
+        data_frame = DataFrame.from_dict(cmprsn_dict)
+        data_frame.to_excel(excel_writer=writer, sheet_name=subarea, index=False)
+
+    try:
+        writer.close()
+        print('\tcreated: ' + fname)
+    except PermissionError as err:
+        print(str(err) + ' - could not create: ' + fname)
+        return -1
+
+    return 0
@@ -0,0 +1,210 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_job_queue.py
+# Purpose:     bounded queue of batch jobs submitted from PyOratorSubGUI
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   jobs wait in the queue until fewer than the permitted number are running; the permitted number is limited
+#   by the number of cores and by the physical memory divided by the memory required by a typical job
+#   each job fans out its forward runs to worker processes so the cores are shared between running jobs, see
+#   workers_per_job, which the submitter passes to each job
+#   the queue is polled by the GUI, typically using a timer, so no threads are required; a cancelled job is
+#   terminated and reaped by a later poll, being killed if it has not exited within TERMINATE_WAIT seconds
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_job_queue.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import cpu_count
+from subprocess import Popen, PIPE, STDOUT
+from time import time
+
+JOB_MEMORY_MB = 1500     # typical peak memory of a batch job
+TERMINATE_WAIT = 5       # seconds allowed for a cancelled job to exit before it is killed
+
+WARN_STR = '*** Warning *** '
+
+JOB_STATES = ['queued', 'running', 'cancelling', 'done', 'failed', 'cancelled']
+
+def physical_memory_mb():
+    """
+    return total physical memory or None if it cannot be determined
+    """
+    try:
+        from psutil import virtual_memory
+
+        return virtual_memory().total // 2**20
+    except ImportError:
+        pass
+
+    try:
+        from os import sysconf      # not available on Windows
+
+        return sysconf('SC_PAGE_SIZE') * sysconf('SC_PHYS_PAGES') // 2**20
+    except (ImportError, ValueError, OSError):
+        return None
+
+def max_concurrent_jobs(job_memory_mb=JOB_MEMORY_MB):
+    """
+    number of jobs which can run without oversubscribing cores or memory, at least one
+    """
+    ncores = cpu_count()
+    max_jobs = 1 if ncores is None else ncores
+
+    mem_mb = physical_memory_mb()
+    if mem_mb is not None:
+        max_jobs = min(max_jobs, mem_mb // job_memory_mb)
+
+    return max(1, max_jobs)
+
+def workers_per_job(max_running):
+    """
+    worker processes each job may start so that running jobs together use no more than the number of cores
+    """
+    ncores = cpu_count()
+    if ncores is None:
+        return 1
+
+    return max(1, ncores // max_running)
+
+class BatchJob(object, ):
+    """
+    one submission of the batch script for a run directory
+    """
+    def __init__(self, job_id, cmd_args, run_dir):
+        """
+        cmd_args: program and its arguments as a list
+        status is one of JOB_STATES
+        """
+        self.job_id = job_id
+        self.cmd_args = cmd_args
+        self.run_dir = run_dir
+        self.status = 'queued'
+        self.proc = None
+        self.retcode = None
+        self.t_queued = time()
+        self.t_start = None
+        self.t_end = None
+        self.t_cancel = None
+        self.killed = False
+
+    def elapsed(self):
+        """
+        seconds spent queued if not yet started otherwise seconds running
+        """
+        if self.t_start is None:
+            return (time() if self.t_end is None else self.t_end) - self.t_queued
+
+        return (time() if self.t_end is None else self.t_end) - self.t_start
+
+    def describe(self):
+        """
+        one line summary for display
+        """
+        mins, secs = divmod(int(self.elapsed()), 60)
+        return 'Job {}\t{:<10}{:>4}:{:02d}\t{}'.format(self.job_id, self.status, mins, secs, self.run_dir)
+
+class JobQueue(object, ):
+    """
+    jobs are started in order of submission whenever a running job finishes
+    """
+    def __init__(self, max_running=None, job_memory_mb=JOB_MEMORY_MB):
+        """
+        max_running defaults to the number permitted by cores and memory
+        """
+        if max_running is None:
+            max_running = max_concurrent_jobs(job_memory_mb)
+
+        self.max_running = max_running
+        self.workers_per_job = workers_per_job(max_running)
+        self.jobs = []
+        self.njobs = 0
+
+    def submit(self, cmd_args, run_dir):
+        """
+        add job to the queue and start it if a slot is free
+        """
+        self.njobs += 1
+        job = BatchJob(self.njobs, cmd_args, run_dir)
+        self.jobs.append(job)
+        self.poll()
+
+        return job
+
+    def _nrunning(self):
+        """
+        number of jobs occupying a slot, including those cancelled but yet to exit
+        """
+        return len([job for job in self.jobs if job.status in ('running', 'cancelling')])
+
+    def poll(self):
+        """
+        record finished jobs, kill cancelled jobs which have not exited, then start queued jobs while slots are free
+        return True if any job changed status
+        """
+        changed = False
+        for job in self.jobs:
+            if job.status in ('running', 'cancelling'):
+                retcode = job.proc.poll()
+                if retcode is not None:
+                    job.retcode = retcode
+                    if job.status == 'cancelling':
+                        job.status = 'cancelled'
+                    else:
+                        job.status = 'done' if retcode == 0 else 'failed'
+                    job.t_end = time()
+                    changed = True
+
+                elif job.status == 'cancelling' and not job.killed and time() - job.t_cancel > TERMINATE_WAIT:
+                    print(WARN_STR + 'job {} did not exit when terminated - killing it'.format(job.job_id))
+                    job.proc.kill()
+                    job.killed = True
+
+        for job in self.jobs:
+            if self._nrunning() >= self.max_running:
+                break
+
+            if job.status == 'queued':
+                try:
+                    job.proc = Popen(job.cmd_args, stdin=PIPE, stderr=STDOUT)
+                    job.status = 'running'
+                    job.t_start = time()
+                except OSError as err:
+                    print(WARN_STR + 'could not start job {}: {}'.format(job.job_id, err))
+                    job.status = 'failed'
+                    job.t_end = time()
+                changed = True
+
+        return changed
+
+    def cancel(self, job_id):
+        """
+        remove a queued job or terminate a running job without waiting for it; the job is reaped by poll, so that
+        it does not linger as a zombie, and keeps its slot until then
+        """
+        for job in self.jobs:
+            if job.job_id == job_id:
+                if job.status == 'running':
+                    job.proc.terminate()
+                    job.status = 'cancelling'
+                    job.t_cancel = time()
+                elif job.status == 'queued':
+                    job.status = 'cancelled'
+                    job.t_end = time()
+                else:
+                    return False
+
+                self.poll()
+                return True
+
+        return False
+
+    def nqueued(self):
+        """
+        number of jobs waiting for a slot
+        """
+        return len([job for job in self.jobs if job.status == 'queued'])
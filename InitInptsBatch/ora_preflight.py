@@ -0,0 +1,306 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_preflight.py
+# Purpose:     validate every run file of a batch before any simulation is scheduled
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   checks otherwise made piecemeal during a run, by check_xls_run_file, _validate_timesteps, read_xls_run_file,
+#   _read_mngmnt_sheet and chck_weather_mngmnt, are made for all farms at once by a pool of processes each of
+#   which streams its run files using a read only workbook; findings are written to a single report
+#       errors: missing sheets, incomplete soils, management sheets without a forward run, crops and organic
+#               wastes unknown to the parameters file, null or blank weather rows, too few weather months for
+#               every subarea
+#       warnings: forward run weather which will be stretched or truncated, inconsistent subarea months,
+#                 subareas with more management months than weather, which are skipped during the run,
+#                 management scenario sheets which will be discarded, unknown fertiliser types and growing
+#                 periods which differ from those of the crop parameters
+#
+#   usage: ora_preflight.py DIR [DIR ...] [--report FILE] where DIR is a farm run directory or a study area
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_preflight.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from os.path import isfile, join
+from csv import writer as csv_writer
+from time import time
+
+from openpyxl import load_workbook
+
+from ora_excel_read import RUN_SHT_NAMES, MAX_SUB_AREAS, MNGMNT_SHT_HDRS, SOIL_METRICS, mngmnt_scnr_sheets
+
+FNAME_RUN = 'FarmWthrMgmt.xlsx'
+FNAME_REPORT = 'pyorator_preflight.csv'
+SEVERITIES = ['error', 'warning']
+CHUNK_SIZE = 4
+
+ERROR_STR = '*** Error *** '
+WARN_STR = '*** Warning *** '
+
+class _Findings(object, ):
+    """
+    errors and warnings of one farm
+    """
+    def __init__(self, run_dir):
+        self.run_dir = run_dir
+        self.issues = []    # tuples of severity, sheet and message
+
+    def error(self, sheet, mess):
+        self.issues.append(('error', sheet, mess))
+
+    def warning(self, sheet, mess):
+        self.issues.append(('warning', sheet, mess))
+
+def _growing_periods(crop_names):
+    """
+    contiguous months of each crop as tuples of crop and number of months
+    """
+    periods = []
+    prev_crop = None
+    for crop in crop_names:
+        if crop is not None and crop == prev_crop:
+            periods[-1][1] += 1
+        elif crop is not None:
+            periods.append([crop, 1])
+        prev_crop = crop
+
+    return periods
+
+def _check_mngmnt_sheet(findings, wb_obj, sht_name, parm_names):
+    """
+    return number of steady state and forward run months or None if the sheet cannot be used
+    """
+    crop_vars, ow_types, fert_types = parm_names
+    rows = wb_obj[sht_name].iter_rows(min_row=2, max_col=len(MNGMNT_SHT_HDRS), values_only=True)
+    columns = list(zip(*[row for row in rows if any(val is not None for val in row)]))
+    if len(columns) == 0:
+        findings.error(sht_name, 'management sheet has no months')
+        return None
+    mngmnt = dict(zip(MNGMNT_SHT_HDRS, columns))
+
+    periods = list(mngmnt['period'])
+    if 'forward run' not in periods:
+        findings.error(sht_name, 'no forward run months in period column')
+        return None
+    indx_trans = periods.index('forward run')
+
+    unknown = sorted({crop for crop in mngmnt['crop_name'] if crop is not None and crop not in crop_vars})
+    if len(unknown) > 0:
+        findings.error(sht_name, 'crops not in parameters file: ' + ', '.join([str(crop) for crop in unknown]))
+    else:
+        for crop, ngrow_mnths in _growing_periods(mngmnt['crop_name']):
+            t_grow = crop_vars[crop]
+            if ngrow_mnths != t_grow and t_grow != 12:
+                findings.warning(sht_name, '{} grows for {} months, parameters file has {} - flexible growing '
+                                                'periods for annuals not yet implemented'.format(crop, ngrow_mnths, t_grow))
+                break
+
+    unknown = sorted({ow_type for ow_type in mngmnt['ow_type'] if ow_type is not None and ow_type not in ow_types})
+    if len(unknown) > 0:
+        findings.error(sht_name, 'organic wastes not in parameters file: ' + ', '.join([str(ow) for ow in unknown]))
+
+    for fert_type in {fert_type for fert_type in mngmnt['fert_type'] if fert_type is not None}:
+        if not isinstance(fert_type, str):
+            findings.error(sht_name, 'fertiliser type must be text: ' + str(fert_type))
+        elif fert_type not in fert_types:
+            findings.warning(sht_name, 'fertiliser type not in parameters file: ' + fert_type)
+
+    return indx_trans, len(periods) - indx_trans
+
+def _check_weather(findings, wb_obj):
+    """
+    return number of steady state and forward run months or None if weather is incomplete; read_xls_run_file
+    rejects any row with a null value, including blank rows
+    """
+    wthr_shtnm = RUN_SHT_NAMES['wthr']
+    nmnths = {'steady state': 0, 'forward run': 0}
+    for iline, row in enumerate(wb_obj[wthr_shtnm].iter_rows(min_row=2, max_col=5, values_only=True), start=2):
+        period, year, month, precip, tair = row
+        if period is None and precip is None and tair is None:
+            findings.error(wthr_shtnm, 'blank line {}'.format(iline))
+            return None
+        if period is None or precip is None or tair is None:
+            findings.error(wthr_shtnm, 'null values on line {}'.format(iline))
+            return None
+        try:
+            float(precip), float(tair)
+        except (TypeError, ValueError):
+            findings.error(wthr_shtnm, 'non numeric weather on line {}'.format(iline))
+            return None
+
+        nmnths['steady state' if period == 'steady state' else 'forward run'] += 1
+
+    return nmnths['steady state'], nmnths['forward run']
+
+def validate_run_file(run_dir, parm_names):
+    """
+    return findings for a farm; parm_names are crop growing months keyed by crop, organic waste types and
+    fertiliser types from the parameters file
+    """
+    findings = _Findings(run_dir)
+    run_xls_fn = join(run_dir, FNAME_RUN)
+    if not isfile(run_xls_fn):
+        findings.error('', 'run file ' + FNAME_RUN + ' does not exist')
+        return findings
+
+    try:
+        wb_obj = load_workbook(run_xls_fn, read_only=True, data_only=True)
+    except (OSError, KeyError, ValueError) as err:
+        findings.error('', 'could not open run file: ' + str(err))
+        return findings
+
+    try:
+        _validate_workbook(findings, wb_obj, parm_names)
+    except (KeyError, TypeError, ValueError) as err:
+        findings.error('', 'could not read run file: ' + str(err))
+    finally:
+        wb_obj.close()
+
+    return findings
+
+def _validate_workbook(findings, wb_obj, parm_names):
+    """
+    checks are in the order they would be encountered during a run
+    """
+    missing = [shtnm for shtnm in RUN_SHT_NAMES.values() if shtnm not in wb_obj.sheetnames]
+    if len(missing) > 0:
+        findings.error('', 'sheets not present: ' + ', '.join(missing))
+        return
+
+    # subareas and their soils
+    # ========================
+    sbas_shtnm = RUN_SHT_NAMES['sbas']
+    sba_mnths = {}
+    sba_rows = [list(row) for row in wb_obj[sbas_shtnm].iter_rows(min_row=2, max_row=MAX_SUB_AREAS + 1,
+                                                                                                values_only=True)]
+    sbas = [row[0] for row in sba_rows if len(row) > 0 and row[0] is not None]
+    for row in sba_rows:
+        if len(row) < 2 or row[1] is None:
+            continue
+
+        sba = row[0]
+        if sba not in wb_obj.sheetnames:
+            findings.warning(sbas_shtnm, 'management sheet ' + str(sba) + ' not in run file')
+            continue
+
+        soil_vals = row[5:5 + len(SOIL_METRICS) - 1]
+        if len(soil_vals) < len(SOIL_METRICS) - 1 or any(val is None for val in soil_vals):
+            findings.error(sbas_shtnm, 'soil for subarea ' + str(sba) + ' not fully defined')
+
+        ret_var = _check_mngmnt_sheet(findings, wb_obj, sba, parm_names)
+        if ret_var is None:
+            continue
+        sba_mnths[sba] = ret_var
+
+        # forward run management scenarios
+        # ================================
+        for shtnm in mngmnt_scnr_sheets(wb_obj.sheetnames, sba, sbas).values():
+            ret_var = _check_mngmnt_sheet(findings, wb_obj, shtnm, parm_names)
+            if ret_var is not None and ret_var[1] != sba_mnths[sba][1]:
+                findings.warning(shtnm, 'will be discarded - has {} forward run months, subarea {} has {}'
+                                                                    .format(ret_var[1], sba, sba_mnths[sba][1]))
+
+    if len(sba_mnths) == 0:
+        findings.error(sbas_shtnm, 'no usable subareas with a description')
+        return
+
+    if len(set(sba_mnths.values())) > 1:
+        findings.warning(sbas_shtnm, 'subarea sheets have inconsistent number of months: ' +
+                                    ', '.join(['{} {}+{}'.format(sba, *sba_mnths[sba]) for sba in sba_mnths]))
+
+    # weather and its alignment with management
+    # =========================================
+    ret_var = _check_weather(findings, wb_obj)
+    if ret_var is None:
+        return
+    nmnths_ss, nmnths_fwd = ret_var
+
+    wthr_shtnm = RUN_SHT_NAMES['wthr']
+    ntsteps_fwd_synced = list(sba_mnths.values())[-1][1]    # weather is stretched or truncated to the last subarea
+    if nmnths_fwd != ntsteps_fwd_synced:
+        findings.warning(wthr_shtnm, 'forward run weather of {} months will be {} to {} months'
+                .format(nmnths_fwd, 'stretched' if ntsteps_fwd_synced > nmnths_fwd else 'truncated', ntsteps_fwd_synced))
+
+    nskipped = 0
+    for sba, (ntsteps_ss, ntsteps_fwd) in sba_mnths.items():
+        nskipped += ntsteps_ss > nmnths_ss or ntsteps_fwd > ntsteps_fwd_synced
+        if ntsteps_ss > nmnths_ss:
+            findings.warning(sba, 'subarea will be skipped - steady state management of {} months exceeds weather '
+                                                                        'of {} months'.format(ntsteps_ss, nmnths_ss))
+        if ntsteps_fwd > ntsteps_fwd_synced:
+            findings.warning(sba, 'subarea will be skipped - forward run management of {} months exceeds weather '
+                                                                'of {} months'.format(ntsteps_fwd, ntsteps_fwd_synced))
+    if nskipped == len(sba_mnths):
+        findings.error(wthr_shtnm, 'too few weather months for every subarea')
+
+    return
+
+def parameter_names(ora_parms):
+    """
+    names, and crop growing months, needed for validation; small enough to pass to each process
+    """
+    crop_vars = {crop: ora_parms.crop_vars[crop]['t_grow'] for crop in ora_parms.crop_vars}
+
+    return crop_vars, set(ora_parms.ow_parms), set(ora_parms.syn_fert_parms)
+
+def preflight(run_dirs, ora_parms, report_fn=FNAME_REPORT, max_workers=None):
+    """
+    validate run files concurrently and write the report; return run directories without errors
+    """
+    strt_time = time()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        all_findings = list(executor.map(validate_run_file, run_dirs, repeat(parameter_names(ora_parms)),
+                                                                                            chunksize=CHUNK_SIZE))
+    valid_dirs = []
+    counts = {'ok': 0, 'warning': 0, 'error': 0}
+    with open(report_fn, 'w', newline='') as freport:
+        writer = csv_writer(freport)
+        writer.writerow(['run_dir', 'severity', 'sheet', 'message'])
+        for findings in all_findings:
+            severities = {issue[0] for issue in findings.issues}
+            if 'error' in severities:
+                counts['error'] += 1
+            else:
+                valid_dirs.append(findings.run_dir)
+                counts['warning' if 'warning' in severities else 'ok'] += 1
+
+            for severity, sheet, mess in sorted(findings.issues, key=lambda issue: SEVERITIES.index(issue[0])):
+                writer.writerow([findings.run_dir, severity, sheet, mess])
+
+    print('Validated {} farms in {:.1f} seconds: {} without issues, {} with warnings, {} with errors'
+                    .format(len(run_dirs), time() - strt_time, counts['ok'], counts['warning'], counts['error']))
+    print('Wrote: ' + report_fn)
+
+    return valid_dirs
+
+def main():
+    """
+    Entry point
+    """
+    from initialise_pyorator_batch import initiation
+    from ora_batch_driver import expand_run_dirs, _WarmForm
+
+    argparser = ArgumentParser(prog=__prog__, description='Validate run files of farms before a batch run')
+    argparser.add_argument('dirs', nargs='+', help='farm run directories or study area directories')
+    argparser.add_argument('--report', default=FNAME_REPORT, help='report file, CSV')
+    argparser.add_argument('--nworkers', type=int, help='number of processes, defaults to number of cores')
+    args = argparser.parse_args()
+
+    run_dirs = expand_run_dirs(args.dirs)
+    if len(run_dirs) == 0:
+        print(ERROR_STR + 'no farms to validate')
+        return
+
+    warm_form = _WarmForm()
+    initiation(warm_form, headless=True)
+    preflight(run_dirs, warm_form.ora_parms, args.report, args.nworkers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_shared_data.py
+# Purpose:     broadcast read only parameters and lookup data from the parent process to worker processes
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   the parent publishes objects such as the ORATOR parameters, the animal production data and the lookup
+#   table before starting its workers and passes small references in place of the objects with each task
+#   where workers are forked, the default on Linux, they inherit the published objects without copying;
+#   where workers are spawned, e.g. on Windows, the published objects are pickled once per worker by the pool
+#   initializer rather than once per task
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_shared_data.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from gc import collect, freeze
+
+_published = {}
+
+class SharedRef(object, ):
+    """
+    small picklable reference to an object published by the parent process
+    """
+    def __init__(self, key):
+        self.key = key
+
+def publish(key, obj):
+    """
+    call in the parent before workers are started; returns reference to pass with tasks
+    """
+    _published[key] = obj
+
+    return SharedRef(key)
+
+def published():
+    """
+    initializer arguments for a pool of workers
+    """
+    return (dict(_published),)
+
+def install(published_objs):
+    """
+    pool initializer, runs once in each worker; forked workers already hold the objects
+    """
+    for key in published_objs:
+        if key not in _published:
+            _published[key] = published_objs[key]
+
+    return
+
+def resolve(obj):
+    """
+    return the published object if obj is a reference otherwise obj itself
+    """
+    if isinstance(obj, SharedRef):
+        return _published[obj.key]
+
+    return obj
+
+def freeze_published():
+    """
+    call once in a long lived parent after publishing: moves existing objects out of reach of the cyclic
+    garbage collector so that collections in forked workers do not write to, and so copy, inherited pages
+    """
+    collect()
+    freeze()
+
+    return
@@ -0,0 +1,187 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_shared_results.py
+# Purpose:     return results from worker processes without pickling each value
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   a complete run holds carbon, nitrogen and soil water objects each with over a hundred lists of monthly
+#   values; pickling these means pickling millions of Python floats. Instead the worker writes the long lists
+#   of floats of these objects into a single memory mapped file, in shared memory where available, and pickles
+#   the remaining structure with a small reference in place of each list; other lists e.g. of management,
+#   which may be altered element by element, are pickled as usual
+#   the parent maps the file and each list becomes a SegmentedList whose head is a read only view of the
+#   mapped array, so values are read without copying and can still be appended to; numpy functions can be
+#   applied directly to the head
+#   mapped results can be loaded more than once, each load giving independent objects which share the read only
+#   values, so that the results of a subarea can be given to each farm with an identical subarea
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_shared_results.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import remove, close as os_close
+from os.path import isdir
+from io import BytesIO
+from pickle import Pickler, Unpickler, HIGHEST_PROTOCOL
+from tempfile import mkstemp, gettempdir
+from atexit import register as atexit_register
+from numpy import fromiter, memmap, float64, ndarray, concatenate, asarray
+
+from ora_segmented_list import SegmentedList
+
+MIN_VALUES = 64     # shorter lists are pickled as usual
+FLOAT_TYPES = {float, float64}
+SHM_DIR = '/dev/shm'
+
+_undeleted = []
+
+def _results_dir():
+    """
+    shared memory file system where available otherwise the temporary directory
+    """
+    return SHM_DIR if isdir(SHM_DIR) else gettempdir()
+
+def _remove_file(fname):
+    """
+    a mapped file cannot be removed on Windows so removal is deferred until exit
+    """
+    try:
+        remove(fname)
+    except OSError:
+        _undeleted.append(fname)
+
+    return
+
+def _remove_undeleted():
+    """
+    remove mapped files which could not be removed when mapped
+    """
+    for fname in _undeleted:
+        try:
+            remove(fname)
+        except OSError:
+            pass
+
+atexit_register(_remove_undeleted)
+
+class _ResultsPickler(Pickler):
+    """
+    diverts eligible long lists of floats to a list of series to be written to the mapped file
+    """
+    def __init__(self, fobj, eligible_ids):
+        super().__init__(fobj, HIGHEST_PROTOCOL)
+        self.eligible_ids = eligible_ids
+        self.series = []
+        self.pids = {}      # references keyed by id so that shared lists remain shared
+        self.nvals = 0
+
+    def persistent_id(self, obj):
+        if id(obj) not in self.eligible_ids or len(obj) < MIN_VALUES:
+            return None
+
+        if id(obj) in self.pids:
+            return self.pids[id(obj)]
+
+        if not set(map(type, obj)) <= FLOAT_TYPES:
+            return None
+
+        pid = (self.nvals, len(obj))
+        self.pids[id(obj)] = pid
+        self.series.append(obj)
+        self.nvals += len(obj)
+
+        return pid
+
+class _ResultsUnpickler(Unpickler):
+    """
+    replaces each reference with a view of the mapped array
+    """
+    def __init__(self, fobj, values):
+        super().__init__(fobj)
+        self.values = values
+        self.seqs = {}
+
+    def persistent_load(self, pid):
+        if pid not in self.seqs:
+            offset, nvals = pid
+            self.seqs[pid] = SegmentedList(self.values[offset:offset + nvals])
+
+        return self.seqs[pid]
+
+def _as_array(series):
+    """
+    a segmented list whose head is already an array, e.g. a fork of mapped results, is not iterated
+    """
+    if type(series) is SegmentedList and isinstance(series.head, ndarray):
+        return concatenate((series.head[:series.nhead], asarray(series.tail, dtype=float64)))
+
+    return fromiter(series, float64, len(series))
+
+def complete_run_objects(complete_runs):
+    """
+    carbon, nitrogen and soil water objects of an iterable of complete runs, any of which may be None
+    """
+    return [obj for complete_run in complete_runs if complete_run is not None for obj in complete_run]
+
+def pack_results(obj, owners):
+    """
+    in the worker: return pickled structure and name of the mapped file, None if there are no long lists
+    owners: objects, within obj, whose data dictionaries hold the lists to be mapped
+    """
+    eligible_ids = {id(series) for owner in owners for series in owner.data.values()
+                                                                if type(series) in (list, SegmentedList)}
+    fobj = BytesIO()
+    pickler = _ResultsPickler(fobj, eligible_ids)
+    pickler.dump(obj)
+    if pickler.nvals == 0:
+        return fobj.getvalue(), None
+
+    fd, values_fn = mkstemp(prefix='pyorator_', suffix='.f64', dir=_results_dir())
+    os_close(fd)
+    values = memmap(values_fn, dtype=float64, mode='w+', shape=(pickler.nvals,))
+    offset = 0
+    for series in pickler.series:
+        values[offset:offset + len(series)] = _as_array(series)
+        offset += len(series)
+    values.flush()
+    del values
+
+    return fobj.getvalue(), values_fn
+
+def map_results(packed):
+    """
+    in the parent: map the values of packed results; the mapped file is removed once mapped
+    """
+    payload, values_fn = packed
+    values = None
+    if values_fn is not None:
+        values = memmap(values_fn, dtype=float64, mode='r')
+        _remove_file(values_fn)
+
+    return payload, values
+
+def load_results(mapped):
+    """
+    rebuild the results from mapped results; each call returns new objects
+    """
+    payload, values = mapped
+
+    return _ResultsUnpickler(BytesIO(payload), values).load()
+
+def mapped_mb(mapped):
+    """
+    size of mapped results
+    """
+    payload, values = mapped
+
+    return (len(payload) + (0 if values is None else values.nbytes)) / 1024 ** 2
+
+def unpack_results(packed):
+    """
+    in the parent: rebuild the results
+    """
+    return load_results(map_results(packed))
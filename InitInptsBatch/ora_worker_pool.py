@@ -0,0 +1,434 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_worker_pool.py
+# Purpose:     process pool whose workers are recycled, timed out and killed when their memory exceeds a cap
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   concurrent.futures.ProcessPoolExecutor cannot stop an individual task so this executor supervises its own
+#   worker processes from a thread:
+#       workers are replaced after a number of tasks so that memory leaked or fragmented by openpyxl, pandas
+#       and matplotlib is returned to the system
+#       a task exceeding the wall clock timeout is killed with its worker and fails
+#       a worker whose resident memory exceeds the cap, or which dies e.g. at the hands of the OOM killer, is
+#       killed and its task requeued, up to a limit, on a fresh worker
+#       with a memory budget a task, submitted with an estimate of its peak memory, is started only while the
+#       memory of the workers plus that of the task remains within the budget; estimates are scaled by the
+#       ratio of measured peak to estimated memory of recent tasks
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_worker_pool.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from os import cpu_count, getpid
+from concurrent.futures import Executor, Future
+from multiprocessing import get_context
+from multiprocessing.connection import wait
+from threading import Thread, Condition
+from collections import deque
+from time import time
+
+POLL_SECS = 0.5
+MAX_REQUEUES = 1
+MEM_HISTORY = 20    # number of recent tasks used to scale memory estimates
+
+WARN_STR = '*** Warning *** '
+
+class WorkerTimeout(Exception):
+    """
+    task exceeded the wall clock timeout
+    """
+
+class WorkerMemoryExceeded(Exception):
+    """
+    worker exceeded the memory cap on every attempt
+    """
+
+class WorkerDied(Exception):
+    """
+    worker process ended unexpectedly on every attempt
+    """
+
+def rss_mb(pid):
+    """
+    resident set size of a process or None if it cannot be determined
+    """
+    try:
+        from psutil import Process
+
+        return Process(pid).memory_info().rss / 2**20
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    try:
+        from os import sysconf      # not available on Windows
+
+        with open('/proc/{}/statm'.format(pid), 'r') as fstatm:
+            return int(fstatm.read().split()[1]) * sysconf('SC_PAGE_SIZE') / 2**20
+    except (ImportError, OSError, ValueError, IndexError):
+        return None
+
+def _worker_main(conn, initializer, initargs):
+    """
+    run tasks received from the supervisor until told to stop
+    """
+    if initializer is not None:
+        initializer(*initargs)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        func, args = task
+        try:
+            msg = ('ok', func(*args))
+        except Exception as err:
+            msg = ('err', err)
+
+        try:
+            conn.send(msg)
+        except Exception as err:
+            conn.send(('err', RuntimeError('could not return result: ' + repr(err))))
+
+    conn.close()
+
+class _Task(object, ):
+    """
+    function, arguments and future of a submitted task
+    """
+    def __init__(self, func, args, mem_mb=None):
+        self.func = func
+        self.args = args
+        self.mem_mb = mem_mb
+        self.future = Future()
+        self.nrequeues = 0
+        self.deferred = False
+
+class _Worker(object, ):
+    """
+    worker process, its connection and its current task
+    """
+    def __init__(self, mp_context, initializer, initargs):
+        self.conn, child_conn = mp_context.Pipe()
+        self.proc = mp_context.Process(target=_worker_main, args=(child_conn, initializer, initargs), daemon=True)
+        self.proc.start()
+        child_conn.close()
+        self.task = None
+        self.t_start = None
+        self.ntasks = 0
+        self.rss = None
+        self.peak_rss = None
+
+    def assign(self, task):
+        """
+        send task to the worker process; if the worker has died this is detected when collecting results
+        """
+        self.task = task
+        self.t_start = time()
+        self.peak_rss = self.rss
+        try:
+            self.conn.send((task.func, task.args))
+        except OSError:
+            pass
+
+    def retire(self):
+        """
+        ask the worker to exit
+        """
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.proc.join(POLL_SECS)
+        if self.proc.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+    def kill(self):
+        """
+        stop the worker immediately, abandoning its task
+        """
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+class SupervisedPool(Executor):
+    """
+    executor with worker recycling, per task timeout and per worker memory cap, each of which is optional
+    """
+    def __init__(self, max_workers=None, max_tasks_per_worker=None, timeout=None, max_rss_mb=None,
+                    max_requeues=MAX_REQUEUES, initializer=None, initargs=(), memory_budget_mb=None):
+        """
+        timeout in seconds; max_rss_mb and memory_budget_mb in megabytes
+        initializer is called with initargs in each worker, including replacements, as for ProcessPoolExecutor
+        """
+        if max_workers is None:
+            max_workers = cpu_count()
+
+        self.max_workers = max_workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_requeues = max_requeues
+        self.initializer = initializer
+        self.initargs = initargs
+        self.memory_budget_mb = memory_budget_mb
+        self.mem_ratios = []
+        self.mem_scale = 1.0
+        if max_rss_mb is not None and rss_mb(getpid()) is None:
+            print(WARN_STR + 'cannot measure memory use of workers on this platform - memory cap is ignored')
+            self.max_rss_mb = None
+
+        self.mp_context = get_context()
+        self.tasks = deque()
+        self.workers = []
+        self.cond = Condition()
+        self.shutdown_flag = False
+        self.events = {'recycled': 0, 'timed out': 0, 'memory exceeded': 0, 'died': 0, 'requeued': 0,
+                                                                                            'deferred for memory': 0}
+
+        self.supervisor = Thread(target=self._supervise, daemon=True)
+        self.supervisor.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        keyword arguments are not supported
+        """
+        if kwargs:
+            raise TypeError('SupervisedPool.submit does not accept keyword arguments')
+
+        return self.submit_estimated(None, func, *args)
+
+    def submit_estimated(self, mem_mb, func, *args):
+        """
+        as submit with an estimate, in megabytes, of the peak memory of the worker while running the task
+        """
+        task = _Task(func, args, mem_mb)
+        with self.cond:
+            if self.shutdown_flag:
+                raise RuntimeError('cannot submit after shutdown')
+            self.tasks.append(task)
+            self.cond.notify()
+
+        return task.future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        queued tasks are completed unless cancelled
+        """
+        with self.cond:
+            self.shutdown_flag = True
+            if cancel_futures:
+                while self.tasks:
+                    self.tasks.popleft().future.cancel()
+            self.cond.notify()
+
+        if wait:
+            self.supervisor.join()
+
+        return
+
+    def _admit(self, task, target):
+        """
+        True if the task fits within the memory budget alongside the tasks of other workers; target is the idle
+        worker which will run the task, or None for a new worker; the task is admitted if no others are running
+        """
+        if self.memory_budget_mb is None or task.mem_mb is None:
+            return True
+
+        committed = 0
+        nbusy = 0
+        for wrkr in self.workers:
+            if wrkr is target:
+                continue
+
+            wrkr_rss = 0 if wrkr.rss is None else wrkr.rss
+            if wrkr.task is None:
+                committed += wrkr_rss
+            else:
+                nbusy += 1
+                est_mb = 0 if wrkr.task.mem_mb is None else wrkr.task.mem_mb * self.mem_scale
+                committed += max(wrkr_rss, est_mb)
+
+        if nbusy == 0 or committed + task.mem_mb * self.mem_scale <= self.memory_budget_mb:
+            return True
+
+        if not task.deferred:
+            task.deferred = True
+            self.events['deferred for memory'] += 1
+
+        return False
+
+    def _assign_tasks(self):
+        """
+        give queued tasks to idle workers, starting new workers up to the limit; tasks start in order so a task
+        waiting for memory holds back those behind it
+        """
+        with self.cond:
+            while self.tasks:
+                idle = [wrkr for wrkr in self.workers if wrkr.task is None]
+                if len(idle) == 0 and len(self.workers) >= self.max_workers:
+                    break
+
+                target = idle[0] if len(idle) > 0 else None
+                if not self._admit(self.tasks[0], target):
+                    break
+
+                if target is None:
+                    target = _Worker(self.mp_context, self.initializer, self.initargs)
+                    self.workers.append(target)
+
+                task = self.tasks.popleft()
+                if task.nrequeues == 0 and not task.future.set_running_or_notify_cancel():
+                    continue    # cancelled while queued
+                target.assign(task)
+
+        return
+
+    def _measure_workers(self):
+        """
+        current and, for busy workers, peak resident memory of each worker
+        """
+        for wrkr in self.workers:
+            wrkr.rss = rss_mb(wrkr.proc.pid)
+            if wrkr.task is not None and wrkr.rss is not None:
+                wrkr.peak_rss = wrkr.rss if wrkr.peak_rss is None else max(wrkr.peak_rss, wrkr.rss)
+
+        return
+
+    def _learn_memory(self, wrkr, task):
+        """
+        scale estimates by the largest ratio of measured peak to estimate of recent tasks
+        """
+        if task.mem_mb is None or wrkr.peak_rss is None or task.mem_mb <= 0:
+            return
+
+        self.mem_ratios = (self.mem_ratios + [wrkr.peak_rss / task.mem_mb])[-MEM_HISTORY:]
+        self.mem_scale = max(self.mem_ratios)
+
+        return
+
+    def _remove_worker(self, wrkr, kill_flag):
+        """
+        kill or retire a worker; a replacement is started when there is a task for it
+        """
+        self.workers.remove(wrkr)
+        if kill_flag:
+            wrkr.kill()
+        else:
+            wrkr.retire()
+
+        return
+
+    def _requeue_or_fail(self, wrkr, event, exc_class, mess):
+        """
+        kill worker and requeue its task unless it has been requeued too often
+        """
+        task = wrkr.task
+        self._remove_worker(wrkr, kill_flag=True)
+        self.events[event] += 1
+        if task.nrequeues < self.max_requeues:
+            task.nrequeues += 1
+            self.events['requeued'] += 1
+            print(WARN_STR + mess + ' - requeued task')
+            with self.cond:
+                self.tasks.appendleft(task)
+        else:
+            task.future.set_exception(exc_class(mess))
+
+        return
+
+    def _collect_results(self, busy):
+        """
+        receive results from workers which have finished their tasks
+        """
+        ready = wait([wrkr.conn for wrkr in busy], POLL_SECS)
+        for wrkr in busy:
+            if wrkr.conn not in ready:
+                continue
+
+            try:
+                status, result = wrkr.conn.recv()
+            except (EOFError, OSError):
+                wrkr.proc.join(POLL_SECS)
+                self._requeue_or_fail(wrkr, 'died', WorkerDied,
+                                            'worker {} ended with exit code {}'.format(wrkr.proc.pid, wrkr.proc.exitcode))
+                continue
+
+            task = wrkr.task
+            wrkr.task = None
+            wrkr.ntasks += 1
+            self._learn_memory(wrkr, task)
+            if status == 'ok':
+                task.future.set_result(result)
+            else:
+                task.future.set_exception(result)
+
+            if self.max_tasks_per_worker is not None and wrkr.ntasks >= self.max_tasks_per_worker:
+                self.events['recycled'] += 1
+                self._remove_worker(wrkr, kill_flag=False)
+
+        return
+
+    def _check_limits(self, busy):
+        """
+        kill workers whose tasks have run too long or which use too much memory
+        """
+        for wrkr in busy:
+            if wrkr.task is None or wrkr not in self.workers:
+                continue
+
+            elapsed = time() - wrkr.t_start
+            if self.timeout is not None and elapsed > self.timeout:
+                task = wrkr.task
+                self._remove_worker(wrkr, kill_flag=True)
+                self.events['timed out'] += 1
+                task.future.set_exception(WorkerTimeout('task killed after {:.0f} seconds'.format(elapsed)))
+                continue
+
+            if self.max_rss_mb is not None and wrkr.rss is not None and wrkr.rss > self.max_rss_mb:
+                self._requeue_or_fail(wrkr, 'memory exceeded', WorkerMemoryExceeded,
+                                'worker {} used {:.0f} MB, cap is {} MB'.format(wrkr.proc.pid, wrkr.rss,
+                                                                                                self.max_rss_mb))
+        return
+
+    def _supervise(self):
+        """
+        runs in a thread until shutdown and all tasks are complete
+        """
+        while True:
+            self._assign_tasks()
+            busy = [wrkr for wrkr in self.workers if wrkr.task is not None]
+            if len(busy) == 0:
+                with self.cond:
+                    if self.shutdown_flag and len(self.tasks) == 0:
+                        break
+                    if len(self.tasks) == 0:
+                        self.cond.wait(POLL_SECS)
+                continue
+
+            self._collect_results(busy)
+            if self.max_rss_mb is not None or self.memory_budget_mb is not None:
+                self._measure_workers()
+            self._check_limits(busy)
+
+        for wrkr in list(self.workers):
+            self._remove_worker(wrkr, kill_flag=False)
+
+        return
+
+    def summary(self):
+        """
+        one line description of recycling, timeouts, memory kills and requeues
+        """
+        return ', '.join(['{} {}'.format(nevents, event) for event, nevents in self.events.items()])
@@ -0,0 +1,421 @@
+# -------------------------------------------------------------------------------
+# Name:        ora_worker_service.py
+# Purpose:     long lived local service which runs farms on a pool of warm worker processes
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   the service performs initiation once i.e. reads the setup file, lookup table, parameters and animal production
+#   data and imports the models, then publishes the result to its workers, see ora_shared_data, each of which
+#   runs any number of farms; clients, the submission GUI and run_batch_pyora, connect on localhost
+#   send the farm run directories and receive a status message as each run is queued, starts and finishes
+#   requests are authenticated by a key known only to the user: PYORATOR_SERVICE_KEY if set, otherwise a random key
+#   created on first use in a file readable only by the user, see _authkey
+#
+#   usage: ora_worker_service.py serve [--port PORT] [--nworkers N]
+#          ora_worker_service.py submit DIR [DIR ...] [--port PORT]
+#          ora_worker_service.py shutdown [--port PORT]
+# -------------------------------------------------------------------------------
+
+__prog__ = 'ora_worker_service.py'
+__version__ = '0.0.0'
+
+# Version history
+# ---------------
+#
+from argparse import ArgumentParser
+from os import cpu_count, environ, open as os_open, fdopen, stat, O_WRONLY, O_CREAT, O_EXCL
+from os.path import abspath, normpath, expanduser, expandvars, join, isfile
+from secrets import token_hex
+from multiprocessing import Queue, AuthenticationError
+from multiprocessing.connection import Listener, Client
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from threading import Thread, Lock
+from itertools import count
+from time import time
+import sys
+
+from ora_shared_data import publish, published, install, resolve, freeze_published
+
+SERVICE_HOST = 'localhost'
+SERVICE_PORT = 6070
+FNAME_KEY = join(expanduser('~'), '.pyorator_service_key')   # override using environment variable PYORATOR_SERVICE_KEY
+
+ERROR_STR = '*** Error *** '
+WARN_STR = '*** Warning *** '
+
+_warm_form = None
+_status_queue = None
+
+class _WarmForm(object, ):
+    """
+    holds attributes created by initiation; copied for each run
+    """
+
+def _authkey():
+    """
+    clients and service must share the key since requests are unpickled by the service; return None if the key
+    file cannot be created or may be read by other users
+    """
+    key = environ.get('PYORATOR_SERVICE_KEY')
+    if key is not None:
+        return key.encode()
+
+    if not isfile(FNAME_KEY):
+        try:
+            fd = os_open(FNAME_KEY, O_WRONLY | O_CREAT | O_EXCL, 0o600)
+        except FileExistsError:
+            pass    # created by another process
+        except OSError as err:
+            print(ERROR_STR + 'could not create service key file ' + FNAME_KEY + ': ' + str(err))
+            return None
+        else:
+            with fdopen(fd, 'w') as fkey:
+                fkey.write(token_hex(32))
+
+    if sys.platform != 'win32' and stat(FNAME_KEY).st_mode & 0o077:    # Windows profiles are private
+        print(ERROR_STR + 'service key file ' + FNAME_KEY + ' must be readable only by its owner e.g. chmod 600')
+        return None
+
+    with open(FNAME_KEY, 'r') as fkey:
+        key = fkey.read().strip()
+
+    return key.encode() if len(key) > 0 else None
+
+def _init_worker(published_objs, warm_form_ref, status_queue):
+    """
+    runs once in each worker process; the warm form is that published by the service
+    """
+    global _warm_form, _status_queue
+
+    install(published_objs)
+    _status_queue = status_queue
+    _warm_form = resolve(warm_form_ref)
+
+    return
+
+def _run_job(job_id, run_dir, fwd_wthr_scnrs, optim_args):
+    """
+    run one farm in a worker process; return code as for run_farm
+    """
+    from initialise_pyorator_batch import copy_form
+    from run_batch_pyora import run_farm
+
+    _status_queue.put((job_id, 'running', None))
+
+    return run_farm(copy_form(_warm_form), run_dir, fwd_wthr_scnrs, optim_args)
+
+class WorkerService(object, ):
+    """
+    accepts connections on localhost; each request is run on a pool of warm workers
+    """
+    def __init__(self, port=SERVICE_PORT, nworkers=None, headless=True):
+        """
+        nworkers defaults to the number of cores
+        """
+        if nworkers is None:
+            nworkers = cpu_count()
+
+        from initialise_pyorator_batch import initiation
+
+        warm_form = _WarmForm()
+        initiation(warm_form, headless)
+        warm_form.settings['max_workers'] = 1     # forward runs of each farm are not fanned out, workers use the cores
+        warm_form_ref = publish('warm_form', warm_form)
+        freeze_published()
+
+        self.address = (SERVICE_HOST, port)
+        self.status_queue = Queue()
+        self.pool = ProcessPoolExecutor(max_workers=nworkers, initializer=_init_worker,
+                                        initargs=published() + (warm_form_ref, self.status_queue))
+        self.jobs = {}      # client connection, run directory and start time keyed by job id
+        self.jobs_lock = Lock()
+        self.job_ids = count(1)
+        self.listener = None
+        self.authkey = None
+        self.active = False
+        print('Service will use {} workers'.format(nworkers))
+
+    def _send(self, job_id, status, mess=None):
+        """
+        send status of a job to its client; a client which has disconnected no longer receives messages
+        """
+        with self.jobs_lock:
+            if job_id not in self.jobs:
+                return
+            conn, conn_lock, run_dir, strt_time = self.jobs[job_id]
+
+        msg = {'job_id': job_id, 'run_dir': run_dir, 'status': status, 'elapsed': round(time() - strt_time, 2),
+                                                                                                    'mess': mess}
+        try:
+            with conn_lock:
+                conn.send(msg)
+        except (OSError, EOFError):
+            pass
+
+        return
+
+    def _relay_status(self):
+        """
+        forward messages from the workers e.g. when a job starts
+        """
+        while True:
+            job_id, status, mess = self.status_queue.get()
+            if job_id is None:
+                break
+            self._send(job_id, status, mess)
+
+        return
+
+    def _job_done(self, job_id, future):
+        """
+        report a job which has finished or failed
+        """
+        err = future.exception()
+        if err is not None:
+            self._send(job_id, 'failed', str(err))
+        elif future.result() != 0:
+            self._send(job_id, 'failed', 'farm run failed, see the service log')
+        else:
+            self._send(job_id, 'done')
+
+        with self.jobs_lock:
+            del self.jobs[job_id]
+
+        return
+
+    def _fail_unsubmitted(self, job_id, run_dirs, conn, conn_lock, mess):
+        """
+        report as failed a job which could not be submitted together with the remaining run directories of its request
+        """
+        self._send(job_id, 'failed', mess)
+        with self.jobs_lock:
+            del self.jobs[job_id]
+
+        for run_dir in run_dirs:
+            job_id = next(self.job_ids)
+            with self.jobs_lock:
+                self.jobs[job_id] = (conn, conn_lock, run_dir, time())
+            self._send(job_id, 'failed', mess)
+            with self.jobs_lock:
+                del self.jobs[job_id]
+
+        return
+
+    def _handle_client(self, conn):
+        """
+        request is a dictionary: command is run, ping or shutdown; run requests also have run_dirs and optionally
+        fwd_wthr_scnrs and optim_args
+        """
+        try:
+            request = conn.recv()
+        except (OSError, EOFError) as err:
+            print(WARN_STR + 'could not read request: ' + str(err))
+            conn.close()
+            return
+
+        cmd = request.get('command')
+        if cmd == 'ping':
+            conn.send({'status': 'alive'})
+            conn.close()
+            return
+
+        if cmd == 'shutdown':
+            conn.send({'status': 'shutting down'})
+            conn.close()
+            self.shutdown()
+            return
+
+        if cmd != 'run':
+            conn.send({'status': 'failed', 'mess': 'unrecognised command: ' + str(cmd)})
+            conn.close()
+            return
+
+        conn_lock = Lock()
+        futures = {}
+        run_dirs = request['run_dirs']
+        for irun, run_dir in enumerate(run_dirs):
+            job_id = next(self.job_ids)
+            with self.jobs_lock:
+                self.jobs[job_id] = (conn, conn_lock, run_dir, time())
+            self._send(job_id, 'queued')
+
+            try:
+                future = self.pool.submit(_run_job, job_id, run_dir, request.get('fwd_wthr_scnrs'),
+                                                                                    request.get('optim_args'))
+            except RuntimeError as err:     # includes BrokenProcessPool and submission after shutdown
+                self._fail_unsubmitted(job_id, run_dirs[irun + 1:], conn, conn_lock, 'could not queue run: ' + str(err))
+                break
+            futures[future] = job_id
+
+        for future in as_completed(futures):
+            self._job_done(futures[future], future)
+
+        try:
+            with conn_lock:
+                conn.send({'status': 'finished', 'njobs': len(run_dirs)})
+        except (OSError, EOFError):
+            pass
+        conn.close()
+
+        return
+
+    def serve(self):
+        """
+        accept clients until shutdown
+        """
+        self.authkey = _authkey()
+        if self.authkey is None:
+            print(ERROR_STR + 'simulation service not started - no service key')
+            self.pool.shutdown(wait=False)
+            return
+
+        relay = Thread(target=self._relay_status, daemon=True)
+        relay.start()
+
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.address = self.listener.address    # port 0 is replaced by that assigned
+        self.active = True
+        print('Simulation service listening on {}:{}'.format(*self.address))
+        while self.active:
+            try:
+                conn = self.listener.accept()
+            except Exception as err:
+                print(WARN_STR + 'rejected connection: ' + str(err))
+                continue
+
+            if not self.active:
+                conn.close()
+                break
+
+            Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+        self.listener.close()
+        self.pool.shutdown(wait=True)
+        self.status_queue.put((None, None, None))
+        print('Simulation service stopped')
+
+        return
+
+    def shutdown(self):
+        """
+        stop accepting clients; queued jobs are completed
+        """
+        self.active = False
+        try:
+            Client(self.address, authkey=self.authkey).close()   # wake the listener
+        except (OSError, AuthenticationError):
+            pass
+
+        return
+
+def _request(port, request):
+    """
+    connect to the service and send request; return connection or None
+    """
+    authkey = _authkey()
+    if authkey is None:
+        return None
+
+    try:
+        conn = Client((SERVICE_HOST, port), authkey=authkey)
+    except (OSError, AuthenticationError) as err:
+        print(ERROR_STR + 'could not connect to simulation service on port {}: {}'.format(port, err))
+        return None
+
+    conn.send(request)
+
+    return conn
+
+def describe_status(msg):
+    """
+    one line summary of a status message for display
+    """
+    mess = '' if msg.get('mess') is None else '\t' + msg['mess']
+    return 'Job {}\t{}\t{}\t{} secs{}'.format(msg['job_id'], msg['status'], msg['run_dir'], msg['elapsed'], mess)
+
+def submit_runs(run_dirs, port=SERVICE_PORT, fwd_wthr_scnrs=None, optim_args=None, status_fn=None):
+    """
+    thin client: submit farm run directories and report status of each until all have finished
+    status_fn: optional function called with each status message, default is to print
+    return number of jobs which failed or None if the service could not be reached
+    """
+    conn = _request(port, {'command': 'run', 'run_dirs': list(run_dirs), 'fwd_wthr_scnrs': fwd_wthr_scnrs,
+                                                                                            'optim_args': optim_args})
+    if conn is None:
+        return None
+
+    nfailed = 0
+    try:
+        while True:
+            msg = conn.recv()
+            if msg['status'] == 'failed':
+                nfailed += 1
+            if status_fn is not None:
+                status_fn(msg)
+            elif msg['status'] == 'finished':
+                print('All {} runs finished, {} failed'.format(msg['njobs'], nfailed))
+            else:
+                print(describe_status(msg))
+            if msg['status'] == 'finished':
+                break
+    except EOFError:
+        print(ERROR_STR + 'simulation service closed the connection')
+    finally:
+        conn.close()
+
+    return nfailed
+
+def ping_service(port=SERVICE_PORT):
+    """
+    return True if the service is running
+    """
+    authkey = _authkey()
+    if authkey is None:
+        return False
+
+    try:
+        conn = Client((SERVICE_HOST, port), authkey=authkey)
+    except (OSError, AuthenticationError):
+        return False
+
+    conn.send({'command': 'ping'})
+    alive = conn.recv()['status'] == 'alive'
+    conn.close()
+
+    return alive
+
+def shutdown_service(port=SERVICE_PORT):
+    """
+    service completes queued jobs then stops
+    """
+    conn = _request(port, {'command': 'shutdown'})
+    if conn is not None:
+        print(conn.recv()['status'])
+        conn.close()
+
+    return
+
+def main():
+    """
+    Entry point
+    """
+    argparser = ArgumentParser(prog=__prog__, description='Simulation service for PyOrator farm runs')
+    argparser.add_argument('command', choices=['serve', 'submit', 'shutdown'])
+    argparser.add_argument('run_dirs', nargs='*', help='farm run directories to submit')
+    argparser.add_argument('--port', type=int, default=SERVICE_PORT)
+    argparser.add_argument('--nworkers', type=int, help='number of worker processes, defaults to number of cores')
+    argparser.add_argument('--desktop', action='store_true',
+                           help='service performs desktop set up checks, otherwise the headless profile is used')
+    args = argparser.parse_args()
+
+    if args.command == 'serve':
+        WorkerService(args.port, args.nworkers, not args.desktop).serve()
+    elif args.command == 'submit':
+        run_dirs = [abspath(normpath(expanduser(expandvars(run_dir)))) for run_dir in args.run_dirs]
+        submit_runs(run_dirs, args.port)
+    else:
+        shutdown_service(args.port)
+
+if __name__ == '__main__':
+    main()
@@ -11,35 +11,158 @@ __prog__ = 'run_batch_pyora'
 __version__ = '0.0'
 
 from argparse import ArgumentParser
-from os.path import abspath, expanduser, expandvars, normpath, join, isfile, split, isdir
+from os.path import abspath, expanduser, expandvars, normpath, join, isfile, split, isdir, dirname
+from os import environ, pathsep
+from subprocess import run
+import sys
 
 from initialise_pyorator_batch import read_config_file, initiation
-from ora_cn_model import run_soil_cn_algorithms
+from ora_wthr_misc_fns import read_csv_wthr_file
+from ora_cn_model import run_soil_cn_algorithms, optimise_fwd_soil_cn
+from ora_cn_summary_fns import SUMMARY_METRICS
 from livestock_output_data import calc_livestock_data, check_livestock_run_data
-from ora_economics_model import test_economics_algorithms
 
 sleepTime = 5
 WARN_STR = '*** Warning *** '
 PROGRAM_ID = 'spec_run'
 ERROR_STR = '*** Error *** '
 FNAME_RUN = 'FarmWthrMgmt.xlsx'
+IMPORT_REPORT_NTOP = 20
 
 class RunSite(object):
     """
     C
     """
-    def __init__(self, run_fns_dir):
+    def __init__(self, run_fns_dir, fwd_wthr_scnrs=None, optim_args=None, headless=False, max_workers=None):
         """
-        C
+        optim_args: optional keyword arguments for fn optimise_fwd_soil_cn
+        headless: skip desktop only checks during set up, also the default on platforms other than Windows
+        max_workers: optional limit on the worker processes of this run e.g. when several runs share the cores
         """
-        initiation(self)
-        read_config_file(self, run_fns_dir)
-        run_soil_cn_algorithms(self)
+        initiation(self, headless)
+        self.settings['max_workers'] = max_workers
+        run_farm(self, run_fns_dir, fwd_wthr_scnrs, optim_args)
 
-        if check_livestock_run_data(self.settings['mgmt_dir'], self.anml_prodn):
-            calc_livestock_data(self)
-            test_economics_algorithms(self)
-            print('Livestock animal types to process: {}'.format(''))
+def run_farm(form, run_fns_dir, fwd_wthr_scnrs=None, optim_args=None):
+    """
+    run the models for one farm using a form which has been through initiation
+    used by RunSite and by the workers of the simulation service which reuse the same initiation for many farms
+    return code convention is 0 for success, -1 for failure
+    """
+    if not read_config_file(form, run_fns_dir):
+        return -1
+
+    if run_soil_cn_algorithms(form, fwd_wthr_scnrs) != 0:
+        return -1
+
+    if optim_args is not None:
+        optimise_fwd_soil_cn(form, **optim_args)
+
+    run_livestock_economics(form)
+
+    return 0
+
+def run_livestock_economics(form):
+    """
+    livestock and economics models follow the carbon, nitrogen and soil water model, if the farm has livestock
+    """
+    if check_livestock_run_data(form.settings['mgmt_dir'], form.anml_prodn):
+        from ora_economics_model import test_economics_algorithms     # scipy is only needed for economics
+
+        calc_livestock_data(form)
+        test_economics_algorithms(form)
+        print('Livestock animal types to process: {}'.format(''))
+
+    return
+
+def import_time_report(ntop=IMPORT_REPORT_NTOP):
+    """
+    report cold start import times of this script using the -X importtime option of a fresh interpreter
+    so that start up latency can be tracked between releases
+    """
+    env = dict(environ)
+    env['PYTHONPATH'] = pathsep.join([path for path in sys.path if path != ''])
+    cmd = [sys.executable, '-X', 'importtime', '-c', 'import ' + __prog__]
+    result = run(cmd, capture_output=True, text=True, cwd=dirname(abspath(__file__)), env=env)
+    if result.returncode != 0:
+        print(ERROR_STR + 'could not import ' + __prog__ + '\n' + result.stderr[-2000:])
+        return None
+
+    # lines are of form: import time: self [us] | cumulative | imported package
+    # self times are attributed to the top level package e.g. pandas.core.frame to pandas
+    # =====================================================================================
+    pkg_imprt_tms = {}
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[0].startswith('import time:'):
+            continue
+        try:
+            self_us = int(fields[0].split(':')[1])
+        except ValueError:
+            continue    # header line
+        pkg_name = fields[2].strip().split('.')[0]
+        pkg_imprt_tms[pkg_name] = pkg_imprt_tms.get(pkg_name, 0) + self_us
+
+    total_ms = sum(pkg_imprt_tms.values()) / 1000
+    print('\nCold start import times for {} version {} using Python {}'
+                                                        .format(__prog__, __version__, sys.version.split()[0]))
+    print('\t{:<40}{:>12}{:>8}'.format('package or module', 'time (ms)', '%'))
+    for pkg_name, self_us in sorted(pkg_imprt_tms.items(), key=lambda item: -item[1])[:ntop]:
+        print('\t{:<40}{:>12.1f}{:>8.1f}'.format(pkg_name, self_us / 1000, 100 * self_us / 1000 / total_ms))
+    print('\t{:<40}{:>12.1f}'.format('total', total_ms))
+
+    return pkg_imprt_tms
+
+def _read_fwd_wthr_scnrs(fwd_wthr_args):
+    """
+    each argument is of form scenario=CSV file of forward run weather e.g. A1B=A1B_fwd.csv or scenario=weather
+    resource e.g. A1B=ClimGen_A1B, in which case the weather of each farm is extracted, see site_wthr_scnrs
+    """
+    if fwd_wthr_args is None:
+        return None
+
+    fwd_wthr_scnrs = {}
+    for fwd_wthr_arg in fwd_wthr_args:
+        scnr, dum, csv_fn = fwd_wthr_arg.partition('=')
+        if csv_fn == '':
+            print(WARN_STR + 'forward weather scenario ' + fwd_wthr_arg + ' must be of form scenario=csv_file')
+            continue
+
+        if not isfile(normpath(csv_fn)) and not csv_fn.lower().endswith('.csv'):
+            fwd_wthr_scnrs[scnr] = csv_fn   # weather resource
+            continue
+
+        csv_valid_flag, pettmp = read_csv_wthr_file(normpath(csv_fn))
+        if csv_valid_flag:
+            fwd_wthr_scnrs[scnr] = pettmp
+        else:
+            print(WARN_STR + 'discarded forward weather scenario ' + scnr)
+
+    return fwd_wthr_scnrs
+
+def _read_optim_args(args):
+    """
+    gather optimisation settings; limits are of form metric=maximum e.g. n2o_emiss=5
+    """
+    if args.optimise is None:
+        return None
+
+    limits = {}
+    if args.limit is not None:
+        for limit_arg in args.limit:
+            metric, dum, limit = limit_arg.partition('=')
+            if metric not in SUMMARY_METRICS:
+                print(WARN_STR + 'discarded limit on unrecognised metric ' + metric)
+                continue
+            try:
+                limits[metric] = float(limit)
+            except ValueError:
+                print(WARN_STR + 'limit ' + limit_arg + ' must be of form metric=number')
+
+    optim_args = {'target': args.optimise, 'limits': limits, 'owex_min': args.owex_range[0],
+                  'owex_max': args.owex_range[1], 'mnths_appl': args.ow_mnth, 'ow_types': args.ow_type,
+                  'fert_n_bounds': args.fert_n_range}
+    return optim_args
 
 def main():
     """
@@ -48,11 +171,50 @@ def main():
     argparser = ArgumentParser(prog=__prog__,
                                description='Run ECOSSE in parallel for spatial simulations.',
                                usage='{} runfile'.format(__prog__))
-    argparser.add_argument('runfnsdir', help='Full path of for the Excel run files' + FNAME_RUN)
+    argparser.add_argument('runfnsdir', nargs='?', help='Full path of for the Excel run files' + FNAME_RUN)
+    argparser.add_argument('--fwd_wthr', action='append', metavar='SCENARIO=CSV|RESOURCE',
+                           help='forward run weather for an additional climate scenario from a CSV file or a weather '
+                                'resource e.g. ClimGen_A1B, may be repeated')
+    argparser.add_argument('--optimise', choices=list(SUMMARY_METRICS), metavar='TARGET',
+                           help='after the model run, search applications which maximise this metric e.g. yld_n_lim')
+    argparser.add_argument('--owex_range', nargs=2, type=float, default=[0.0, 10.0], metavar=('MIN', 'MAX'),
+                           help='range of extra organic waste (t/ha) searched by the optimiser')
+    argparser.add_argument('--ow_mnth', action='append', metavar='MONTH',
+                           help='month of organic waste application e.g. Mar, may be repeated, all to search every '
+                                'month, defaults to that of the first application of the forward run')
+    argparser.add_argument('--ow_type', action='append', metavar='TYPE',
+                           help='organic waste type, may be repeated, all to search every type, defaults to that '
+                                'of the first application of the forward run')
+    argparser.add_argument('--fert_n_range', nargs=2, type=float, metavar=('MIN', 'MAX'),
+                           help='range of fertiliser N scaling also searched by the optimiser')
+    argparser.add_argument('--limit', action='append', metavar='METRIC=MAX',
+                           help='limit imposed during optimisation e.g. n2o_emiss=5, may be repeated')
+    argparser.add_argument('--max_workers', type=int, metavar='N',
+                           help='maximum worker processes for forward runs, defaults to the number of cores')
+    argparser.add_argument('--headless', action='store_true',
+                           help='server or batch profile which skips desktop only set up checks')
+    argparser.add_argument('--service', type=int, metavar='PORT',
+                           help='submit the run to the simulation service listening on this port of localhost')
+    argparser.add_argument('--import_report', action='store_true',
+                           help='report cold start import times then exit')
     args = argparser.parse_args()
+    if args.import_report:
+        import_time_report()
+        return
+
+    if args.runfnsdir is None:
+        argparser.error('runfnsdir is required')
+
     args.runfnsdir = abspath(normpath(expanduser(expandvars(args.runfnsdir))))
 
-    RunSite(args.runfnsdir)  # instantiate model run
+    if args.service is not None:
+        from ora_worker_service import submit_runs
+
+        submit_runs([args.runfnsdir], args.service, _read_fwd_wthr_scnrs(args.fwd_wthr), _read_optim_args(args))
+        return
+
+    RunSite(args.runfnsdir, _read_fwd_wthr_scnrs(args.fwd_wthr), _read_optim_args(args),
+                                                        args.headless, args.max_workers)  # instantiate model run
 
 if __name__ == '__main__':
     main()
@@ -12,11 +12,9 @@ __author__ = 's02dm4'
 from os.path import isfile, normpath, exists, join
 from os import makedirs
 import numpy as np
-from PyQt5.QtWidgets import QApplication
 from pathlib import Path
 from datetime import datetime
 from pandas import DataFrame, read_excel
-import matplotlib.pyplot as plt
 # import matplotlib
 # matplotlib.use('Agg')
 
@@ -27,6 +25,7 @@ from merge_data import merge_harvest_land_use
 from livestock_class import Livestock
 from ora_cn_classes import LivestockModel
 from ora_gui_misc_fns import simulation_yrs_validate
+from ora_progress_fns import report_progress
 
 FNAME_RUN = 'FarmWthrMgmt.xlsx'
 WARN_STR = '*** Warning *** '
@@ -95,7 +94,7 @@ def _get_production_and_n_excreted(anml_prodn_obj, all_lvstck):
             if np.isnan(manure):
                 print(f'No {anml_type} data available for {system} production system for {region}. '
                       f'"ANY" data used instead.')
-                QApplication.processEvents()
+                report_progress()
 
                 res = anml_prodn_df[(anml_prodn_df.Region == region) &
                                     (anml_prodn_df.System == 'ANY') & (anml_prodn_df.Type == anml_type)]
@@ -188,7 +187,7 @@ def calc_livestock_data(form):
 
     # Calculate change in production for each crop sub-area and management type, using each calculation method
     print('Calculating livestock production')
-    QApplication.processEvents()
+    report_progress()
     total_an_prod_all_subareas = {}
     for subarea in harvest_land_use_merged.items():
         calc_method_dic = {}
@@ -213,7 +212,7 @@ def calc_livestock_data(form):
         tot_prod_data = {subarea[0] : calc_method_dic}
         total_an_prod_all_subareas.update(tot_prod_data)
     print('Livestock calcs completed')
-    QApplication.processEvents()
+    report_progress()
 
     form.total_an_prod_all_subareas = total_an_prod_all_subareas
 
@@ -316,7 +315,7 @@ def calc_livestock_data(form):
     # THIS IS VERY VERY SLOW RIGHT NOW - NEEDS REDONE
 
     print('Creating livestock charts')
-    QApplication.processEvents()
+    report_progress()
     parent_dir = join( form.settings['out_dir'], 'Livestock', 'Graphs')
     if not exists(parent_dir):
         makedirs(parent_dir)
@@ -330,6 +329,8 @@ def calc_livestock_data(form):
     '''
     return
 
+    import matplotlib.pyplot as plt     # deferred until charts are generated
+
     path = parent_dir
     all_livestock_df = DataFrame.from_dict(total_an_prod_all_subareas)
     all_livestock_df.to_csv(path+'\\all_data.csv')
@@ -383,9 +384,9 @@ def calc_livestock_data(form):
                     nplots += 1
 
         print('\tGenerated {} plots for subarea {}'.format(nplots, subarea_path))
-        QApplication.processEvents()
+        report_progress()
 
     print('Livestock chart generation completed')
-    QApplication.processEvents()
+    report_progress()
 
     return
@@ -0,0 +1,19 @@
+# -------------------------------------------------------------------------------
+# Name:        conftest.py
+# Purpose:     make the modules of each package directory importable by bare name, as they are when run
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# Description:
+#   tests which need optional packages e.g. thornthwaite, netCDF4 or PyQt5 are skipped when these are absent
+#
+#   usage: python -m pytest tests
+# -------------------------------------------------------------------------------
+import sys
+from os.path import abspath, dirname, join
+
+ROOT_DIR = dirname(dirname(abspath(__file__)))
+for pkg_dir in ('InitInptsBatch', 'BioModels', 'CnstrctrBatch', 'LiveStockBatch'):
+    pkg_path = join(ROOT_DIR, pkg_dir)
+    if pkg_path not in sys.path:
+        sys.path.insert(0, pkg_path)
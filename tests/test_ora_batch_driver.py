@@ -0,0 +1,92 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_batch_driver.py
+# Purpose:     check that identical subareas of different farms are computed once, and recomputed if that fails
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os import makedirs
+from os.path import join, basename
+from time import sleep
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('set_up_logging')
+
+import ora_batch_driver
+
+NMNTHS = 12
+FAIL_AREA = -1.0    # a subarea of this area fails to compute
+
+# soil and area of each subarea of each farm, the area does not affect the results
+FARMS = {'f0': [(1, FAIL_AREA), (2, 2.0)], 'f1': [(2, 5.0), (3, 1.0)], 'f2': [(1, 7.0), (1, 8.0)], 'f3': [(3, 1.0)]}
+
+class _Run(object, ):
+    def __init__(self, val):
+        self.data = {'soc': [float(val)] * NMNTHS}
+
+def _mngmnt():
+    return {'crop_name': ['Maize'] * NMNTHS, 'org_fert': [None] * NMNTHS}
+
+def _read_farm(warm_form, run_dir):
+    ora_subareas = {'AB'[isba]: SimpleNamespace(soil_for_area=SimpleNamespace(t_clay=soil), area_ha=area_ha,
+                                crop_mngmnt_ss=_mngmnt(), crop_mngmnt_fwd=_mngmnt(), crop_mngmnt_fwd_scnrs={},
+                                ntsteps_ss=NMNTHS, ntsteps_fwd=NMNTHS)
+                                                for isba, (soil, area_ha) in enumerate(FARMS[basename(run_dir)])}
+    ora_weather = SimpleNamespace(pettmp_ss={'precip': [1.0] * NMNTHS}, pettmp_fwd={'precip': [1.0] * NMNTHS})
+
+    return None, (warm_form.ora_parms, None, ora_weather, ora_subareas)
+
+def _compute_farm(ora_parms, ora_weather, ora_subareas, fwd_wthr_scnrs, form=None, max_workers=None, sbas=None):
+    """
+    in a compute process; the results of a subarea are its soil
+    """
+    sbas = list(ora_subareas) if sbas is None else sbas
+    sleep(0.3)
+    if any(ora_subareas[sba].area_ha == FAIL_AREA for sba in sbas):
+        raise ValueError('steady state failed')
+
+    farm_rslts = {'all_runs': {}, 'all_runs_scnrs': {}, 'scnr_summaries': {}, 'crop_models': {}, 'mngmnts_ss': {},
+                                                                            'mngmnts_fwd': {}, 'scnr_outputs': []}
+    for sba in sbas:
+        farm_rslts['all_runs'][sba] = (_Run(ora_subareas[sba].soil_for_area.t_clay),)
+        farm_rslts['crop_models'][sba] = SimpleNamespace(area_ha=ora_subareas[sba].area_ha)
+        farm_rslts['scnr_summaries'][sba] = {}
+        farm_rslts['mngmnts_ss'][sba] = None
+        farm_rslts['mngmnts_fwd'][sba] = None
+
+    return farm_rslts
+
+@pytest.mark.parametrize('dedup_flag', [True, False])
+def test_shared_subareas(tmp_path, monkeypatch, dedup_flag):
+    monkeypatch.setattr(ora_batch_driver, '_read_farm', _read_farm)
+    monkeypatch.setattr(ora_batch_driver, 'compute_farm', _compute_farm)
+    monkeypatch.setattr(ora_batch_driver, '_write_farm', lambda job: None)
+    run_dirs = []
+    for farm in FARMS:
+        run_dirs.append(join(str(tmp_path), farm))
+        makedirs(run_dirs[-1])
+
+    warm_form = SimpleNamespace(ora_parms=SimpleNamespace(crop_vars={'Maize': {}}, ow_parms={}, syn_fert_parms={},
+                                                                                                    n_parms={}))
+    pipeline = ora_batch_driver.FarmPipeline(warm_form, None, 1, 2, 1, dedup_flag=dedup_flag)
+    jobs = {basename(job.run_dir): job for job in pipeline.run(run_dirs)}
+
+    assert jobs['f0'].status == 'failed'
+    for farm in ('f1', 'f2', 'f3'):
+        assert jobs[farm].status == 'done'
+        all_runs = jobs[farm].farm_rslts['all_runs']
+        crop_models = jobs[farm].farm_rslts['crop_models']
+        for sba, (soil, area_ha) in zip('AB', FARMS[farm]):
+            assert all_runs[sba][0].data['soc'][0] == soil
+            assert crop_models[sba].area_ha == area_ha
+
+    # results given to two subareas are independent
+    assert jobs['f2'].farm_rslts['all_runs']['A'][0] is not jobs['f2'].farm_rslts['all_runs']['B'][0]
+
+    if dedup_flag:
+        # f1 waits for soil 2 of f0 then computes it when f0 fails; soil 1 is computed once for both subareas of
+        # f2 and soil 3 of f1 is reused by f3
+        assert pipeline.dedup_counts['computed'] == 3
+        assert pipeline.dedup_counts['reused'] == 2
@@ -0,0 +1,81 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_batch_journal.py
+# Purpose:     check that the journal stays valid when written from several threads and that runs resume from it
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os import makedirs
+from os.path import join
+from json import loads as loads_json
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+from ora_batch_journal import BatchJournal, FNAME_RUN
+
+NFARMS = 40
+
+def _farms(tmp_path, nfarms):
+    run_dirs = []
+    for ifarm in range(nfarms):
+        run_dir = join(str(tmp_path), 'farm{}'.format(ifarm))
+        makedirs(run_dir)
+        with open(join(run_dir, FNAME_RUN), 'w') as frun:
+            frun.write(str(ifarm))
+        run_dirs.append(run_dir)
+
+    return run_dirs
+
+def _job(run_dir, status):
+    """
+    minimal job as passed by the pipeline to finish
+    """
+    return SimpleNamespace(run_dir=run_dir, status=status, farm_inputs=None, farm_rslts=None, form=None,
+                                                                                    stage_times={}, error=None)
+
+def test_concurrent_records_are_not_torn(tmp_path):
+    run_dirs = _farms(tmp_path, NFARMS)
+    journal_fn = join(str(tmp_path), 'journal.jsonl')
+    journal = BatchJournal(journal_fn)
+
+    def start_finish(run_dir):
+        assert journal.start(run_dir)
+        journal.finish(_job(run_dir, 'done'))
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(start_finish, run_dirs))
+    journal.close()
+
+    with open(journal_fn, 'r') as fjournal:
+        recs = [loads_json(line) for line in fjournal]
+    assert len(recs) == 2 * NFARMS
+    assert sorted(rec['run_dir'] for rec in recs if rec['status'] == 'done') == sorted(run_dirs)
+
+def test_resume(tmp_path):
+    run_done, run_failed, run_changed = _farms(tmp_path, 3)
+    journal_fn = join(str(tmp_path), 'journal.jsonl')
+
+    journal = BatchJournal(journal_fn, max_retries=1)
+    for run_dir in (run_done, run_changed):
+        assert journal.start(run_dir)
+        journal.finish(_job(run_dir, 'done'))
+    assert journal.start(run_failed)
+    journal.finish(_job(run_failed, 'failed'))
+    journal.close()
+
+    with open(journal_fn, 'a') as fjournal:
+        fjournal.write('{"run_dir": "' + run_done + '", "sta')      # record torn by a power cut
+    with open(join(run_changed, FNAME_RUN), 'w') as frun:
+        frun.write('changed')
+
+    journal = BatchJournal(journal_fn, max_retries=1)
+    assert not journal.start(run_done)
+    assert journal.start(run_changed)
+    assert journal.start(run_failed)        # second attempt
+    journal.finish(_job(run_failed, 'failed'))
+    assert not journal.start(run_failed)    # retries exhausted
+    journal.close()
+
+    with open(journal_fn, 'r') as fjournal:
+        lines = fjournal.readlines()
+    assert all(line.endswith('\n') for line in lines)
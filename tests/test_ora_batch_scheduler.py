@@ -0,0 +1,98 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_batch_scheduler.py
+# Purpose:     check the splitting of farms into subarea groups, the order of dispatch and the learned costs
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os.path import join
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('thornthwaite')
+
+from ora_batch_scheduler import split_subareas, estimate_memory_mb, sba_units, CostModel, LVSTCK_UNITS, \
+                                                                                WORKER_BASE_MB, MB_PER_SBA_MNTH
+
+def _subarea(ntsteps_ss, ntsteps_fwd, nscnrs=0):
+    return SimpleNamespace(ntsteps_ss=ntsteps_ss, ntsteps_fwd=ntsteps_fwd,
+                           crop_mngmnt_fwd_scnrs={'scnr{}'.format(iscnr): None for iscnr in range(nscnrs)})
+
+def _scan(*units, lvstck=False):
+    return {'sba_units': {'S{}'.format(isba): nunits for isba, nunits in enumerate(units)}, 'lvstck': lvstck}
+
+def test_split_subareas_is_balanced_and_keeps_subarea_order():
+    units = {'A': 100, 'B': 700, 'C': 300, 'D': 400, 'E': 200, 'F': 300}
+    groups = split_subareas(units, 2)
+
+    assert sorted([sba for group in groups for sba in group]) == sorted(units)
+    assert [sum([units[sba] for sba in group]) for group in groups] == [1000, 1000]
+    for group in groups:
+        assert group == [sba for sba in units if sba in group]
+
+    assert split_subareas(units, 1) == [list(units)]
+    assert split_subareas({'A': 5, 'B': 1}, 4) == [['A'], ['B']]
+
+def test_memory_estimate_counts_scenarios_and_weather():
+    ora_subareas = {'A': _subarea(120, 60, nscnrs=2), 'B': _subarea(120, 60)}
+    assert sba_units(ora_subareas) == {'A': 300, 'B': 180}
+
+    assert estimate_memory_mb(ora_subareas) == pytest.approx(WORKER_BASE_MB + MB_PER_SBA_MNTH * 480)
+    assert estimate_memory_mb(ora_subareas, ['B'], nwthr_scnrs=3) == \
+                                                    pytest.approx(WORKER_BASE_MB + MB_PER_SBA_MNTH * (180 + 3 * 60))
+
+def test_longest_first_and_unscanned_farm_takes_mean_cost():
+    cost_model = CostModel()
+    run_dirs = ['short', 'long', 'unscanned', 'lvstck']
+    costs = cost_model.estimate(run_dirs, [_scan(100), _scan(300, 200), None, _scan(200, lvstck=True)])
+
+    assert costs['long'] == 500
+    assert costs['lvstck'] == pytest.approx(200 * (1 + LVSTCK_UNITS))
+    assert costs['unscanned'] == pytest.approx((100 + 500 + 220) / 3)
+    assert cost_model.longest_first(run_dirs) == ['long', 'unscanned', 'lvstck', 'short']
+
+def test_costly_farm_is_split_into_subarea_groups():
+    cost_model = CostModel()
+    cost_model.estimate(['big', 'small'], [_scan(400, 400, 400, 400), _scan(200)])
+    ora_subareas = {sba: _subarea(200, 200) for sba in ('A', 'B', 'C', 'D')}
+
+    assert cost_model.subarea_groups('small', {'A': _subarea(100, 100)}, 3) == [['A']]
+    assert cost_model.subarea_groups('big', ora_subareas, 3) == [['A', 'D'], ['B'], ['C']]
+    assert cost_model.subarea_groups('big', ora_subareas, 1) == [['A', 'B', 'C', 'D']]
+
+def test_cost_model_learns_and_persists_timings(tmp_path):
+    timings_fn = join(str(tmp_path), 'timings.json')
+    run_dirs = ['farm1', 'farm2', 'farm3']
+    scans = [_scan(100), _scan(300), _scan(50)]
+
+    cost_model = CostModel(timings_fn)
+    cost_model.estimate(run_dirs, scans)
+    cost_model.record(SimpleNamespace(run_dir='farm1', status='done'), 30.0)
+    cost_model.record(SimpleNamespace(run_dir='farm2', status='done'), 50.0)
+    cost_model.record(SimpleNamespace(run_dir='farm3', status='failed'), 1000.0)
+    cost_model.save()
+
+    # timed farms use their own timing, others the learned seconds per unit
+    # ======================================================================
+    reloaded = CostModel(timings_fn)
+    assert reloaded.timings == cost_model.timings
+    assert sorted(reloaded.timings) == ['farm1', 'farm2']
+    costs = reloaded.estimate(run_dirs + ['farm4'], scans + [_scan(300, 100)])
+    assert costs['farm1'] == 30.0 and costs['farm2'] == 50.0
+    assert costs['farm3'] == pytest.approx(50 * 80.0 / 400)
+    assert costs['farm4'] == pytest.approx(400 * 80.0 / 400)
+
+    # a farm whose run file has changed size is estimated afresh
+    # ===========================================================
+    changed = CostModel(timings_fn).estimate(['farm1'], [_scan(200)])
+    assert changed['farm1'] == pytest.approx(200 * 80.0 / 400)
+
+def test_corrupt_timings_are_ignored(tmp_path):
+    timings_fn = join(str(tmp_path), 'timings.json')
+    with open(timings_fn, 'w') as ftimings:
+        ftimings.write('{not json')
+
+    cost_model = CostModel(timings_fn)
+    assert cost_model.timings == {}
+    assert cost_model.estimate(['farm1'], [_scan(100)]) == {'farm1': 100}
@@ -0,0 +1,99 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_batch_shards.py
+# Purpose:     check that farm claims are exclusive and only taken over once their heartbeat has stopped
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os import utime
+from os.path import join, isfile
+from time import time, sleep
+
+import pytest
+
+pytest.importorskip('set_up_logging')
+
+from ora_batch_shards import FarmClaims, FNAME_CLAIM, FNAME_STATUS, read_farm_status
+from ora_batch_driver import FarmJob
+
+STALE_SECS = 0.4
+
+def _node(node_id, stale_secs=STALE_SECS):
+    """
+    each node of a cluster has its own id, here several nodes share one process
+    """
+    claims = FarmClaims(stale_secs)
+    claims.node_id = node_id
+
+    return claims
+
+def _age(claim_fn, secs):
+    """
+    simulate a claim last touched secs ago
+    """
+    mtime = time() - secs
+    utime(claim_fn, (mtime, mtime))
+
+def test_claim_is_exclusive(tmp_path):
+    node_a, node_b = _node('a'), _node('b')
+    run_dir = str(tmp_path)
+
+    assert node_a.claim(run_dir)
+    assert not node_b.claim(run_dir)
+    assert not node_a.claim(run_dir)
+    assert node_a.held == {run_dir}
+
+def test_finished_farm_is_not_claimed(tmp_path):
+    node_a, node_b = _node('a'), _node('b', stale_secs=0)
+    run_dir = str(tmp_path)
+    assert node_a.claim(run_dir)
+
+    job = FarmJob(run_dir)
+    job.status = 'complete'
+    node_a.finish(job)
+
+    assert node_a.held == set()
+    assert read_farm_status(run_dir)['node'] == 'a'
+    assert not node_b.claim(run_dir)
+    assert isfile(join(run_dir, FNAME_STATUS))
+
+def test_stale_claim_is_taken_over(tmp_path):
+    node_a, node_b = _node('a'), _node('b')
+    run_dir = str(tmp_path)
+    claim_fn = join(run_dir, FNAME_CLAIM)
+    assert node_a.claim(run_dir)
+
+    _age(claim_fn, 2 * STALE_SECS)
+    assert node_b.claim(run_dir)
+    assert isfile(claim_fn + '.stale.b')
+
+    # node a, e.g. resumed after being suspended, gives up the claim rather than refreshing the claim of node b
+    node_a.touch()
+    assert node_a.held == set()
+    assert node_b.held == {run_dir}
+
+def test_touch_keeps_claim_fresh(tmp_path):
+    node_a, node_b = _node('a'), _node('b')
+    run_dir = str(tmp_path)
+    claim_fn = join(run_dir, FNAME_CLAIM)
+    assert node_a.claim(run_dir)
+
+    _age(claim_fn, 2 * STALE_SECS)
+    node_a.touch()
+    assert not node_b.claim(run_dir)
+
+def test_heartbeat_outlives_stale_secs(tmp_path):
+    node_a, node_b = _node('a'), _node('b')
+    run_dir = str(tmp_path)
+    assert node_a.heartbeat_secs <= STALE_SECS / 4
+
+    node_a.start_heartbeat()
+    try:
+        assert node_a.claim(run_dir)
+        sleep(3 * STALE_SECS)
+        assert not node_b.claim(run_dir)
+    finally:
+        node_a.stop_heartbeat()
+
+    sleep(2 * STALE_SECS)
+    assert node_b.claim(run_dir)
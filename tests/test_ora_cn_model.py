@@ -0,0 +1,84 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_cn_model.py
+# Purpose:     check that a forward run resumed from the checkpoint of a base run equals a full rerun
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import random
+from copy import deepcopy
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('thornthwaite')
+
+from ora_cn_classes import CarbonChange, NitrogenChange, EnsureContinuity, MngmntSubarea, CropProdModel
+from ora_water_model import SoilWaterChange
+from ora_rothc_fns import run_rothc
+from ora_nitrogen_model import soil_nitrogen
+from ora_cn_fns import add_npp_zaks_by_month
+from ora_cn_model import _cn_forward_run, _first_changed_tstep, NPP_MODELS
+
+from test_ora_cn_vector_model import _parameters, _crop_mngmnt, _pettmp, NYRS_SS, NYRS_FWD
+
+EXTRA_APPL = {'ow_type': 'Compost', 'amount': 3.0}
+
+@pytest.fixture(scope='module')
+def steady_state():
+    """
+    steady state of a subarea together with the inputs of its forward runs
+    """
+    rand = random.Random(3)
+    parameters = _parameters()
+    soil_vars = SimpleNamespace(t_bulk=1.3, t_clay=25.0, t_silt=30.0, t_depth=30.0, t_pH_h2o=6.5, t_salinity=0.0,
+                                                                                                tot_soc_meas=50.0)
+    weather = SimpleNamespace(pettmp_ss=_pettmp(rand, NYRS_SS * 12), pettmp_fwd=_pettmp(rand, NYRS_FWD * 12))
+
+    mngmnt_ss = MngmntSubarea(_crop_mngmnt(NYRS_SS, False), weather)
+    continuity = EnsureContinuity(soil_vars.tot_soc_meas)
+    c_change, soil_water, n_change = CarbonChange(), SoilWaterChange(), NitrogenChange()
+    run_rothc(parameters, weather.pettmp_ss, mngmnt_ss, c_change, soil_vars, soil_water, continuity)
+    continuity.adjust_soil_water(soil_water)
+    soil_nitrogen(c_change, soil_water, parameters, weather.pettmp_ss, mngmnt_ss, soil_vars, n_change, continuity)
+    for tstep in range(mngmnt_ss.ntsteps):
+        add_npp_zaks_by_month(mngmnt_ss, weather.pettmp_ss, soil_water, tstep)
+
+    crop_model = CropProdModel()
+    crop_model.data['npp_zaks'] = mngmnt_ss.npp_zaks
+
+    return SimpleNamespace(parameters=parameters, soil_vars=soil_vars, weather=weather, mngmnt_ss=mngmnt_ss,
+                           c_change=c_change, n_change=n_change, soil_water=soil_water, crop_model=crop_model)
+
+def _forward_run(ss, crop_mngmnt, base_run=None):
+    mngmnt_fwd = MngmntSubarea(crop_mngmnt, ss.weather, ss.mngmnt_ss)
+    complete_runs = _cn_forward_run(ss.parameters, ss.weather, mngmnt_fwd, ss.soil_vars, ss.c_change, ss.n_change,
+                                                                    ss.soil_water, ss.crop_model, base_run)
+    return complete_runs, mngmnt_fwd
+
+@pytest.mark.parametrize('tstep_appl', [0, 27, None])
+def test_resumed_forward_run_matches_full_rerun(steady_state, tstep_appl):
+    """
+    scenario with an extra organic waste application from month tstep_appl, or no change when None
+    """
+    crop_mngmnt_base = _crop_mngmnt(NYRS_FWD, True)
+    base_run = _forward_run(steady_state, crop_mngmnt_base)
+
+    crop_mngmnt = deepcopy(crop_mngmnt_base)
+    if tstep_appl is not None:
+        crop_mngmnt['org_fert'][tstep_appl] = dict(EXTRA_APPL)
+
+    complete_runs_full, mngmnt_full = _forward_run(steady_state, deepcopy(crop_mngmnt))
+    complete_runs_rsmd, mngmnt_rsmd = _forward_run(steady_state, deepcopy(crop_mngmnt), base_run)
+
+    ntsteps = mngmnt_full.ntsteps
+    tstep_strt = _first_changed_tstep(base_run[1], mngmnt_rsmd)
+    assert tstep_strt == (ntsteps if tstep_appl is None else tstep_appl)
+
+    assert mngmnt_rsmd.npp_zaks == mngmnt_full.npp_zaks
+    for npp_model in NPP_MODELS:
+        for obj_full, obj_rsmd in zip(complete_runs_full[npp_model], complete_runs_rsmd[npp_model]):
+            assert sorted(obj_full.data) == sorted(obj_rsmd.data)
+            for var_name in obj_full.data:
+                assert list(obj_rsmd.data[var_name]) == list(obj_full.data[var_name]), \
+                                        '{} {} {}'.format(npp_model, type(obj_full).__name__, var_name)
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_cn_optimise.py
+# Purpose:     check the search of the application optimiser on a synthetic dose response with a known maximum
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('scipy')
+pytest.importorskip('thornthwaite')
+
+from numpy import array
+
+import ora_cn_optimise
+import ora_cn_model
+from ora_cn_optimise import OptimiseApplication, XATOL
+from ora_cn_summary_fns import SUMMARY_METRICS
+
+OWEX_BEST = 3.7         # organic waste amount which maximises yield
+FERT_N_SCALE_BEST = 1.2
+MNTH_BONUS = {'Jun': 0.5}
+NMNTHS = 24
+
+def _dose_response(*args):
+    """
+    stands in for vector_forward_run: yield peaks at OWEX_BEST and N2O rises with the amount of organic waste
+    """
+    dose_grid = args[-1]
+    rspns = {metric: [] for metric in SUMMARY_METRICS}
+    for owex_amnt, mnth_appl, ow_type, fert_n_scale, irrig_scale in dose_grid.doses:
+        for metric in SUMMARY_METRICS:
+            rspns[metric].append(0.0)
+        rspns['yld_n_lim'][-1] = 10.0 - (owex_amnt - OWEX_BEST)**2 - (fert_n_scale - FERT_N_SCALE_BEST)**2 + \
+                                                                                    MNTH_BONUS.get(mnth_appl, 0.0)
+        rspns['n2o_emiss'][-1] = 1.0 + owex_amnt
+
+    return {metric: array(vals).reshape(dose_grid.shape) for metric, vals in rspns.items()}
+
+@pytest.fixture
+def optimiser_args(monkeypatch):
+    monkeypatch.setattr(ora_cn_optimise, 'vector_forward_run', _dose_response)
+    weather = SimpleNamespace(pettmp_fwd={'precip': [0.0] * NMNTHS})
+    mngmnt_fwd = SimpleNamespace(ntsteps=NMNTHS)
+
+    return None, weather, mngmnt_fwd, None, None, None, None, None
+
+def test_bounded_brent_finds_maximum(optimiser_args):
+    optimiser = OptimiseApplication(*optimiser_args)
+    best = optimiser.optimise(0.0, 10.0, ['Mar'], ['Compost'])
+
+    assert best['owex_amnt'] == pytest.approx(OWEX_BEST, abs=XATOL)
+    assert best['summary']['yld_n_lim'] == pytest.approx(10.0 - (1 - FERT_N_SCALE_BEST)**2, abs=1e-3)
+    assert best['penalty'] == 0.0
+    assert len(optimiser.trail) < 20
+
+def test_best_month_and_fertiliser_scaling(optimiser_args):
+    optimiser = OptimiseApplication(*optimiser_args)
+    best = optimiser.optimise(0.0, 10.0, ['Mar', 'Jun'], ['Compost'], (0.5, 2.0))
+
+    assert best['mnth_appl'] == 'Jun'
+    assert best['owex_amnt'] == pytest.approx(OWEX_BEST, abs=0.1)
+    assert best['fert_n_scale'] == pytest.approx(FERT_N_SCALE_BEST, abs=0.1)
+
+def test_penalised_limit_moves_optimum_inside_limit(optimiser_args):
+    n2o_limit = 3.5     # reached with 2.5 t/ha of organic waste
+    optimiser = OptimiseApplication(*optimiser_args, 'yld_n_lim', {'n2o_emiss': n2o_limit})
+    best = optimiser.optimise(0.0, 10.0, ['Mar'], ['Compost'])
+
+    assert best['penalty'] == 0.0
+    assert best['summary']['n2o_emiss'] <= n2o_limit
+    assert best['owex_amnt'] == pytest.approx(n2o_limit - 1.0, abs=0.05)
+    assert any(evaltn['penalty'] > 0.0 for evaltn in optimiser.trail)
+
+def test_unknown_target_is_rejected(optimiser_args):
+    assert OptimiseApplication(*optimiser_args, 'yield').optimise(0.0, 10.0, ['Mar'], ['Compost']) is None
+
+def test_default_application_is_first_of_forward_run(optimiser_args, monkeypatch):
+    monkeypatch.setattr(ora_cn_model, '_abbrev_to_steady_state', lambda *args: args[:3])
+    parameters, weather, mngmnt_fwd = optimiser_args[:3]
+    mngmnt_fwd.org_fert = [None] * NMNTHS
+    mngmnt_fwd.org_fert[17] = {'ow_type': 'Compost', 'amount': 2.0}
+    mngmnt_fwd.org_fert[20] = {'ow_type': 'Fresh waste', 'amount': 2.0}
+    form = SimpleNamespace(ora_subareas={'A': SimpleNamespace(crop_mngmnt_ss={'fert_n': [None] * NMNTHS},
+                                                                                            soil_for_area=None)},
+                           all_runs_output={'A': (None, None, None)}, all_runs_mngmnt_fwd={'A': mngmnt_fwd},
+                           all_runs_crop_model={'A': None}, ora_parms=parameters, ora_weather=weather, lggr=None)
+
+    assert ora_cn_model._current_application(form, mngmnt_fwd) == ('Jun', 'Compost')
+
+    optim_runs = ora_cn_model.optimise_fwd_soil_cn(form)
+    assert {(evaltn['mnth_appl'], evaltn['ow_type']) for evaltn in optim_runs['A']['trail']} == {('Jun', 'Compost')}
+    assert optim_runs['A']['best']['owex_amnt'] == pytest.approx(OWEX_BEST, abs=XATOL)
+
+    optim_runs = ora_cn_model.optimise_fwd_soil_cn(form, mnths_appl=['Mar'])
+    assert {(evaltn['mnth_appl'], evaltn['ow_type']) for evaltn in optim_runs['A']['trail']} == {('Mar', 'Compost')}
+
+    mngmnt_fwd.org_fert = [None] * NMNTHS
+    assert ora_cn_model._current_application(form, mngmnt_fwd) is None
+    assert ora_cn_model.optimise_fwd_soil_cn(form) == {}
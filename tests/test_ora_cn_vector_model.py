@@ -0,0 +1,118 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_cn_vector_model.py
+# Purpose:     check the vectorised forward run against the scalar model for every dose of a grid
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('thornthwaite')
+
+from ora_cn_classes import CarbonChange, NitrogenChange, EnsureContinuity, MngmntSubarea
+from ora_water_model import SoilWaterChange
+from ora_rothc_fns import run_rothc
+from ora_nitrogen_model import soil_nitrogen
+from ora_cn_fns import add_npp_zaks_by_month
+from ora_cn_vector_model import DoseGrid, vector_forward_run, amend_org_fert
+from ora_cn_summary_fns import summarise_fwd_run
+
+NYRS_SS = 5
+NYRS_FWD = 6
+
+def _parameters():
+    crop = {'t_grow': 5, 'n_sply_opt': 120.0, 'n_sply_min': 10.0, 'n_respns_coef': 1.5, 'c_n_rat_pi': 40.0,
+            'rat_dpm_rpm': 1.44, 'max_root_dpth': 60.0}
+    n_parms = {'r_dry': 2, 'atmos_n_depos': 10.0, 'prop_atmos_dep_no3': 0.5, 'k_nitrif': 0.6, 'no3_min': 0.5,
+               'n_d50': 0.5, 'c_n_rat_soil': 8.5, 'precip_critic': 21.0, 'prop_volat': 0.15,
+               'prop_n2o_fc': 0.02, 'prop_nitrif_gas': 0.02, 'prop_nitrif_no': 0.4}
+    ow_parms = {'Fresh waste': {'c_n_rat': 20.0, 'prop_iom_ow': 0.05, 'rat_dpm_hum_ow': 1.0, 'pcnt_c': 0.3,
+                                'pcnt_urea': 2.0},
+                'Compost': {'c_n_rat': 12.0, 'prop_iom_ow': 0.1, 'rat_dpm_hum_ow': 0.5, 'pcnt_c': 0.2,
+                            'pcnt_urea': 1.0}}
+
+    return SimpleNamespace(n_parms=n_parms, crop_vars={'Maize': crop}, ow_parms=ow_parms, syn_fert_parms={})
+
+def _crop_mngmnt(nyrs, irrig_flag):
+    """
+    maize from May to September with fertiliser in May and fresh waste in March
+    """
+    mngmnt = {'crop_name': [], 'pi_prop': [], 'crop_curr': [], 'fert_n': [], 'org_fert': [], 'irrig': [],
+              'pi_tonne': [], 'crop_defns': [SimpleNamespace(yield_typ=3.0)] * nyrs}
+    for imnth in list(range(12)) * nyrs:
+        grow_flag = 4 <= imnth <= 8
+        mngmnt['crop_name'].append('Maize' if grow_flag else None)
+        mngmnt['crop_curr'].append('Maize')
+        mngmnt['pi_prop'].append(0.2 if grow_flag else 0.0)
+        mngmnt['pi_tonne'].append(0.4 if grow_flag else 0.0)
+        mngmnt['fert_n'].append({'fert_n': 40.0, 'fert_type': 'Urea'} if imnth == 4 else None)
+        mngmnt['org_fert'].append({'ow_type': 'Fresh waste', 'amount': 2.0} if imnth == 2 else None)
+        mngmnt['irrig'].append(20.0 if irrig_flag and imnth in (5, 6) else 0.0)
+
+    return mngmnt
+
+def _pettmp(rand, nmnths):
+    return {'precip': [rand.uniform(0, 150) for imnth in range(nmnths)],
+            'tair': [rand.uniform(5, 28) for imnth in range(nmnths)],
+            'pet': [rand.uniform(20, 140) for imnth in range(nmnths)],
+            'grow_dds': [rand.uniform(100, 800) for imnth in range(nmnths)]}
+
+def _scalar_forward_run(parameters, weather, crop_mngmnt, soil_vars, steady_state, mngmnt_ss, crop_model):
+    c_change_ss, n_change_ss, soil_water_ss = steady_state
+    mngmnt_fwd = MngmntSubarea(crop_mngmnt, weather, mngmnt_ss)
+    c_change, n_change, soil_water = c_change_ss.fork(), n_change_ss.fork(), soil_water_ss.fork()
+
+    continuity = EnsureContinuity()
+    continuity.adjust_soil_water(soil_water)
+    run_rothc(parameters, weather.pettmp_fwd, mngmnt_fwd, c_change, soil_vars, soil_water, continuity, crop_model,
+                                                                                                            'Zaks')
+    continuity.adjust_soil_water(soil_water)
+    continuity.adjust_soil_n_change(n_change)
+    soil_nitrogen(c_change, soil_water, parameters, weather.pettmp_fwd, mngmnt_fwd, soil_vars, n_change, continuity)
+
+    return summarise_fwd_run((c_change, n_change, soil_water), mngmnt_fwd)
+
+def test_vector_forward_run_matches_scalar_model():
+    rand = random.Random(1)
+    parameters = _parameters()
+    soil_vars = SimpleNamespace(t_bulk=1.3, t_clay=25.0, t_silt=30.0, t_depth=30.0, t_pH_h2o=6.5, t_salinity=0.0,
+                                                                                                tot_soc_meas=50.0)
+    weather = SimpleNamespace(pettmp_ss=_pettmp(rand, NYRS_SS * 12), pettmp_fwd=_pettmp(rand, NYRS_FWD * 12))
+
+    # steady state
+    # ============
+    mngmnt_ss = MngmntSubarea(_crop_mngmnt(NYRS_SS, False), weather)
+    continuity = EnsureContinuity(soil_vars.tot_soc_meas)
+    c_change, soil_water, n_change = CarbonChange(), SoilWaterChange(), NitrogenChange()
+    run_rothc(parameters, weather.pettmp_ss, mngmnt_ss, c_change, soil_vars, soil_water, continuity)
+    continuity.adjust_soil_water(soil_water)
+    soil_nitrogen(c_change, soil_water, parameters, weather.pettmp_ss, mngmnt_ss, soil_vars, n_change, continuity)
+    for tstep in range(mngmnt_ss.ntsteps):
+        add_npp_zaks_by_month(mngmnt_ss, weather.pettmp_ss, soil_water, tstep)
+    crop_model = SimpleNamespace(data={'npp_zaks': mngmnt_ss.npp_zaks})
+
+    # every dose of the grid in one pass then each dose by the scalar model
+    # ======================================================================
+    crop_mngmnt_fwd = _crop_mngmnt(NYRS_FWD, True)
+    dose_grid = DoseGrid(ow_amnts=[0.0, 3.0], mnths_appl=['Mar', 'Jun'], ow_types=['Compost'],
+                                                                fert_n_scales=[0.5, 1.5], irrig_scales=[0.0, 1.0])
+    mngmnt_fwd = MngmntSubarea(crop_mngmnt_fwd, weather, mngmnt_ss)
+    dose_rspns = vector_forward_run(parameters, weather, mngmnt_fwd, soil_vars, c_change, n_change, soil_water,
+                                                                                            crop_model, dose_grid)
+    assert dose_rspns['soc_chng'].shape == dose_grid.shape
+
+    for idose, (owex_amnt, mnth_appl, ow_type, fert_n_scale, irrig_scale) in enumerate(dose_grid.doses):
+        crop_mngmnt = dict(crop_mngmnt_fwd)
+        crop_mngmnt['org_fert'] = amend_org_fert(crop_mngmnt_fwd['org_fert'], mnth_appl, ow_type, owex_amnt)
+        crop_mngmnt['fert_n'] = [None if fert is None else {'fert_n': fert['fert_n'] * fert_n_scale,
+                                            'fert_type': fert['fert_type']} for fert in crop_mngmnt_fwd['fert_n']]
+        crop_mngmnt['irrig'] = [irrig * irrig_scale for irrig in crop_mngmnt_fwd['irrig']]
+
+        summary = _scalar_forward_run(parameters, weather, crop_mngmnt, soil_vars, (c_change, n_change, soil_water),
+                                                                                            mngmnt_ss, crop_model)
+        for metric in dose_rspns:
+            assert float(dose_rspns[metric].flat[idose]) == pytest.approx(summary[metric], rel=1e-9, abs=1e-12), \
+                                                                            '{} dose {}'.format(metric, idose)
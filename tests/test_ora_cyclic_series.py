@@ -0,0 +1,68 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_cyclic_series.py
+# Purpose:     check that a cyclic series behaves as the list it replaces
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import pytest
+
+from ora_cyclic_series import CyclicSeries, cyclic_weather, source_years
+
+SOURCE = list(range(10))
+NVALS = 25
+
+def _expected(nvals, offset=0):
+    return [SOURCE[(offset + indx) % len(SOURCE)] for indx in range(nvals)]
+
+@pytest.mark.parametrize('offset', [0, 3, 13, -2])
+def test_matches_list(offset):
+    series = CyclicSeries(SOURCE, NVALS, offset)
+    expected = _expected(NVALS, offset)
+
+    assert len(series) == NVALS
+    assert list(series) == expected
+    assert [series[indx] for indx in range(-NVALS, NVALS)] == expected + expected
+
+def test_index_out_of_range():
+    series = CyclicSeries(SOURCE, NVALS)
+    for indx in (NVALS, -NVALS - 1):
+        with pytest.raises(IndexError):
+            series[indx]
+
+@pytest.mark.parametrize('slc', [slice(None), slice(5, 17), slice(-7, None), slice(None, None, -3), slice(30, 40),
+                                                                                                    slice(2, 20, 4)])
+def test_slices(slc):
+    assert CyclicSeries(SOURCE, NVALS, 4)[slc] == _expected(NVALS, 4)[slc]
+
+def test_concatenation():
+    series = CyclicSeries(SOURCE, 12, 5)
+    assert [-1] + series == [-1] + _expected(12, 5)
+    assert series + [-1] == _expected(12, 5) + [-1]
+    assert series + series == _expected(12, 5) * 2
+
+def test_nested_views_share_source():
+    inner = CyclicSeries(SOURCE, NVALS, 3)
+    outer = CyclicSeries(inner, 40, 4)
+
+    assert outer.source is SOURCE
+    assert list(outer) == _expected(40, 7)
+
+def test_empty_source():
+    assert list(CyclicSeries([], 0)) == []
+    with pytest.raises(ValueError):
+        CyclicSeries([], 1)
+
+def test_source_years():
+    years = list(range(24))
+    assert source_years(CyclicSeries(years, 60, 12)) is years
+    assert source_years(CyclicSeries(years, 60, 6)) is None
+    assert source_years(CyclicSeries(SOURCE, 60)) is None
+    assert source_years(years) is None
+
+def test_cyclic_weather():
+    pettmp = {'precip': SOURCE, 'tair': [-val for val in SOURCE]}
+    weather = cyclic_weather(pettmp, NVALS, 2)
+
+    assert list(weather['precip']) == _expected(NVALS, 2)
+    assert list(weather['tair']) == [-val for val in _expected(NVALS, 2)]
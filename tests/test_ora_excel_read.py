@@ -0,0 +1,24 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_excel_read.py
+# Purpose:     check that management scenario sheets are assigned to the subarea to which they belong
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import pytest
+
+pytest.importorskip('thornthwaite')
+
+from ora_excel_read import mngmnt_scnr_sheets
+
+SHEET_NAMES = ['Signature', 'Farm location', 'Weather', 'Subareas', 'Livestock', 'A', 'A_1', 'A_1_wet', 'A_dry']
+
+def test_scenario_of_longer_subarea_is_not_taken_by_shorter():
+    sbas = ['A', 'A_1']
+
+    assert mngmnt_scnr_sheets(SHEET_NAMES, 'A', sbas) == {'dry': 'A_dry'}
+    assert mngmnt_scnr_sheets(SHEET_NAMES, 'A_1', sbas) == {'wet': 'A_1_wet'}
+
+def test_scenario_sheets_when_only_one_subarea():
+    assert mngmnt_scnr_sheets(SHEET_NAMES, 'A', ['A']) == {'1': 'A_1', '1_wet': 'A_1_wet', 'dry': 'A_dry'}
+    assert mngmnt_scnr_sheets(SHEET_NAMES, 'B', ['A', 'B']) == {}
@@ -0,0 +1,89 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_job_queue.py
+# Purpose:     check the slot limit of the job queue and the cancelling of queued and running jobs
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import sys
+from os.path import isfile, join
+from time import sleep, time
+
+import pytest
+
+import ora_job_queue
+from ora_job_queue import JobQueue
+
+SLEEP_CMD = [sys.executable, '-c', 'import time; time.sleep(30)']
+WAIT_SECS = 10
+
+def _wait_for(job_queue, job, status):
+    t_strt = time()
+    while job.status != status and time() - t_strt < WAIT_SECS:
+        job_queue.poll()
+        sleep(0.05)
+
+    return job.status == status
+
+@pytest.fixture
+def job_queue():
+    job_queue = JobQueue(max_running=2)
+    yield job_queue
+
+    for job in job_queue.jobs:
+        if job.proc is not None and job.proc.poll() is None:
+            job.proc.kill()
+            job.proc.wait()
+
+def test_finished_jobs_free_their_slots(job_queue):
+    passes = job_queue.submit([sys.executable, '-c', 'pass'], 'farm1')
+    fails = job_queue.submit([sys.executable, '-c', 'raise SystemExit(2)'], 'farm2')
+    waits = job_queue.submit([sys.executable, '-c', 'pass'], 'farm3')
+    assert [job.status for job in job_queue.jobs] == ['running', 'running', 'queued']
+    assert job_queue.nqueued() == 1
+
+    assert _wait_for(job_queue, passes, 'done')
+    assert _wait_for(job_queue, fails, 'failed') and fails.retcode == 2
+    assert _wait_for(job_queue, waits, 'done')
+    assert job_queue.cancel(passes.job_id) is False
+    assert job_queue.cancel(999) is False
+
+def test_cancel_queued_job(job_queue):
+    jobs = [job_queue.submit(SLEEP_CMD, 'farm{}'.format(ijob)) for ijob in range(3)]
+
+    assert job_queue.cancel(jobs[2].job_id)
+    assert jobs[2].status == 'cancelled' and jobs[2].proc is None
+    assert job_queue.nqueued() == 0
+    assert job_queue.cancel(jobs[2].job_id) is False
+
+def test_cancel_running_job_keeps_slot_until_reaped(job_queue):
+    jobs = [job_queue.submit(SLEEP_CMD, 'farm{}'.format(ijob)) for ijob in range(3)]
+
+    t_strt = time()
+    assert job_queue.cancel(jobs[0].job_id)
+    assert time() - t_strt < 1.0
+    assert jobs[0].status in ('cancelling', 'cancelled')
+    assert job_queue.cancel(jobs[0].job_id) is False
+
+    assert _wait_for(job_queue, jobs[0], 'cancelled')
+    assert jobs[0].retcode != 0 and not jobs[0].killed
+    assert jobs[2].status == 'running'
+    assert jobs[1].status == 'running'
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='terminate and kill are the same on Windows')
+def test_cancelled_job_which_ignores_terminate_is_killed(job_queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(ora_job_queue, 'TERMINATE_WAIT', 0.5)
+    ready_fn = join(str(tmp_path), 'ready')
+    stubborn_cmd = [sys.executable, '-c', 'import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); '
+                                          'open({!r}, "w").close(); time.sleep(30)'.format(ready_fn)]
+    job = job_queue.submit(stubborn_cmd, 'farm1')
+    t_strt = time()
+    while not isfile(ready_fn) and time() - t_strt < WAIT_SECS:
+        sleep(0.05)
+
+    job_queue.cancel(job.job_id)
+    job_queue.poll()
+    assert job.status == 'cancelling' and not job.killed
+
+    assert _wait_for(job_queue, job, 'cancelled')
+    assert job.killed and job.retcode != 0
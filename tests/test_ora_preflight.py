@@ -0,0 +1,129 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_preflight.py
+# Purpose:     check the findings of the preflight validation of run files and the farms it passes
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from csv import reader as csv_reader
+from os import mkdir
+from os.path import join
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('thornthwaite')
+
+from openpyxl import Workbook, load_workbook
+
+from ora_preflight import preflight, validate_run_file, parameter_names, FNAME_RUN
+
+ORA_PARMS = SimpleNamespace(crop_vars={'Maize': {'t_grow': 4}}, ow_parms={'Cattle manure': {}},
+                                                                                    syn_fert_parms={'Urea': {}})
+NMNTHS = 24
+
+def _add_mngmnt_sheet(wb_obj, shtnm, nmnths_ss=NMNTHS, nmnths_fwd=NMNTHS):
+    sheet = wb_obj.create_sheet(shtnm)
+    sheet.append(['period', 'year', 'month', 'crop', 'yld', 'fert_type', 'fert_n', 'ow_type', 'ow_amnt', 'irrig'])
+    for period, nmnths in (('steady state', nmnths_ss), ('forward run', nmnths_fwd)):
+        for imnth in range(nmnths):
+            crop = 'Maize' if imnth % 12 < 4 else None
+            sheet.append([period, 2000 + imnth // 12, imnth % 12 + 1, crop, 1, 'Urea', 0, 'Cattle manure', 0, 0])
+
+def _write_run_file(run_dir, sbas=(('A', NMNTHS, NMNTHS),), wthr_mnths=(NMNTHS, NMNTHS), scnr_shts=(),
+                                                                                                    no_sheet=()):
+    """
+    farm with subareas of given steady state and forward run months, weather of given months and optional
+    scenario sheets; subareas in no_sheet are listed without a management sheet
+    """
+    wb_obj = Workbook()
+    wb_obj.active.title = 'Signature'
+    wb_obj.create_sheet('Farm location')
+    wb_obj.create_sheet('Livestock')
+
+    wthr_sht = wb_obj.create_sheet('Weather')
+    wthr_sht.append(['period', 'year', 'month', 'precip', 'tair'])
+    for period, nmnths in zip(('steady state', 'forward run'), wthr_mnths):
+        for imnth in range(nmnths):
+            wthr_sht.append([period, 2000 + imnth // 12, imnth % 12 + 1, 50.0, 20.0])
+
+    sbas_sht = wb_obj.create_sheet('Subareas')
+    sbas_sht.append(['subarea', 'description', None, None, 'area'] + ['soil'] * 7)
+    for sba, nmnths_ss, nmnths_fwd in sbas:
+        sbas_sht.append([sba, 'field ' + sba, None, None, 1.0] + [1.0] * 7)
+        if sba not in no_sheet:
+            _add_mngmnt_sheet(wb_obj, sba, nmnths_ss, nmnths_fwd)
+
+    for shtnm, nmnths_fwd in scnr_shts:
+        _add_mngmnt_sheet(wb_obj, shtnm, NMNTHS, nmnths_fwd)
+
+    mkdir(run_dir)
+    wb_obj.save(join(run_dir, FNAME_RUN))
+
+    return run_dir
+
+def _issues(run_dir):
+    return sorted(validate_run_file(run_dir, parameter_names(ORA_PARMS)).issues)
+
+def test_valid_farm_has_no_findings(tmp_path):
+    assert _issues(_write_run_file(join(str(tmp_path), 'ok'))) == []
+
+def test_missing_subarea_sheet(tmp_path):
+    run_dir = _write_run_file(join(str(tmp_path), 'farm'), sbas=(('A', NMNTHS, NMNTHS), ('B', NMNTHS, NMNTHS)),
+                                                                                                    no_sheet=('B',))
+    assert _issues(run_dir) == [('warning', 'Subareas', 'management sheet B not in run file')]
+
+    run_dir = _write_run_file(join(str(tmp_path), 'none'), no_sheet=('A',))
+    assert _issues(run_dir) == [('error', 'Subareas', 'no usable subareas with a description'),
+                                ('warning', 'Subareas', 'management sheet A not in run file')]
+
+def test_mismatched_forward_run_months_are_warnings(tmp_path):
+    run_dir = _write_run_file(join(str(tmp_path), 'farm'), wthr_mnths=(NMNTHS, 12), scnr_shts=(('A_wet', 36),))
+    assert _issues(run_dir) == [
+        ('warning', 'A_wet', 'will be discarded - has 36 forward run months, subarea A has 24'),
+        ('warning', 'Weather', 'forward run weather of 12 months will be stretched to 24 months')]
+
+def test_weather_too_short_for_every_subarea(tmp_path):
+    run_dir = _write_run_file(join(str(tmp_path), 'all'), sbas=(('A', 36, NMNTHS), ('B', 48, NMNTHS)))
+    assert _issues(run_dir) == [
+        ('error', 'Weather', 'too few weather months for every subarea'),
+        ('warning', 'A', 'subarea will be skipped - steady state management of 36 months exceeds weather of 24 '
+                                                                                                        'months'),
+        ('warning', 'B', 'subarea will be skipped - steady state management of 48 months exceeds weather of 24 '
+                                                                                                        'months'),
+        ('warning', 'Subareas', 'subarea sheets have inconsistent number of months: A 36+24, B 48+24')]
+
+    # one subarea remains so the farm can run
+    # =======================================
+    run_dir = _write_run_file(join(str(tmp_path), 'one'), sbas=(('A', NMNTHS, NMNTHS), ('B', 48, NMNTHS)))
+    assert [issue[0] for issue in _issues(run_dir)] == ['warning', 'warning']
+
+def test_blank_weather_row(tmp_path):
+    run_dir = _write_run_file(join(str(tmp_path), 'farm'))
+    run_xls_fn = join(run_dir, FNAME_RUN)
+    wb_obj = load_workbook(run_xls_fn)
+    wb_obj['Weather'].insert_rows(5)
+    wb_obj.save(run_xls_fn)
+
+    assert _issues(run_dir) == [('error', 'Weather', 'blank line 5')]
+
+def test_report_rows_and_farms_without_errors(tmp_path):
+    root_dir = str(tmp_path)
+    ok_dir = _write_run_file(join(root_dir, 'ok'))
+    warn_dir = _write_run_file(join(root_dir, 'warn'), wthr_mnths=(NMNTHS, 12))
+    short_dir = _write_run_file(join(root_dir, 'short'), sbas=(('A', 36, NMNTHS),))
+    missing_dir = join(root_dir, 'missing')
+    report_fn = join(root_dir, 'report.csv')
+
+    valid_dirs = preflight([ok_dir, warn_dir, short_dir, missing_dir], ORA_PARMS, report_fn, 2)
+    assert valid_dirs == [ok_dir, warn_dir]
+
+    with open(report_fn, newline='') as freport:
+        rows = list(csv_reader(freport))
+    assert rows == [
+        ['run_dir', 'severity', 'sheet', 'message'],
+        [warn_dir, 'warning', 'Weather', 'forward run weather of 12 months will be stretched to 24 months'],
+        [short_dir, 'error', 'Weather', 'too few weather months for every subarea'],
+        [short_dir, 'warning', 'A', 'subarea will be skipped - steady state management of 36 months exceeds '
+                                                                                        'weather of 24 months'],
+        [missing_dir, 'error', '', 'run file ' + FNAME_RUN + ' does not exist']]
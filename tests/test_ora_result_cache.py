@@ -0,0 +1,107 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_result_cache.py
+# Purpose:     check subarea fingerprints and that cached results are reused only while inputs and outputs persist
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os import remove
+from os.path import join
+from copy import deepcopy
+from types import SimpleNamespace
+
+from ora_result_cache import ResultCache, subarea_fingerprint, subarea_results, assign_subarea
+
+NMNTHS = 24
+
+def _mngmnt(crop):
+    return {'crop_name': [crop] * NMNTHS, 'org_fert': [None] * (NMNTHS - 1) + [{'ow_type': 'Compost', 'amount': 1}]}
+
+def _inputs():
+    ora_parms = SimpleNamespace(crop_vars={'Maize': {'t_grow': 4}, 'Bean': {'t_grow': 3}},
+                                ow_parms={'Compost': {'c_n_rat': 12.0}}, syn_fert_parms={}, n_parms={'r_dry': 2})
+    ora_weather = SimpleNamespace(pettmp_ss={'precip': [1.0] * NMNTHS}, pettmp_fwd={'precip': [2.0] * NMNTHS},
+                                                                                                    latitude=10.0)
+    ora_subarea = SimpleNamespace(soil_for_area=SimpleNamespace(t_clay=20.0), area_ha=1.0,
+                                  crop_mngmnt_ss=_mngmnt('Maize'), crop_mngmnt_fwd=_mngmnt('Maize'),
+                                  crop_mngmnt_fwd_scnrs={}, ntsteps_ss=NMNTHS, ntsteps_fwd=NMNTHS)
+    return ora_parms, ora_weather, ora_subarea
+
+def _farm_rslts(sbas, scnrs=()):
+    farm_rslts = {key: {sba: key + ' ' + sba for sba in sbas}
+                  for key in ('all_runs', 'scnr_summaries', 'crop_models', 'mngmnts_ss', 'mngmnts_fwd')}
+    farm_rslts['crop_models'] = {sba: SimpleNamespace(area_ha=1.0) for sba in sbas}
+    farm_rslts['all_runs_scnrs'] = {scnr: {sba: scnr + ' ' + sba for sba in sbas} for scnr in scnrs}
+    farm_rslts['scnr_outputs'] = [(sba, scnr, None, None, None) for sba in sbas for scnr in scnrs]
+
+    return farm_rslts
+
+def test_fingerprint_changes_only_with_inputs():
+    ora_parms, ora_weather, ora_subarea = _inputs()
+    fingerprint = subarea_fingerprint(ora_parms, ora_weather, ora_subarea)
+
+    # parameters of unused crops, dictionary order and integer versus float values do not matter
+    ora_parms.crop_vars['Bean']['t_grow'] = 5
+    ora_parms.n_parms = {'r_dry': 2.0}
+    ora_weather.latitude = 10
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea) == fingerprint
+
+    changed = deepcopy(ora_subarea)
+    changed.crop_mngmnt_fwd = _mngmnt('Bean')
+    assert subarea_fingerprint(ora_parms, ora_weather, changed) != fingerprint
+
+    ora_parms.ow_parms['Compost']['c_n_rat'] = 13.0
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea) != fingerprint
+
+    ora_parms, ora_weather, ora_subarea = _inputs()
+    ora_weather.pettmp_fwd['precip'][0] = 3.0
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea) != fingerprint
+
+    ora_parms, ora_weather, ora_subarea = _inputs()
+    ora_subarea.area_ha = 2.0
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea) != fingerprint
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea, area_flag=False) == \
+                                    subarea_fingerprint(*_inputs(), area_flag=False)
+
+def test_store_and_load(tmp_path):
+    out_dir = str(tmp_path)
+    fingerprints = {'A': 'fa', 'B': 'fb'}
+    ResultCache(out_dir, 'Farm').store(_farm_rslts(['A', 'B']), fingerprints)
+
+    cached_rslts = ResultCache(out_dir, 'Farm').load({'A': 'fa', 'B': 'changed', 'C': 'fc'})
+    assert list(cached_rslts) == ['A']
+    assert cached_rslts['A']['all_runs'] == {'A': 'all_runs A'}
+
+def test_assign_subarea():
+    sba_rslts = subarea_results(_farm_rslts(['A', 'B'], ['wet']), 'A')
+    farm_rslts = assign_subarea(sba_rslts, 'X', 3.0)
+
+    assert farm_rslts['all_runs'] == {'X': 'all_runs A'}
+    assert farm_rslts['all_runs_scnrs'] == {'wet': {'X': 'wet A'}}
+    assert [scnr_output[:2] for scnr_output in farm_rslts['scnr_outputs']] == [('X', 'wet')]
+    assert farm_rslts['crop_models']['X'].area_ha == 3.0
+
+def test_missing_outputs_are_detected(tmp_path):
+    out_dir = str(tmp_path)
+    ResultCache(out_dir, 'Farm').store(_farm_rslts(['A'], ['wet', 'dry']), {'A': 'fa'})
+    outfiles = ['Farm A.xlsx', 'Farm A wet.xlsx', 'Farm A dry.xlsx']
+    for fname in outfiles:
+        open(join(out_dir, fname), 'w').close()
+
+    result_cache = ResultCache(out_dir, 'Farm')
+    result_cache.load({'A': 'fa'})
+    assert not result_cache.outputs_missing('A')
+
+    remove(join(out_dir, 'Farm A wet.xlsx'))
+    assert result_cache.outputs_missing('A')
+
+def test_fingerprint_includes_farm_forward_run_months():
+    ora_parms, ora_weather, ora_subarea = _inputs()
+    fwd_wthr_scnrs = {'wet': {'precip': [3.0] * NMNTHS, 'tair': [20.0] * NMNTHS}}
+
+    # alternative forward run weather is stretched to the longest forward run of the farm
+    fingerprint = subarea_fingerprint(ora_parms, ora_weather, ora_subarea, fwd_wthr_scnrs, ntsteps_fwd=NMNTHS)
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea, fwd_wthr_scnrs, ntsteps_fwd=2 * NMNTHS) != \
+                                                                                                        fingerprint
+    assert subarea_fingerprint(ora_parms, ora_weather, ora_subarea, ntsteps_fwd=NMNTHS) == \
+                                                        subarea_fingerprint(ora_parms, ora_weather, ora_subarea)
@@ -0,0 +1,68 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_shared_results.py
+# Purpose:     check that results returned through a mapped file are rebuilt as they were packed
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os.path import isfile
+
+from ora_shared_results import (pack_results, map_results, load_results, unpack_results, mapped_mb,
+                                                                                complete_run_objects, MIN_VALUES)
+from ora_segmented_list import SegmentedList
+
+NVALS = 3 * MIN_VALUES
+
+class _Change(object, ):
+    """
+    stands in for the carbon, nitrogen and soil water objects of a complete run
+    """
+    def __init__(self, scale):
+        self.data = {'soc': [scale * indx for indx in range(NVALS)], 'short': [scale] * (MIN_VALUES - 1),
+                     'crop_name': ['Maize'] * NVALS, 'mixed': [1.0] * (NVALS - 1) + [None]}
+        self.data['alias'] = self.data['soc']
+
+def _complete_run():
+    return _Change(1.0), _Change(2.0), _Change(0.5)
+
+def test_round_trip():
+    complete_run = _complete_run()
+    packed = pack_results({'sba': complete_run}, complete_run)
+    assert packed[1] is not None
+
+    mapped = map_results(packed)
+    assert not isfile(packed[1])        # removed once mapped
+    assert mapped_mb(mapped) >= 3 * 2 * NVALS * 8 / 1024 ** 2
+
+    rebuilt = load_results(mapped)['sba']
+    for orig, obj in zip(complete_run, rebuilt):
+        assert type(obj.data['soc']) is SegmentedList
+        assert list(obj.data['soc']) == orig.data['soc']
+        assert obj.data['alias'] is obj.data['soc']
+        for key in ('short', 'crop_name', 'mixed'):
+            assert type(obj.data[key]) is list
+            assert obj.data[key] == orig.data[key]
+
+def test_loads_are_independent():
+    complete_run = _complete_run()
+    mapped = map_results(pack_results(complete_run, complete_run))
+    first, second = load_results(mapped), load_results(mapped)
+
+    first[0].data['soc'].append(-1.0)
+    assert len(first[0].data['soc']) == NVALS + 1
+    assert first[0].data['soc'][-1] == -1.0
+    assert len(second[0].data['soc']) == NVALS
+    assert first[0].data['soc'] is not second[0].data['soc']
+
+def test_without_long_lists():
+    change = _Change(1.0)
+    change.data = {'short': [1.0] * 3}
+    packed = pack_results(change, [change])
+
+    assert packed[1] is None
+    assert unpack_results(packed).data == {'short': [1.0] * 3}
+
+def test_complete_run_objects():
+    complete_run = _complete_run()
+    assert complete_run_objects([None, complete_run, None]) == list(complete_run)
+    assert complete_run_objects([]) == []
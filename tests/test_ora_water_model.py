@@ -0,0 +1,62 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_water_model.py
+# Purpose:     check the vectorised Thornthwaite PET against thornthwaite applied to each year
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import random
+
+import pytest
+
+thornthwaite = pytest.importorskip('thornthwaite').thornthwaite
+
+from numpy import array, float64
+
+from ora_water_model import thornthwaite_pet, add_pet_to_weather, _thornthwaite_factors
+from ora_cyclic_series import CyclicSeries
+
+NYEARS = 40
+FIRST_YEAR = 1998       # spans leap and common years
+
+def _tair(seed):
+    """
+    years of random monthly temperatures including a year with no month above zero
+    """
+    random.seed(seed)
+    tair = [[random.uniform(-8.0, 32.0) for imnth in range(12)] for year in range(NYEARS)]
+    tair[3] = [-1.0] * 12
+
+    return array(tair, dtype=float64)
+
+def _pet_by_year(latitude, tair, years):
+    return [thornthwaite(tmean.tolist(), latitude, year) if tmean.max() > 0.0 else [0.0] * 12
+                                                                                for tmean, year in zip(tair, years)]
+
+@pytest.mark.parametrize('latitude', [51.5, -12.3, 0.0, 66.0])
+def test_pet_matches_thornthwaite(latitude):
+    tair = _tair(int(latitude))
+    years = list(range(FIRST_YEAR, FIRST_YEAR + NYEARS))
+
+    pet = thornthwaite_pet(latitude, tair, years)
+    for pet_year, pet_expctd in zip(pet.tolist(), _pet_by_year(latitude, tair, years)):
+        assert pet_year == pytest.approx(pet_expctd, rel=1e-9, abs=1e-9)
+
+def test_factors_reproduce_thornthwaite():
+    """
+    otherwise thornthwaite_pet falls back to calling thornthwaite for each year
+    """
+    for leap_flag in (False, True):
+        assert _thornthwaite_factors(51.5, leap_flag) is not None
+
+def test_stretched_weather_matches_materialised():
+    latitude = 52.0
+    tair_src = _tair(2)[:4].flatten().tolist()     # four years so that the leap years of the two coincide
+    precip_src = [random.uniform(0.0, 150.0) for imnth in range(len(tair_src))]
+    nmnths = 12 * 23
+    stretched = {'precip': CyclicSeries(precip_src, nmnths), 'tair': CyclicSeries(tair_src, nmnths)}
+    materialised = {metric: list(series) for metric, series in stretched.items()}
+
+    pet = add_pet_to_weather(latitude, stretched)['pet']
+    pet_expctd = add_pet_to_weather(latitude, materialised)['pet']
+    assert list(pet) == pytest.approx(list(pet_expctd), rel=1e-9, abs=1e-9)
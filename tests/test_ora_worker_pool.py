@@ -0,0 +1,133 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_worker_pool.py
+# Purpose:     check that the supervised pool times out, requeues and recycles its workers
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from os import getpid, _exit
+from time import sleep, time
+from types import SimpleNamespace
+
+import pytest
+
+from ora_worker_pool import SupervisedPool, WorkerTimeout, WorkerDied, WorkerMemoryExceeded, rss_mb, _Task, \
+                                                                                                    MEM_HISTORY
+
+def _slow(secs):
+    sleep(secs)
+    return secs
+
+def _fail():
+    raise ValueError('bad input')
+
+def _pid():
+    return getpid()
+
+def _die():
+    _exit(3)
+
+def _interval(secs):
+    t_start = time()
+    sleep(secs)
+    return t_start, time()
+
+def _hog(nmb):
+    block = bytearray(nmb * 2**20)
+    for indx in range(0, len(block), 4096):
+        block[indx] = 1
+    sleep(2)
+    return len(block)
+
+def test_results_and_exceptions():
+    with SupervisedPool(2) as pool:
+        futures = [pool.submit(_slow, 0.1 * indx) for indx in range(4)]
+        failed = pool.submit(_fail)
+
+        assert [future.result() for future in futures] == [0.1 * indx for indx in range(4)]
+        with pytest.raises(ValueError, match='bad input'):
+            failed.result()
+
+def test_timeout_fails_task_and_pool_continues():
+    with SupervisedPool(1, timeout=0.5) as pool:
+        stuck = pool.submit(_slow, 30)
+        after = pool.submit(_slow, 0.1)
+
+        with pytest.raises(WorkerTimeout):
+            stuck.result(timeout=10)
+        assert after.result(timeout=10) == 0.1
+    assert pool.events['timed out'] == 1
+
+def test_dead_worker_is_requeued_then_fails():
+    with SupervisedPool(1, max_requeues=1) as pool:
+        died = pool.submit(_die)
+        with pytest.raises(WorkerDied):
+            died.result(timeout=10)
+        assert pool.submit(_slow, 0).result(timeout=10) == 0
+    assert pool.events['died'] == 2
+    assert pool.events['requeued'] == 1
+
+def test_workers_are_recycled():
+    with SupervisedPool(1, max_tasks_per_worker=2) as pool:
+        pids = [pool.submit(_pid).result(timeout=10) for itask in range(6)]
+    assert len(set(pids)) == 3
+    assert pids[0] == pids[1] and pids[1] != pids[2]
+    assert pool.events['recycled'] == 3
+
+def test_memory_cap_kills_worker():
+    if rss_mb(getpid()) is None:
+        pytest.skip('memory of workers cannot be measured on this platform')
+
+    with SupervisedPool(1, max_rss_mb=rss_mb(getpid()) + 100, max_requeues=1) as pool:
+        hog = pool.submit(_hog, 300)
+        with pytest.raises(WorkerMemoryExceeded):
+            hog.result(timeout=30)
+    assert pool.events['memory exceeded'] == 2
+
+def test_tasks_exceeding_memory_budget_run_in_turn():
+    with SupervisedPool(2, memory_budget_mb=1000) as pool:
+        first = pool.submit_estimated(600, _interval, 1.0)
+        second = pool.submit_estimated(600, _interval, 0.1)
+
+        (t_start1, t_end1), (t_start2, t_end2) = first.result(timeout=20), second.result(timeout=20)
+    assert t_start2 >= t_end1
+    assert pool.events['deferred for memory'] == 1
+
+def test_task_above_budget_is_admitted_when_no_other_is_running():
+    with SupervisedPool(2, memory_budget_mb=100) as pool:
+        assert pool.submit_estimated(5000, _slow, 0.1).result(timeout=20) == 0.1
+    assert pool.events['deferred for memory'] == 0
+
+def test_estimates_are_scaled_by_measured_peaks():
+    pool = SupervisedPool(2, memory_budget_mb=1000)
+    pool.shutdown()
+
+    # largest ratio of measured peak to estimate of recent tasks
+    # ==========================================================
+    for peak_rss in (100, 300, 200):
+        pool._learn_memory(SimpleNamespace(peak_rss=peak_rss), _Task(_slow, (0,), 100))
+    assert pool.mem_scale == 3.0
+    pool._learn_memory(SimpleNamespace(peak_rss=None), _Task(_slow, (0,), 100))
+    pool._learn_memory(SimpleNamespace(peak_rss=500), _Task(_slow, (0,)))
+    assert pool.mem_scale == 3.0
+
+    for itask in range(MEM_HISTORY):
+        pool._learn_memory(SimpleNamespace(peak_rss=50), _Task(_slow, (0,), 100))
+    assert pool.mem_scale == 0.5
+
+    # a busy worker commits its scaled estimate, or its memory if larger, against the budget
+    # ======================================================================================
+    busy = SimpleNamespace(rss=10, task=_Task(_slow, (0,), 800))
+    pool.workers = [busy]
+    task = _Task(_slow, (0,), 1000)
+    assert pool._admit(task, None)
+
+    pool.mem_scale = 1.0
+    assert not pool._admit(task, None)
+    assert not pool._admit(task, None)
+    assert pool.events['deferred for memory'] == 1
+
+    busy.rss = 1500
+    pool.mem_scale = 0.1
+    assert not pool._admit(task, None)
+    assert pool._admit(task, busy)
@@ -0,0 +1,90 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_worker_service.py
+# Purpose:     check requests to the simulation service: ping, submission of farms and shutdown
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+from threading import Thread
+from time import sleep
+
+import pytest
+
+pytest.importorskip('set_up_logging')
+pytest.importorskip('thornthwaite')
+
+import initialise_pyorator_batch
+import run_batch_pyora
+from ora_worker_service import WorkerService, submit_runs, ping_service, shutdown_service
+
+def _initiation(form, headless=True):
+    form.settings = {'max_workers': None}
+
+def _run_farm(form, run_dir, fwd_wthr_scnrs=None, optim_args=None):
+    """
+    in a warm worker; forward runs must not be fanned out by the workers of the service
+    """
+    if form.settings['max_workers'] != 1:
+        return -1
+    if run_dir == 'raises':
+        raise ValueError('unreadable run file')
+
+    return -1 if run_dir == 'fails' else 0
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('PYORATOR_SERVICE_KEY', 'test key')
+    monkeypatch.setattr(initialise_pyorator_batch, 'initiation', _initiation)
+    monkeypatch.setattr(run_batch_pyora, 'run_farm', _run_farm)
+
+    wrkr_service = WorkerService(port=0, nworkers=2)
+    server = Thread(target=wrkr_service.serve, daemon=True)
+    server.start()
+    for iwait in range(100):
+        if wrkr_service.active:
+            break
+        sleep(0.05)
+
+    yield wrkr_service
+
+    if wrkr_service.active:
+        shutdown_service(wrkr_service.address[1])
+    server.join(30)
+    assert not server.is_alive()
+
+def test_ping(service):
+    assert ping_service(service.address[1])
+
+def test_submit(service):
+    msgs = []
+    nfailed = submit_runs(['farm_a', 'raises', 'fails', 'farm_b'], service.address[1], status_fn=msgs.append)
+
+    assert nfailed == 2
+    assert msgs[-1] == {'status': 'finished', 'njobs': 4}
+    final = {msg['run_dir']: msg['status'] for msg in msgs[:-1] if msg['status'] in ('done', 'failed')}
+    assert final == {'farm_a': 'done', 'raises': 'failed', 'fails': 'failed', 'farm_b': 'done'}
+    errors = [msg['mess'] for msg in msgs if msg['status'] == 'failed']
+    assert any('unreadable run file' in mess for mess in errors)
+
+def test_submit_after_pool_shutdown(service):
+    service.pool.shutdown(wait=True)
+    msgs = []
+
+    assert submit_runs(['farm_a', 'farm_b'], service.address[1], status_fn=msgs.append) == 2
+    assert [msg['status'] for msg in msgs] == ['queued', 'failed', 'failed', 'finished']
+
+def test_shutdown(service):
+    shutdown_service(service.address[1])
+    for iwait in range(100):
+        if not service.active:
+            break
+        sleep(0.05)
+
+    assert not service.active
+    assert not ping_service(service.address[1])
+
+def test_wrong_key(service, monkeypatch):
+    with monkeypatch.context() as mpatch:
+        mpatch.setenv('PYORATOR_SERVICE_KEY', 'another key')
+        assert submit_runs(['farm_a'], service.address[1]) is None
+        assert not ping_service(service.address[1])
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ora_wthr_extract.py
+# Purpose:     check mapping of sites to grid cells, reading of cells in blocks and invalidation of the cache
+# Author:      Mike Martin
+# Created:     19/10/2026
+# Licence:     <your licence>
+# -------------------------------------------------------------------------------
+import sys
+from os.path import join
+from types import SimpleNamespace
+
+import pytest
+from numpy import arange, full, nan
+
+import ora_wthr_extract
+from ora_wthr_extract import grid_indices, extract_sites_wthr, site_wthr_scnrs, WthrCache, BLOCK_SIZE, CACHE_DIR
+
+NLATS = 2 * BLOCK_SIZE
+NLONS = 3 * BLOCK_SIZE
+NMNTHS = 24
+SEA_CELL = (1, 1)
+
+class _Dataset(object, ):
+    """
+    stands in for netCDF4.Dataset, values are provided by _read_slab
+    """
+    def __init__(self, nc_fname, mode):
+        self.nc_fname = nc_fname
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def wthr_set(tmp_path, monkeypatch):
+    """
+    grid of half degree cells whose first cell is at latitude 10 and longitude -5; slabs are recorded
+    """
+    monkeypatch.setitem(sys.modules, 'netCDF4', SimpleNamespace(Dataset=_Dataset))
+    slabs = []
+
+    def _read_slab(nc_dset, var_name, lat_var, lon_var, lat_slice, lon_slice):
+        slabs.append((var_name, lat_slice, lon_slice))
+        ilats = arange(lat_slice.start, lat_slice.stop).reshape(1, -1, 1)
+        ilons = arange(lon_slice.start, lon_slice.stop).reshape(1, 1, -1)
+        slab = arange(NMNTHS).reshape(-1, 1, 1) + 1000.0 * ilats + ilons + (0.5 if var_name == 'tas' else 0.0)
+        if lat_slice.start <= SEA_CELL[0] < lat_slice.stop and lon_slice.start <= SEA_CELL[1] < lon_slice.stop:
+            slab[:, SEA_CELL[0] - lat_slice.start, SEA_CELL[1] - lon_slice.start] = nan
+        return slab, ''
+
+    monkeypatch.setattr(ora_wthr_extract, '_read_slab', _read_slab)
+
+    wthr_set = {'lat_frst': 10.0, 'resol_lat': 0.5, 'latitudes': [10.0 + 0.5 * ilat for ilat in range(NLATS)],
+                'lon_frst': -5.0, 'resol_lon': 0.5, 'longitudes': [-5.0 + 0.5 * ilon for ilon in range(NLONS)],
+                'lat_var': 'lat', 'lon_var': 'lon', 'year_start': 2001, 'slabs': slabs}
+    for dset_key, nc_fname in (('ds_precip', 'pr.nc'), ('ds_tas', 'tas.nc')):
+        wthr_set[dset_key] = join(str(tmp_path), nc_fname)
+        with open(wthr_set[dset_key], 'w') as fnc:
+            fnc.write('version 1')
+
+    return wthr_set
+
+def _site(ilat, ilon):
+    return 10.0 + 0.5 * ilat + 0.1, -5.0 + 0.5 * ilon - 0.2
+
+def test_grid_indices(wthr_set):
+    assert grid_indices(wthr_set, 10.0, -5.0) == (0, 0)
+    assert grid_indices(wthr_set, *_site(3, 7)) == (3, 7)
+    assert grid_indices(wthr_set, 10.0 + 0.5 * (NLATS - 1), -5.0 + 0.5 * (NLONS - 1)) == (NLATS - 1, NLONS - 1)
+    assert grid_indices(wthr_set, 9.5, 0.0) is None
+    assert grid_indices(wthr_set, 12.0, -5.0 + 0.5 * NLONS) is None
+
+def test_cells_are_read_in_blocks(wthr_set, tmp_path):
+    cells = [(0, 0), (2, 5), (3, 7), (BLOCK_SIZE + 1, 2), (4, 2 * BLOCK_SIZE + 3)]
+    sites = [_site(*cell) for cell in cells] + [_site(3, 7), (0.0, 0.0)]
+
+    wthr = extract_sites_wthr('CRU_hist', wthr_set, sites, str(tmp_path))
+
+    # three blocks, each read once from each dataset
+    assert len(wthr_set['slabs']) == 2 * 3
+    for ((ilat, ilon), site_wthr) in zip(cells + [(3, 7)], wthr):
+        assert site_wthr['precip'] == [imnth + 1000.0 * ilat + ilon for imnth in range(NMNTHS)]
+        assert site_wthr['tair'][0] == pytest.approx(1000.0 * ilat + ilon + 0.5)
+    assert wthr[-1] is None     # outside the grid
+
+def test_cache_is_used_until_dataset_changes(wthr_set, tmp_path):
+    sites = [_site(2, 5), _site(*SEA_CELL)]
+    first = extract_sites_wthr('CRU_hist', wthr_set, sites, str(tmp_path))
+    assert first[1] is None     # no data e.g. sea
+    nslabs = len(wthr_set['slabs'])
+
+    assert extract_sites_wthr('CRU_hist', wthr_set, sites, str(tmp_path)) == first
+    assert len(wthr_set['slabs']) == nslabs
+
+    with open(wthr_set['ds_tas'], 'w') as fnc:
+        fnc.write('version 2, with more data')
+    wthr_cache = WthrCache(str(tmp_path), 'CRU_hist', wthr_set)
+    assert wthr_cache.load((2, 5)) is None
+
+    assert extract_sites_wthr('CRU_hist', wthr_set, sites, str(tmp_path)) == first
+    assert len(wthr_set['slabs']) == 2 * nslabs
+
+def test_site_wthr_scnrs(wthr_set, tmp_path):
+    form = SimpleNamespace(settings={'wthr_dir': str(tmp_path)}, wthr_sets={'ClimGen_A1B': wthr_set})
+    pettmp_csv = {'precip': [1.0] * NMNTHS, 'tair': [2.0] * NMNTHS}
+    fwd_wthr_scnrs = {'csv': pettmp_csv, 'A1B': 'ClimGen_A1B', 'B2': 'ClimGen_B2'}
+
+    assert site_wthr_scnrs(form, None, *_site(2, 5)) is None
+    assert site_wthr_scnrs(form, {'csv': pettmp_csv}, *_site(2, 5)) == {'csv': pettmp_csv}
+
+    site_scnrs = site_wthr_scnrs(form, fwd_wthr_scnrs, *_site(2, 5))
+    assert list(site_scnrs) == ['csv', 'A1B']     # resource of B2 is not available
+    assert site_scnrs['A1B']['precip'][0] == 2005.0
+    assert WthrCache(join(str(tmp_path), CACHE_DIR), 'ClimGen_A1B', wthr_set).load((2, 5)) is not None